@@ -6,20 +6,46 @@ Lance l'interface de draft et expose les API pour le scraping + recommandations.
 import json
 import os
 import threading
+import time
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, g, jsonify, render_template, request, send_file, stream_with_context
 from flask_cors import CORS
 
+import metrics
+import profiling
+from cache import LRUCache, estimate_size
+from draft_session import DraftSession
+from draft_sim import (
+    DEFAULT_BEAM_WIDTH,
+    DEFAULT_ENEMY_WIDTH,
+    DEFAULT_NODE_BUDGET,
+    DEFAULT_SEQUENCE,
+    DEFAULT_TIME_BUDGET,
+    shutdown_pool,
+    simulate_draft,
+)
+from jobs import JobManager, JobQueueFull
 from opgg_scraper import (
+    DRIVER_POOL_SIZE,
+    MATCHUPS_TTL_H,
+    ROLE_TO_POSITION,
+    TIERLIST_TTL_H,
+    add_cache_listener,
     close_driver,
     fetch_champion_build,
     fetch_champion_matchups,
     fetch_champion_stats,
     fetch_ddragon_champions,
     fetch_player_profile,
+    fetch_role_matchups,
+    load_cached_matchups,
+    refresh_status,
+    resilience_stats,
+    store_stats,
 )
-from recommendation import recommend_champions
+from ratelimit import CircuitOpenError
+from recommendation import ChampionStatsSnapshot, MatchupMatrix, SynergyTable, recommend_batch, recommend_champions
 
 app = Flask(__name__)
 CORS(app)
@@ -29,12 +55,316 @@ DATA_DIR.mkdir(exist_ok=True)
 
 # Cache en mémoire
 _cache = {
-    "champion_stats": [],
     "ddragon": {},
     "player_pool": [],
-    "matchup_data": {},
+    "synergy": None,  # SynergyTable, construite au premier besoin depuis Data Dragon
+    "synergy_failed_at": 0.0,  # dernier échec de construction (time.time())
 }
-_lock = threading.Lock()
+_lock = metrics.TimedLock("app")
+
+# Mode multi-processus (serve.py) : chaque worker a ses propres caches mémoire, seul le cache
+# disque est partagé. Un scrape fait par un autre worker n'invalide pas nos caches mémoire :
+# on les relit depuis le disque au plus tard après WORKER_CACHE_TTL s (0 = un seul processus).
+WORKER_CACHE_TTL = int(os.environ.get("DRAFTFORME_WORKER_CACHE_TTL", "0"))
+
+# Tier lists par (region, tier, position) : (stats, ChampionStatsSnapshot), même TTL que le cache disque.
+# Le snapshot est construit une seule fois par tier list, pas à chaque /api/recommend.
+STATS_CACHE_MAX_ENTRIES = 64
+STATS_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_stats_cache = LRUCache(
+    max_entries=STATS_CACHE_MAX_ENTRIES,
+    max_bytes=STATS_CACHE_MAX_BYTES,
+    default_ttl=WORKER_CACHE_TTL or TIERLIST_TTL_H * 3600,
+)
+
+
+def _store_stats(key: tuple, stats: list[dict]) -> tuple[list[dict], ChampionStatsSnapshot]:
+    entry = (stats, ChampionStatsSnapshot(stats))
+    _stats_cache.set(key, entry, size=2 * estimate_size(stats))
+    return entry
+
+
+def _get_stats_entry(region: str, tier: str, role: str) -> tuple[list[dict], ChampionStatsSnapshot]:
+    """Tier list et son snapshot pour (region, tier, role), depuis la mémoire puis le disque / op.gg."""
+    key = (region, tier, ROLE_TO_POSITION.get(role, role))
+    entry = _stats_cache.get(key)
+    if entry is None:
+        stats = fetch_champion_stats(region, tier, role)
+        if not stats:
+            return stats, ChampionStatsSnapshot(stats)
+        entry = _store_stats(key, stats)
+    return entry
+
+
+def _get_champion_stats(region: str, tier: str, role: str) -> list[dict]:
+    return _get_stats_entry(region, tier, role)[0]
+
+
+# Matchups par (region, position) : ({champion: matchups}, MatchupMatrix), lus depuis le cache disque.
+# La matrice est reconstruite à chaque invalidation (nouveau scrape de matchups).
+MATCHUP_CACHE_MAX_ENTRIES = 32
+_matchup_cache = LRUCache(
+    max_entries=MATCHUP_CACHE_MAX_ENTRIES,
+    max_bytes=STATS_CACHE_MAX_BYTES,
+    default_ttl=WORKER_CACHE_TTL or MATCHUPS_TTL_H * 3600,
+)
+
+
+def _get_role_matchups(region: str, tier: str, role: str,
+                       stats: list[dict]) -> tuple[dict[str, dict], MatchupMatrix]:
+    """Matchups de tous les champions de la tier list, sans scraping (cache uniquement)."""
+    key = (region, ROLE_TO_POSITION.get(role, role))
+    entry = _matchup_cache.get(key)
+    if entry is None:
+        data = load_cached_matchups(region, role, stats)
+        matrix = MatchupMatrix.from_matchup_data(data)
+        entry = (data, matrix)
+        _matchup_cache.set(key, entry, size=estimate_size(data) + matrix.nbytes)
+    return entry
+
+
+SYNERGY_RETRY_AFTER = 300  # s avant de retenter Data Dragon après un échec
+
+
+def _get_synergy_table() -> SynergyTable | None:
+    """Table de synergie des paires de champions, dérivée des classes Data Dragon.
+    None si Data Dragon est injoignable et sans cache : l'axe synergie est alors ignoré,
+    et l'échec est mémorisé SYNERGY_RETRY_AFTER s (pas un appel réseau par requête).
+    Le téléchargement se fait hors de _lock.
+    """
+    with _lock:
+        table = _cache["synergy"]
+        failed_at = _cache["synergy_failed_at"]
+    if table is not None or time.time() - failed_at < SYNERGY_RETRY_AFTER:
+        return table
+    try:
+        table = SynergyTable.from_ddragon(fetch_ddragon_champions())
+    except Exception as e:
+        print(f"[!] Table de synergie indisponible : {e}")
+        with _lock:
+            _cache["synergy_failed_at"] = time.time()
+            return _cache["synergy"]
+    with _lock:
+        if _cache["synergy"] is None:
+            _cache["synergy"] = table
+        return _cache["synergy"]
+
+
+def _on_cache_update(cache_key: str, data):
+    """Un scrape (ex: rafraîchissement en arrière-plan) met à jour les caches mémoire."""
+    if cache_key.startswith("tierlist_"):
+        _, region, rest = cache_key.split("_", 2)
+        tier, position = rest.rsplit("_", 1)
+        _store_stats((region, tier, position), data)
+    elif cache_key.startswith("matchups_"):
+        # matchups_{slug}_{position}_{region}
+        _, position, region = cache_key.rsplit("_", 2)
+        _matchup_cache.pop((region, position))
+    elif cache_key == "ddragon_champions":
+        table = SynergyTable.from_ddragon(data)  # construite hors de _lock, seulement publiée dessous
+        with _lock:
+            _cache["synergy"] = table
+
+
+add_cache_listener(_on_cache_update)
+
+
+# ---------------------------------------------------------------------------
+# Métriques (/api/metrics)
+# ---------------------------------------------------------------------------
+
+REQUEST_LATENCY = metrics.histogram(
+    "draftforme_http_request_seconds", "Latence des requêtes HTTP par route", ("endpoint", "method", "status"),
+)
+RECOMMEND_PHASE = metrics.histogram(
+    "draftforme_recommend_phase_seconds", "Phases de /api/recommend (stats, matchups, scoring)", ("phase",),
+)
+
+
+@app.before_request
+def _start_request_timer():
+    if metrics.ENABLED:
+        g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    # Réponses en streaming : mesuré jusqu'au premier octet, pas jusqu'à la fin du flux
+    start = g.get("request_start")
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint,
+                                method=request.method, status=response.status_code)
+    return response
+
+
+def _memory_cache_samples(field: str):
+    caches = {"champion_stats": _stats_cache, "matchups": _matchup_cache, "draft_sessions": _draft_sessions}
+    return [({"cache": name}, cache.stats()[field]) for name, cache in caches.items()]
+
+
+for _field, _kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                      ("entries", "gauge"), ("bytes", "gauge")):
+    metrics.register_callback(
+        f"draftforme_memory_cache_{_field}" + ("_total" if _kind == "counter" else ""),
+        f"Caches mémoire : {_field}", lambda field=_field: _memory_cache_samples(field), _kind,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Profilage à la demande (profiling.py) : une requête, jeton admin requis
+# ---------------------------------------------------------------------------
+
+_profiles = profiling.ProfileStore()
+
+
+def _profile_token() -> str | None:
+    return request.headers.get("X-DraftForMe-Profile") or request.args.get("profile")
+
+
+@app.before_request
+def _start_profiling():
+    token = _profile_token()
+    if not token or not profiling.PROFILE_TOKEN or request.path.startswith("/api/profiles"):
+        return None
+    if not profiling.is_authorized(token):
+        return jsonify({"error": "Jeton de profilage invalide"}), 403
+    mode = request.headers.get("X-DraftForMe-Profile-Mode") or request.args.get("profile_mode", "cprofile")
+    try:
+        profiler = profiling.RequestProfiler(mode)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    g.profiler = profiler
+    profiler.start()
+    return None
+
+
+@app.after_request
+def _save_profile(response):
+    # Réponses en streaming : seul le handler est profilé, pas la génération du flux
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+        args = {k: v for k, v in request.args.items() if k not in ("profile", "profile_mode")}
+        response.headers["X-DraftForMe-Profile-Id"] = _profiles.save(profiler, {
+            "method": request.method,
+            "path": request.path,
+            "args": args,
+            "status": response.status_code,
+        })
+    return response
+
+
+@app.teardown_request
+def _stop_profiling(exc):
+    # after_request non exécuté (exception) : le profileur est arrêté quand même, sinon
+    # le verrou cProfile du processus resterait pris
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+
+
+# Sessions de draft (/api/draft/session) : état + scores maintenus entre deux clics
+DRAFT_SESSION_MAX = 256
+DRAFT_SESSION_TTL = 2 * 3600  # secondes sans activité
+_draft_sessions = LRUCache(max_entries=DRAFT_SESSION_MAX, default_ttl=DRAFT_SESSION_TTL)
+
+# Jobs de scraping asynchrones (?async=1) : le thread de la requête est libéré tout de suite
+JOB_WORKERS = DRIVER_POOL_SIZE
+JOB_MAX_PENDING = 32
+JOB_MAX_WAIT = 30  # long-poll max (secondes)
+_jobs = JobManager(workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING)
+
+# Préchargements de rôle (plusieurs minutes chacun) : exécuteur à part, pour ne pas occuper
+# les workers des jobs ?async=1
+PREFETCH_WORKERS = 1
+PREFETCH_MAX_PENDING = 16
+_prefetch_jobs = JobManager(workers=PREFETCH_WORKERS, max_pending=PREFETCH_MAX_PENDING)
+
+
+def _run_or_queue(job_key: tuple, fn):
+    """Exécute fn() dans la requête, ou la met en file si ?async=1 (réponse 202 + job id).
+    Un job identique déjà en attente est réutilisé.
+    """
+    if request.args.get("async", "").lower() not in ("1", "true", "yes"):
+        return jsonify(fn())
+    try:
+        job = _jobs.submit(job_key, fn)
+    except JobQueueFull:
+        return jsonify({"error": "Trop de jobs en attente, réessayez plus tard"}), 503, {"Retry-After": "5"}
+    body = job.to_dict()
+    body["status_url"] = f"/api/jobs/{job.id}"
+    return jsonify(body), 202, {"Location": body["status_url"]}
+
+
+@app.errorhandler(CircuitOpenError)
+def _opgg_unavailable(e: CircuitOpenError):
+    """op.gg en panne et aucune donnée en cache : 503 plutôt qu'une erreur 500."""
+    return jsonify({"error": str(e)}), 503, {"Retry-After": str(max(1, round(e.retry_in)))}
+
+
+# Préchargement des matchups d'un rôle : (region, tier, position) -> progression.
+# Un préchargement terminé reste valable MATCHUPS_TTL_H (comme les caches qu'il a remplis),
+# un préchargement en échec PREFETCH_RETRY_AFTER s ; les entrées expirées sont supprimées.
+PREFETCH_RETRY_AFTER = 300
+_prefetch_progress: dict[tuple, dict] = {}
+
+
+def _prune_prefetch_progress(now: float):
+    """Supprime les progressions expirées (à appeler sous _lock)."""
+    for key, progress in list(_prefetch_progress.items()):
+        finished_at = progress["finished_at"]
+        if finished_at is None:
+            continue
+        lifetime = MATCHUPS_TTL_H * 3600 if progress["state"] == "done" else PREFETCH_RETRY_AFTER
+        if finished_at + lifetime <= now:
+            del _prefetch_progress[key]
+
+
+def _start_matchup_prefetch(region: str, tier: str, role: str, force: bool = True) -> dict:
+    """Lance le scrape en arrière-plan des matchups de tout un rôle.
+    Sans `force`, ne fait rien si un préchargement de ce rôle est en cours ou encore valable.
+    """
+    position = ROLE_TO_POSITION.get(role, role)
+    key = (region, tier, position)
+    with _lock:
+        _prune_prefetch_progress(time.time())
+        progress = _prefetch_progress.get(key)
+        if progress and (not force or progress["state"] in ("queued", "running")):
+            return dict(progress)
+        progress = {"state": "queued", "done": 0, "total": None, "loaded": 0, "failed": [],
+                    "started_at": None, "finished_at": None}
+        _prefetch_progress[key] = progress
+
+    def on_progress(done, total, name, ok):
+        with _lock:
+            progress.update(done=done, total=total)
+            if ok:
+                progress["loaded"] += 1
+            else:
+                progress["failed"].append(name)
+
+    def run():
+        with _lock:
+            progress.update(state="running", started_at=time.time())
+        try:
+            data = fetch_role_matchups(region, tier, position, progress=on_progress)
+        except Exception as e:
+            with _lock:
+                progress.update(state="failed", error=str(e), finished_at=time.time())
+            raise
+        _matchup_cache.pop((region, position))
+        with _lock:
+            progress.update(state="done", finished_at=time.time(), loaded=len(data))
+        return {"champions": len(data)}
+
+    try:
+        _prefetch_jobs.submit(("prefetch_matchups",) + key, run)
+    except JobQueueFull:
+        with _lock:
+            progress.update(state="failed", error="Trop de préchargements en attente", finished_at=time.time())
+    with _lock:
+        return dict(progress)
 
 
 # ---------------------------------------------------------------------------
@@ -67,11 +397,10 @@ def api_champion_stats():
     region = request.args.get("region", "euw")
     tier = request.args.get("tier", "emerald_plus")
     role = request.args.get("role", "all")
-
-    stats = fetch_champion_stats(region, tier, role)
-    with _lock:
-        _cache["champion_stats"] = stats
-    return jsonify(stats)
+    return _run_or_queue(
+        ("champion_stats", region, tier, role),
+        lambda: _get_champion_stats(region, tier, role),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -83,10 +412,29 @@ def api_matchups(champion_name: str):
     """Matchups pour un champion donné."""
     region = request.args.get("region", "euw")
     role = request.args.get("role", "")
-    data = fetch_champion_matchups(champion_name, role, region)
+
+    return _run_or_queue(
+        ("matchups", champion_name, role, region),
+        lambda: fetch_champion_matchups(champion_name, role, region),
+    )
+
+
+@app.route("/api/matchups/prefetch", methods=["GET", "POST"])
+def api_matchups_prefetch():
+    """Préchargement des matchups de tous les champions d'un rôle.
+    POST lance le préchargement (202), GET renvoie sa progression.
+    """
+    params = request.get_json(silent=True) or request.args
+    region = params.get("region", "euw")
+    tier = params.get("tier", "emerald_plus")
+    role = params.get("role", "mid")
+    if request.method == "POST":
+        return jsonify(_start_matchup_prefetch(region, tier, role)), 202
     with _lock:
-        _cache["matchup_data"][champion_name] = data
-    return jsonify(data)
+        _prune_prefetch_progress(time.time())
+        progress = _prefetch_progress.get((region, tier, ROLE_TO_POSITION.get(role, role)))
+        progress = dict(progress) if progress else {"state": "idle"}
+    return jsonify(progress)
 
 
 @app.route("/api/build/<champion_slug>")
@@ -94,8 +442,10 @@ def api_build(champion_slug: str):
     """Items recommandés pour un champion."""
     region = request.args.get("region", "euw")
     role = request.args.get("role", "mid")
-    data = fetch_champion_build(champion_slug, role, region)
-    return jsonify(data)
+    return _run_or_queue(
+        ("build", champion_slug, role, region),
+        lambda: fetch_champion_build(champion_slug, role, region),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -110,10 +460,33 @@ def api_player():
     if not summoner:
         return jsonify({"error": "Paramètre 'summoner' manquant"}), 400
 
-    profile = fetch_player_profile(summoner, region)
-    with _lock:
-        _cache["player_pool"] = profile.get("most_played", [])
-    return jsonify(profile)
+    def load():
+        profile = fetch_player_profile(summoner, region)
+        with _lock:
+            _cache["player_pool"] = profile.get("most_played", [])
+        return profile
+
+    return _run_or_queue(("player", summoner, region), load)
+
+
+# ---------------------------------------------------------------------------
+# API : Jobs asynchrones
+# ---------------------------------------------------------------------------
+
+@app.route("/api/jobs/<job_id>")
+def api_job(job_id: str):
+    """Statut / résultat d'un job. ?wait=N attend jusqu'à N secondes la fin du job."""
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job inconnu ou expiré"}), 404
+    wait = min(request.args.get("wait", 0, type=float), JOB_MAX_WAIT)
+    if wait > 0:
+        job.wait(wait)
+    if job.state == "done":
+        return jsonify(job.to_dict(with_result=True))
+    if job.state == "failed":
+        return jsonify(job.to_dict()), 500
+    return jsonify(job.to_dict()), 202
 
 
 # ---------------------------------------------------------------------------
@@ -130,8 +503,10 @@ def api_recommend():
         "enemy_picks": ["Aatrox", "LeeSin"],
         "banned": ["Zed", "Yasuo"],
         "already_picked": ["Jinx"],
+        "ally_picks": ["Leona"],
         "role": "bottom",
         "region": "euw",
+        "tier": "emerald_plus",
         "top_n": 10
     }
     """
@@ -141,39 +516,275 @@ def api_recommend():
     enemy_picks = body.get("enemy_picks", [])
     banned = body.get("banned", [])
     already_picked = body.get("already_picked", [])
+    ally_picks = body.get("ally_picks", [])
     role = body.get("role", "all")
     region = body.get("region", "euw")
+    tier = body.get("tier", "emerald_plus")
     priority = body.get("priority", 50)  # 0=pool, 100=meta
     top_n = body.get("top_n", 10)
 
-    # Charger les stats si pas en cache
-    with _lock:
-        stats = _cache.get("champion_stats", [])
-    if not stats:
-        stats = fetch_champion_stats(region, "emerald_plus", role)
-        with _lock:
-            _cache["champion_stats"] = stats
+    with RECOMMEND_PHASE.time(phase="stats"):
+        stats, snapshot = _get_stats_entry(region, tier, role)
 
-    # Charger les matchups pour chaque champion recommandable si ennemi a pick
-    matchup_data = {}
+    # Matchups de chaque champion recommandable (cache uniquement, jamais de scrape ici).
+    # S'il en manque, on lance leur préchargement en arrière-plan pour les requêtes suivantes.
+    matchup_data, matchup_matrix = {}, None
     if enemy_picks:
-        with _lock:
-            matchup_data = dict(_cache.get("matchup_data", {}))
-
-    recs = recommend_champions(
-        all_champion_stats=stats,
-        player_pool=player_pool,
-        enemy_picks=enemy_picks,
-        matchup_data=matchup_data,
-        role=role,
-        banned_champions=banned,
-        already_picked=already_picked,
-        priority=priority,
-        top_n=top_n,
-    )
+        with RECOMMEND_PHASE.time(phase="matchups"):
+            matchup_data, matchup_matrix = _get_role_matchups(region, tier, role, stats)
+        if len(matchup_data) < len(stats):
+            _start_matchup_prefetch(region, tier, role, force=False)
+
+    synergy = _get_synergy_table() if ally_picks else None
+    with RECOMMEND_PHASE.time(phase="scoring"):
+        recs = recommend_champions(
+            all_champion_stats=snapshot,
+            player_pool=player_pool,
+            enemy_picks=enemy_picks,
+            matchup_data=matchup_data,
+            role=role,
+            banned_champions=banned,
+            already_picked=already_picked,
+            priority=priority,
+            top_n=top_n,
+            matchup_matrix=matchup_matrix,
+            ally_picks=ally_picks,
+            synergy=synergy,
+        )
     return jsonify(recs)
 
 
+# Batch : une seule requête pour beaucoup de drafts (équipes entières, analyse offline)
+BATCH_MAX_DRAFTS = 10_000
+BATCH_WORKERS = 4
+
+
+def _batch_resources(region: str, tier: str, role: str):
+    """Tier list + matchups d'une draft du batch (cache uniquement pour les matchups)."""
+    stats, snapshot = _get_stats_entry(region, tier, role)
+    matchup_data, matchup_matrix = _get_role_matchups(region, tier, role, stats)
+    return snapshot, matchup_data, matchup_matrix
+
+
+@app.route("/api/recommend/batch", methods=["POST"])
+def api_recommend_batch():
+    """
+    Recommandations pour plusieurs drafts en une requête, renvoyées en NDJSON (une ligne par draft,
+    dans l'ordre, dès qu'elle est calculée).
+    Body JSON : {"drafts": [<body de /api/recommend>, ...], "workers": 4}
+    Ligne : {"index": 0, "recommendations": [...]} ou {"index": 1, "error": "..."}
+    """
+    body = request.get_json(silent=True) or {}
+    options = body if isinstance(body, dict) else {}
+    drafts = options.get("drafts") if isinstance(body, dict) else body
+    if not isinstance(drafts, list):
+        return jsonify({"error": "Liste 'drafts' manquante"}), 400
+    if len(drafts) > BATCH_MAX_DRAFTS:
+        return jsonify({"error": f"Trop de drafts (max {BATCH_MAX_DRAFTS})"}), 413
+    workers = options.get("workers", BATCH_WORKERS)
+    if not isinstance(workers, int):
+        return jsonify({"error": "'workers' doit être un entier"}), 400
+    workers = max(1, min(workers, BATCH_WORKERS))
+    has_allies = any(isinstance(d, dict) and d.get("ally_picks") for d in drafts)
+    synergy = _get_synergy_table() if has_allies else None
+
+    def generate():
+        for result in recommend_batch(drafts, _batch_resources, synergy=synergy, workers=workers):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/api/draft/simulate", methods=["POST"])
+def api_draft_simulate():
+    """
+    Simule la suite de la draft et renvoie le meilleur pick face aux réponses ennemies probables.
+    Body JSON : celui de /api/recommend, plus (optionnels)
+    {
+        "sequence": ["enemy_ban", "pick", "enemy_pick"],   # étapes restantes, un seul "pick"
+        "beam_width": 6,          # nos candidats explorés par étape
+        "enemy_width": 8,         # picks / bans ennemis explorés par étape
+        "time_budget": 5,         # secondes (max 30)
+        "node_budget": 200000
+    }
+    """
+    body = request.get_json(silent=True) or {}
+    role = body.get("role", "all")
+    region = body.get("region", "euw")
+    tier = body.get("tier", "emerald_plus")
+    enemy_picks = body.get("enemy_picks", [])
+    ally_picks = body.get("ally_picks", [])
+
+    try:
+        budgets = {
+            "beam_width": int(body.get("beam_width", DEFAULT_BEAM_WIDTH)),
+            "enemy_width": int(body.get("enemy_width", DEFAULT_ENEMY_WIDTH)),
+            "time_budget": float(body.get("time_budget", DEFAULT_TIME_BUDGET)),
+            "node_budget": int(body.get("node_budget", DEFAULT_NODE_BUDGET)),
+        }
+    except (TypeError, ValueError) as e:  # null, liste... : 400 et non 500
+        return jsonify({"error": str(e)}), 400
+
+    stats, snapshot = _get_stats_entry(region, tier, role)
+    matchup_data, matchup_matrix = _get_role_matchups(region, tier, role, stats)
+    if len(matchup_data) < len(stats):
+        _start_matchup_prefetch(region, tier, role, force=False)
+
+    try:
+        result = simulate_draft(
+            snapshot,
+            player_pool=body.get("player_pool", []),
+            enemy_picks=enemy_picks,
+            matchup_data=matchup_data,
+            banned_champions=body.get("banned", []),
+            already_picked=body.get("already_picked", []),
+            priority=body.get("priority", 50),
+            sequence=body.get("sequence", DEFAULT_SEQUENCE),
+            **budgets,
+            matchup_matrix=matchup_matrix,
+            ally_picks=ally_picks,
+            synergy=_get_synergy_table() if ally_picks else None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+
+# ---------------------------------------------------------------------------
+# API : Sessions de draft (mises à jour incrémentales)
+# ---------------------------------------------------------------------------
+
+def _session_response(session: DraftSession, status: int = 200):
+    _draft_sessions.set(session.id, session, size=session.nbytes)  # prolonge le TTL
+    return jsonify({**session.state(), "recommendations": session.recommendations()}), status
+
+
+def _refresh_session_matchups(session: DraftSession):
+    """Dès qu'il y a des picks ennemis : préchargement des matchups manquants du rôle, et
+    matrice de la session remplacée par celle du cache si elle a été rechargée depuis.
+    """
+    if session.key is None or not session.enemy_picks:
+        return
+    region, tier, position = session.key
+    stats, _ = _get_stats_entry(region, tier, position)
+    matchup_data, matchup_matrix = _get_role_matchups(region, tier, position, stats)
+    if matchup_matrix is not session.matrix:
+        session.set_matrix(matchup_matrix)
+    if len(matchup_data) < len(stats):
+        _start_matchup_prefetch(region, tier, position, force=False)
+
+
+@app.route("/api/draft/session", methods=["POST"])
+def api_draft_session_create():
+    """
+    Crée une session de draft. Body JSON : celui de /api/recommend.
+    La réponse contient le session_id à utiliser pour les mises à jour.
+    """
+    body = request.get_json(silent=True) or {}
+    role = body.get("role", "all")
+    region = body.get("region", "euw")
+    tier = body.get("tier", "emerald_plus")
+
+    stats, snapshot = _get_stats_entry(region, tier, role)
+    _, matchup_matrix = _get_role_matchups(region, tier, role, stats)
+
+    session = DraftSession(
+        snapshot,
+        player_pool=body.get("player_pool", []),
+        matchup_matrix=matchup_matrix,
+        synergy_loader=_get_synergy_table,
+        priority=body.get("priority", 50),
+        top_n=body.get("top_n", 10),
+        key=(region, tier, ROLE_TO_POSITION.get(role, role)),
+    )
+    try:
+        session.sync(body)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    _refresh_session_matchups(session)
+    return _session_response(session, 201)
+
+
+@app.route("/api/draft/session/<session_id>", methods=["GET", "PATCH", "PUT", "DELETE"])
+def api_draft_session(session_id):
+    """
+    GET    : état + recommandations
+    PATCH  : {"actions": [{"op": "ban", "champion": "Zed"}, {"op": "enemy_pick", "champion": "Ahri"},
+                          {"op": "priority", "value": 70}, ...]}
+             ops : ban / unban, pick / unpick, enemy_pick / remove_enemy, ally_pick / remove_ally,
+                   priority, player_pool, top_n
+    PUT    : état complet (body de /api/recommend) : seules les différences sont appliquées
+    DELETE : ferme la session
+    """
+    session = _draft_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session inconnue ou expirée"}), 404
+    if request.method == "DELETE":
+        _draft_sessions.pop(session_id)
+        return "", 204
+
+    body = request.get_json(silent=True) or {}
+    with session.lock:
+        try:
+            if request.method == "PATCH":
+                session.apply(body.get("actions", []))
+            elif request.method == "PUT":
+                session.sync(body)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        _refresh_session_matchups(session)
+        return _session_response(session)
+
+
+# ---------------------------------------------------------------------------
+# API : état des caches
+# ---------------------------------------------------------------------------
+
+@app.route("/api/cache/status")
+def api_cache_status():
+    """Caches mémoire + rafraîchissements en arrière-plan des caches disque."""
+    return jsonify({
+        "champion_stats": _stats_cache.stats(),
+        "draft_sessions": _draft_sessions.stats(),
+        "refresh": refresh_status(),
+        "store": store_stats(),
+        "opgg": resilience_stats(),
+    })
+
+
+def _require_profile_admin():
+    """Réponse d'erreur si la requête n'a pas le jeton admin de profilage, sinon None."""
+    if not profiling.PROFILE_TOKEN:
+        return jsonify({"error": "Profilage désactivé (DRAFTFORME_PROFILE_TOKEN)"}), 404
+    if not profiling.is_authorized(_profile_token()):
+        return jsonify({"error": "Jeton de profilage invalide"}), 403
+    return None
+
+
+@app.route("/api/profiles")
+def api_profiles():
+    """Profils du buffer circulaire, du plus récent au plus ancien."""
+    return _require_profile_admin() or jsonify(_profiles.list())
+
+
+@app.route("/api/profiles/<profile_id>")
+def api_profile_download(profile_id: str):
+    """Artefact d'un profil (.pstats ou .collapsed)."""
+    denied = _require_profile_admin()
+    if denied:
+        return denied
+    path = _profiles.artifact_path(profile_id)
+    if path is None:
+        return jsonify({"error": "Profil inconnu ou supprimé du buffer"}), 404
+    return send_file(path, as_attachment=True, download_name=path.name)
+
+
+@app.route("/api/metrics")
+def api_metrics():
+    """Métriques au format texte Prometheus (DRAFTFORME_METRICS=0 pour les désactiver)."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 # ---------------------------------------------------------------------------
 # API : set player pool manuellement
 # ---------------------------------------------------------------------------
@@ -200,10 +811,14 @@ def api_get_player_pool():
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    # Serveur de développement, un seul processus. Production : python serve.py --workers N
     print("=" * 50)
     print("  DraftForMe - http://localhost:5000")
     print("=" * 50)
     try:
         app.run(debug=True, port=5000, use_reloader=False)
     finally:
+        _jobs.shutdown()
+        _prefetch_jobs.shutdown()
+        shutdown_pool()
         close_driver()
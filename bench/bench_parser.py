@@ -0,0 +1,83 @@
+"""
+Benchmark du parsing HTML du scraper (offline, pas de réseau ni de Chrome).
+
+Mesure, pour chaque backend et chaque type de page :
+  - parse   : construction de l'arbre (_make_soup, avec ou sans SoupStrainer)
+  - extract : fonction _parse_* complète (parse + sélecteurs + regex)
+
+Usage :
+    python bench/bench_parser.py
+    python bench/bench_parser.py --html data/debug_profile.html --repeat 10
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import opgg_scraper  # noqa: E402
+
+# type de page -> (sous-arbre parsé, fonction d'extraction)
+PAGES = {
+    "tierlist": ("table", lambda html: opgg_scraper._parse_tierlist(html, "mid")),
+    "build": (None, lambda html: opgg_scraper._parse_build(html, "ahri", "mid")),
+    "matchups": ("table", lambda html: opgg_scraper._parse_matchups(html, "Ahri", "mid")),
+    "summary": (None, opgg_scraper._parse_player_summary),
+    "player_champions": ("table", opgg_scraper._parse_player_champions),
+}
+
+
+def _time_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _backends() -> list[str]:
+    backends = ["html.parser"]
+    if opgg_scraper._HAS_LXML:
+        backends.append("lxml")
+    return backends
+
+
+def run(html: str, repeat: int) -> list[dict]:
+    rows = []
+    original = opgg_scraper.PARSER_BACKEND
+    try:
+        for backend in _backends():
+            opgg_scraper.PARSER_BACKEND = backend
+            for page, (only, extract) in PAGES.items():
+                rows.append({
+                    "backend": backend,
+                    "page": page,
+                    "subtree": only or "full",
+                    "parse_ms": _time_ms(lambda: opgg_scraper._make_soup(html, only), repeat),
+                    "extract_ms": _time_ms(lambda: extract(html), repeat),
+                })
+    finally:
+        opgg_scraper.PARSER_BACKEND = original
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing HTML op.gg")
+    parser.add_argument("--html", default=str(ROOT / "data" / "debug_profile.html"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    html = Path(args.html).read_text(encoding="utf-8")
+    print(f"[*] {args.html} ({len(html) / 1024:.0f} Ko), médiane sur {args.repeat} runs")
+    print(f"{'backend':<12} {'page':<18} {'subtree':<8} {'parse ms':>9} {'extract ms':>11}")
+    for r in run(html, args.repeat):
+        print(f"{r['backend']:<12} {r['page']:<18} {r['subtree']:<8} {r['parse_ms']:>9.1f} {r['extract_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
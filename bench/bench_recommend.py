@@ -0,0 +1,277 @@
+"""
+Benchmark du moteur de recommandation (offline : data/*.json uniquement).
+
+Génère des milliers de drafts synthétiques (graine fixe) à partir des tier lists
+(data/tierlist_*.json, data/champion_stats_*.json) et des pools de joueurs
+(data/player_*.json), avec des matchups synthétiques, puis mesure par scénario
+(taille du pool x nombre d'ennemis) :
+  - latence p50 / p99 (µs) de recommend_champions (liste brute, et snapshot + matrice
+    comme dans /api/recommend), compute_champion_score et counter_score
+  - allocations : pic mémoire par appel (tracemalloc, passe séparée)
+
+Les résultats peuvent être enregistrés comme baseline puis comparés :
+    python bench/bench_recommend.py --save-baseline
+    python bench/bench_recommend.py --compare          # code retour 1 si régression
+    python bench/bench_recommend.py --drafts 2000 --pool-sizes 0 20 --enemies 0 5
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+import cache_io  # noqa: E402
+import recommendation  # noqa: E402
+
+DATA_DIR = ROOT / "data"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "recommend.json"
+POOL_SIZES = (0, 5, 20, 50)
+ENEMY_COUNTS = (0, 1, 3, 5)
+
+
+# ---------------------------------------------------------------------------
+# Données synthétiques
+# ---------------------------------------------------------------------------
+
+def _load_json(path: Path):
+    return cache_io.loads_checked(path.read_text(encoding="utf-8"))
+
+
+def load_tierlists() -> list[list[dict]]:
+    files = sorted(DATA_DIR.glob("tierlist_*.json")) + sorted(DATA_DIR.glob("champion_stats_*.json"))
+    return [_load_json(f) for f in files]
+
+
+def load_pool_entries() -> list[dict]:
+    entries = []
+    for f in sorted(DATA_DIR.glob("player_*.json")):
+        entries += _load_json(f).get("most_played", [])
+    return entries
+
+
+def synthetic_matchups(names: list[str], rng: random.Random) -> dict[str, dict]:
+    """~25 matchups par champion, comme une page op.gg."""
+    return {
+        name: {"all_matchups": [
+            {"enemy": enemy, "win_rate": round(rng.uniform(40, 60), 2)}
+            for enemy in rng.sample(names, min(25, len(names)))
+        ]}
+        for name in names
+    }
+
+
+def synthetic_pool(names: list[str], entries: list[dict], size: int, rng: random.Random) -> list[dict]:
+    """Pool de `size` champions de la tier list, games / WR tirés des vrais profils."""
+    pool = []
+    for name in rng.sample(names, min(size, len(names))):
+        src = rng.choice(entries) if entries else {}
+        pool.append({"champion": name, "games": src.get("games", rng.randint(1, 200)),
+                     "win_rate": src.get("win_rate", round(rng.uniform(40, 65), 1))})
+    return pool
+
+
+def generate_drafts(count: int, pool_size: int, enemies: int, seed: int) -> list[dict]:
+    rng = random.Random(f"{seed}-{pool_size}-{enemies}")
+    tierlists = load_tierlists()
+    entries = load_pool_entries()
+    prepared = []
+    for stats in tierlists:
+        names = [c["name"] for c in stats if c.get("name")]
+        data = synthetic_matchups(names, rng)
+        prepared.append((stats, names, data, recommendation.ChampionStatsSnapshot(stats),
+                         recommendation.MatchupMatrix.from_matchup_data(data)))
+
+    drafts = []
+    for _ in range(count):
+        stats, names, data, snapshot, matrix = rng.choice(prepared)
+        picked = rng.sample(names, enemies + 8)
+        drafts.append({
+            "stats": stats,
+            "snapshot": snapshot,
+            "matrix": matrix,
+            "matchup_data": data,
+            "player_pool": synthetic_pool(names, entries, pool_size, rng),
+            "enemy_picks": picked[:enemies],
+            "banned": picked[enemies:enemies + 6],
+            "already_picked": picked[enemies + 6:],
+            "priority": rng.choice([0, 25, 50, 75, 100]),
+            "champion": rng.choice(names),
+        })
+    return drafts
+
+
+# ---------------------------------------------------------------------------
+# Fonctions mesurées
+# ---------------------------------------------------------------------------
+
+def _recommend(d):
+    return recommendation.recommend_champions(
+        d["stats"], d["player_pool"], d["enemy_picks"], d["matchup_data"],
+        banned_champions=d["banned"], already_picked=d["already_picked"], priority=d["priority"],
+    )
+
+
+def _recommend_snapshot(d):
+    return recommendation.recommend_champions(
+        d["snapshot"], d["player_pool"], d["enemy_picks"], d["matchup_data"],
+        banned_champions=d["banned"], already_picked=d["already_picked"], priority=d["priority"],
+        matchup_matrix=d["matrix"],
+    )
+
+
+def _compute_champion_score(d):
+    stats = next(c for c in d["stats"] if c.get("name") == d["champion"])
+    return recommendation.compute_champion_score(
+        stats, d["champion"], d["player_pool"], d["enemy_picks"], d["matchup_data"],
+        d["priority"], len(d["stats"]),
+    )
+
+
+def _counter_score(d):
+    return recommendation.counter_score(d["champion"], d["enemy_picks"], d["matchup_data"])
+
+
+FUNCTIONS = {
+    "recommend_champions": _recommend,
+    "recommend_snapshot": _recommend_snapshot,
+    "compute_champion_score": _compute_champion_score,
+    "counter_score": _counter_score,
+}
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure(fn, drafts: list[dict], alloc_samples: int) -> dict:
+    for d in drafts[:20]:  # échauffement (caches, imports paresseux)
+        fn(d)
+    samples = []
+    for d in drafts:
+        start = time.perf_counter_ns()
+        fn(d)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+
+    # Allocations : passe séparée, tracemalloc ralentit fortement les appels
+    peaks = []
+    tracemalloc.start()
+    try:
+        for d in drafts[:alloc_samples]:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn(d)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+
+    return {
+        "p50_us": round(_percentile(samples, 0.50), 2),
+        "p99_us": round(_percentile(samples, 0.99), 2),
+        "peak_kib": round(_percentile(peaks, 0.50) / 1024, 1) if peaks else None,
+    }
+
+
+def run(drafts: int, pool_sizes, enemy_counts, seed: int, alloc_samples: int) -> dict:
+    results = {}
+    for pool_size in pool_sizes:
+        for enemies in enemy_counts:
+            scenario = generate_drafts(drafts, pool_size, enemies, seed)
+            for name, fn in FUNCTIONS.items():
+                results[f"{name}|pool={pool_size}|enemies={enemies}"] = measure(fn, scenario, alloc_samples)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def _environment() -> dict:
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "system": platform.system(), "machine": platform.machine()}
+
+
+def save_baseline(path: Path, results: dict, args):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "params": {"drafts": args.drafts, "seed": args.seed},
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> list[str]:
+    """Scénarios dont la p50 dépasse baseline x threshold."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline["results"].get(key)
+        if base and base["p50_us"] and current["p50_us"] / base["p50_us"] > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline du moteur de recommandation")
+    parser.add_argument("--drafts", type=int, default=1000, help="drafts par scénario")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=list(POOL_SIZES))
+    parser.add_argument("--enemies", type=int, nargs="+", default=list(ENEMY_COUNTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alloc-samples", type=int, default=100, help="appels mesurés sous tracemalloc")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=1.25, help="régression si p50 > baseline x seuil")
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if args.compare:
+        if not baseline_path.exists():
+            parser.error(f"baseline introuvable : {baseline_path} (lancer avec --save-baseline)")
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    print(f"[*] {args.drafts} drafts par scénario, graine {args.seed}")
+    results = run(args.drafts, args.pool_sizes, args.enemies, args.seed, args.alloc_samples)
+
+    header = f"{'fonction':<24} {'pool':>5} {'enn.':>5} {'p50 µs':>9} {'p99 µs':>9} {'pic Kio':>8}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for key, r in results.items():
+        name, pool, enemies = key.split("|")
+        line = (f"{name:<24} {pool.split('=')[1]:>5} {enemies.split('=')[1]:>5} "
+                f"{r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['peak_kib']:>8.1f}")
+        if baseline:
+            base = baseline["results"].get(key)
+            line += f" {r['p50_us'] / base['p50_us']:>7.2f}x" if base and base["p50_us"] else f" {'-':>8}"
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(baseline_path, results, args)
+        print(f"[*] Baseline enregistrée : {baseline_path}")
+    if baseline:
+        regressions = compare(baseline, results, args.threshold)
+        if baseline.get("environment") != _environment():
+            print("[!] Baseline mesurée sur un autre environnement :", baseline.get("environment"))
+        if regressions:
+            print(f"[!] {len(regressions)} régression(s) > {args.threshold}x :")
+            for key in regressions:
+                print(f"    {key}")
+            sys.exit(1)
+        print("[*] Pas de régression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark et non-régression du scraper sur des pages op.gg enregistrées (replay offline).
+
+Enregistrement (réseau + Chrome) : les pages chargées par les fetchers sont écrites
+dans le corpus avec leur résultat parsé (voir opgg_scraper.record_page) :
+    python bench/bench_scraper.py record --role mid --champion Ahri --summoner "theslim194#EUW"
+    (équivalent : lancer l'app avec DRAFTFORME_RECORD_DIR=bench/corpus)
+
+Replay (ni réseau ni Chrome) : les pages sont servies aux fetchers par un faux driver,
+et on mesure pour chaque page du corpus :
+  - total   : appel complet (fetch_champion_stats, fetch_champion_build,
+              fetch_champion_matchups, ou _extract_champion_table pour /champions)
+  - parse   : temps passé dans _make_soup
+  - extract : le reste (sélecteurs, regex, construction du résultat)
+et on compare le résultat à celui enregistré (code retour 1 en cas de différence) :
+    python bench/bench_scraper.py
+    python bench/bench_scraper.py --corpus bench/corpus --repeat 10
+    python bench/bench_scraper.py --save-expected   # après un changement voulu du parsing
+Sans corpus, data/debug_profile.html est rejouée pour chaque type de page.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import opgg_scraper  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus"
+FALLBACK_HTML = ROOT / "data" / "debug_profile.html"
+FALLBACK_URLS = {
+    "tierlist": "https://op.gg/lol/champions?position=mid&tier=emerald_plus&region=euw",
+    "build": "https://op.gg/lol/champions/ahri/build/mid?region=euw",
+    "matchups": "https://op.gg/lol/champions/ahri/counters/mid?region=euw",
+    "player_champions": "https://op.gg/lol/summoners/euw/theslim194-EUW/champions",
+}
+
+
+# ---------------------------------------------------------------------------
+# Corpus et faux driver
+# ---------------------------------------------------------------------------
+
+def load_corpus(directory: Path) -> list[dict]:
+    """Entrées {url, page, html, expected_file} du corpus (index.json écrit par record_page)."""
+    index_file = directory / "index.json"
+    if not index_file.exists():
+        html = FALLBACK_HTML.read_text(encoding="utf-8")
+        return [{"url": url, "page": page, "html": html, "expected_file": None}
+                for page, url in FALLBACK_URLS.items()]
+    entries = []
+    for url, meta in json.loads(index_file.read_text(encoding="utf-8")).items():
+        entries.append({
+            "url": url,
+            "page": meta["page"],
+            "html": (directory / meta["file"]).read_text(encoding="utf-8"),
+            "expected_file": directory / meta["file"].replace(".html", ".json"),
+        })
+    return entries
+
+
+class ReplayDriver:
+    """Faux webdriver : driver.get(url) charge la page enregistrée au lieu d'ouvrir Chrome."""
+
+    def __init__(self, pages: dict[str, str]):
+        self.pages = pages
+        self.page_source = ""
+
+    def get(self, url):
+        if url not in self.pages:
+            raise KeyError(f"Page absente du corpus : {url}")
+        self.page_source = self.pages[url]
+
+    def execute_script(self, script):
+        return 1
+
+    def find_elements(self, by, selector):
+        return [None] if self.page_source else []
+
+    def quit(self):
+        pass
+
+
+@contextmanager
+def replay(entries: list[dict]):
+    """Branche le scraper sur le corpus : Selenium seul, faux driver, pas de cache disque.
+    L'attente de readiness (propre à Chrome) est court-circuitée.
+    Retourne la liste des durées de _make_soup (s) de l'appel en cours.
+    """
+    pages = {e["url"]: e["html"] for e in entries}
+    soup_times: list[float] = []
+    make_soup = opgg_scraper._make_soup
+
+    def timed_make_soup(html, only=None):
+        start = time.perf_counter()
+        try:
+            return make_soup(html, only)
+        finally:
+            soup_times.append(time.perf_counter() - start)
+
+    patches = {
+        "FETCH_MODE": "selenium",
+        "RECORD_DIR": "",
+        "_pool": opgg_scraper.DriverPool(size=1, factory=lambda headless: ReplayDriver(pages)),
+        "_wait_for_page": lambda driver, page: True,
+        "_load_cache": lambda cache_key: (None, None),
+        "_write_cache": lambda cache_key, data, ttl_h=None: None,
+        "_make_soup": timed_make_soup,
+    }
+    originals = {name: getattr(opgg_scraper, name) for name in patches}
+    for name, value in patches.items():
+        setattr(opgg_scraper, name, value)
+    try:
+        yield soup_times
+    finally:
+        opgg_scraper._pool.close()
+        for name, value in originals.items():
+            setattr(opgg_scraper, name, value)
+
+
+# ---------------------------------------------------------------------------
+# Appels rejoués (reconstruits depuis l'URL enregistrée)
+# ---------------------------------------------------------------------------
+
+def _replay_call(entry: dict):
+    """(nom de la fonction mesurée, appel sans argument) pour une entrée du corpus."""
+    url = urlparse(entry["url"])
+    query = {k: v[0] for k, v in parse_qs(url.query).items()}
+    parts = url.path.strip("/").split("/")  # lol/champions/<slug>/build/<position>
+    region = query.get("region", "euw")
+    page = entry["page"]
+    if page == "tierlist":
+        return "fetch_champion_stats", lambda: opgg_scraper.fetch_champion_stats(
+            region, query.get("tier", "emerald_plus"), query.get("position", "mid"))
+    if page == "build":
+        return "fetch_champion_build", lambda: opgg_scraper.fetch_champion_build(parts[2], parts[4], region)
+    if page == "matchups":
+        role = parts[4] if len(parts) > 4 else ""
+        return "fetch_champion_matchups", lambda: opgg_scraper.fetch_champion_matchups(parts[2], role, region)
+    if page == "player_champions":
+        def extract():
+            profile = {"most_played": []}
+            opgg_scraper._extract_champion_table(opgg_scraper._make_soup(entry["html"], only="table"), profile)
+            return profile["most_played"]
+        return "_extract_champion_table", extract
+    if page == "summary":
+        return "_parse_player_summary", lambda: opgg_scraper._parse_player_summary(entry["html"])
+    raise ValueError(f"Type de page inconnu : {page}")
+
+
+def _check(entry: dict, result) -> str:
+    expected_file = entry["expected_file"]
+    if expected_file is None or not expected_file.exists():
+        return "-"
+    expected = json.loads(expected_file.read_text(encoding="utf-8"))
+    # Aller-retour JSON : tuples / clés non str comparés comme dans le fichier enregistré
+    return "ok" if json.loads(json.dumps(result, ensure_ascii=False)) == expected else "DIFF"
+
+
+def run(entries: list[dict], repeat: int, save_expected: bool = False) -> list[dict]:
+    rows = []
+    with replay(entries) as soup_times:
+        for entry in entries:
+            name, call = _replay_call(entry)
+            totals, parses = [], []
+            result = None
+            for _ in range(repeat):
+                soup_times.clear()
+                start = time.perf_counter()
+                result = call()
+                totals.append((time.perf_counter() - start) * 1000)
+                parses.append(sum(soup_times) * 1000)
+            if save_expected and entry["expected_file"] is not None:
+                entry["expected_file"].write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+            total_ms = statistics.median(totals)
+            parse_ms = statistics.median(parses)
+            rows.append({
+                "function": name,
+                "url": entry["url"],
+                "size_kb": len(entry["html"]) / 1024,
+                "total_ms": total_ms,
+                "parse_ms": parse_ms,
+                "extract_ms": max(0.0, total_ms - parse_ms),
+                "check": _check(entry, result),
+            })
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Enregistrement (live)
+# ---------------------------------------------------------------------------
+
+def record(corpus: Path, args):
+    """Lance les fetchers en live (cache disque ignoré) avec l'enregistrement activé."""
+    opgg_scraper.RECORD_DIR = str(corpus)
+    opgg_scraper._load_cache = lambda cache_key: (None, None)
+    try:
+        opgg_scraper.fetch_champion_stats(args.region, args.tier, args.role)
+        for champion in args.champion:
+            opgg_scraper.fetch_champion_build(champion, args.role, args.region)
+            opgg_scraper.fetch_champion_matchups(champion, opgg_scraper.ROLE_TO_POSITION.get(args.role, args.role),
+                                                 args.region)
+        for summoner in args.summoner:
+            opgg_scraper.fetch_player_profile(summoner, args.region)
+    finally:
+        opgg_scraper.close_driver()
+    print(f"[*] Corpus : {corpus} ({len(load_corpus(corpus))} pages)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark / non-régression du scraper sur pages enregistrées")
+    parser.add_argument("mode", nargs="?", choices=["replay", "record"], default="replay")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-expected", action="store_true", help="réécrit les résultats attendus")
+    parser.add_argument("--region", default="euw")
+    parser.add_argument("--tier", default="emerald_plus")
+    parser.add_argument("--role", default="mid")
+    parser.add_argument("--champion", nargs="*", default=["Ahri"])
+    parser.add_argument("--summoner", nargs="*", default=[])
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    if args.mode == "record":
+        record(corpus, args)
+        return
+
+    entries = load_corpus(corpus)
+    if not (corpus / "index.json").exists():
+        print(f"[!] Pas de corpus dans {corpus} : {FALLBACK_HTML.name} rejouée pour chaque type de page")
+    print(f"[*] {len(entries)} pages, médiane sur {args.repeat} runs, backend {opgg_scraper._parser_features()}")
+    print(f"{'fonction':<26} {'Ko':>6} {'total ms':>9} {'parse ms':>9} {'extract ms':>11} {'check':>6}  url")
+    rows = run(entries, args.repeat, args.save_expected)
+    for r in rows:
+        print(f"{r['function']:<26} {r['size_kb']:>6.0f} {r['total_ms']:>9.1f} {r['parse_ms']:>9.1f} "
+              f"{r['extract_ms']:>11.1f} {r['check']:>6}  {r['url']}")
+    if any(r["check"] == "DIFF" for r in rows):
+        print("[!] Résultats différents du corpus enregistré")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
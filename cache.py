@@ -0,0 +1,230 @@
+"""
+Cache mémoire pour DraftForMe.
+- LRUCache : entrées avec TTL, éviction LRU, plafond en nombre d'entrées et en octets
+- SingleFlight : coalescing des appels concurrents sur une même clé
+- BackgroundRefresher : file bornée de rafraîchissements exécutés en arrière-plan
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_size(value) -> int:
+    """Taille approximative d'une valeur JSON-sérialisable (en octets)."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class LRUCache:
+    """Cache thread-safe : TTL par entrée, éviction LRU au-delà de max_entries / max_bytes."""
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 32 * 1024 * 1024,
+                 default_ttl: float | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None, size: int | None = None):
+        """`size` (octets) remplace l'estimation JSON pour les valeurs non sérialisables."""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if size > self.max_bytes:
+                return  # trop gros pour le cache
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Un seul appel en cours par clé : le premier appelant exécute fn(),
+    les suivants attendent et reçoivent le même résultat (ou la même exception).
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn, timeout: float | None = None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+        else:
+            timeout = self.timeout if timeout is None else timeout
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Attente du résultat de {key!r} > {timeout}s")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> list:
+        with self._lock:
+            return list(self._calls)
+
+
+class BackgroundRefresher:
+    """Exécute des rafraîchissements en arrière-plan.
+    - file bornée (submit() refuse quand elle est pleine)
+    - une clé déjà en attente / en cours n'est pas ajoutée deux fois
+    - statut consultable par clé (queued, running, done, failed)
+    Les threads workers sont démarrés au premier submit().
+    """
+
+    def __init__(self, workers: int = 1, max_queue: int = 64, history: int = 256):
+        self.workers = max(1, workers)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._status: OrderedDict = OrderedDict()  # key -> dict
+        self._history = history
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self.rejected = 0
+
+    def submit(self, key, fn) -> bool:
+        """Planifie fn() pour la clé. Retourne False si déjà planifié ou file pleine."""
+        with self._lock:
+            current = self._status.get(key)
+            if current and current["state"] in ("queued", "running"):
+                return False
+            try:
+                self._queue.put_nowait((key, fn))
+            except queue.Full:
+                self.rejected += 1
+                return False
+            self._set_status(key, state="queued", queued_at=time.time(), error=None)
+            self._ensure_workers()
+        return True
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._run, name="cache-refresh", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _set_status(self, key, **fields):
+        entry = self._status.pop(key, {})
+        entry.update(fields)
+        self._status[key] = entry
+        while len(self._status) > self._history:
+            self._status.popitem(last=False)
+
+    def _run(self):
+        while True:
+            key, fn = self._queue.get()
+            with self._lock:
+                self._set_status(key, state="running", started_at=time.time())
+            try:
+                fn()
+            except Exception as e:
+                with self._lock:
+                    self._set_status(key, state="failed", finished_at=time.time(), error=str(e))
+            else:
+                with self._lock:
+                    self._set_status(key, state="done", finished_at=time.time())
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """Attend que la file soit vide (utile en CLI / tests)."""
+        self._queue.join()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "rejected": self.rejected,
+                "keys": {str(k): dict(v) for k, v in self._status.items()},
+            }
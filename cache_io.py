@@ -0,0 +1,153 @@
+"""
+Lecture / écriture sûres des caches JSON sur disque (data/<clé>.json), partagés entre
+threads et entre processus (plusieurs workers gunicorn sur le même data/) :
+- écriture dans un fichier temporaire puis os.replace() : jamais de fichier tronqué
+- verrou inter-processus (fcntl.flock / msvcrt.locking) sur data/.locks/<n>.lock, un des
+  LOCK_STRIPES fichiers choisi par hachage du nom : partagé pour les lectures, exclusif pour
+  les écritures (nombre de fichiers .lock borné, quel que soit le nombre de clés)
+- somme de contrôle SHA-256 du contenu, vérifiée à la lecture
+- les fichiers corrompus sont déplacés dans data/quarantine/ au lieu de faire planter json.loads
+
+Format : {"sha256":"<hex>","data":<contenu>} (JSON valide). Les fichiers sans somme de
+contrôle (anciens caches, fichiers versionnés) restent lisibles tels quels.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = ".locks"
+LOCK_STRIPES = 64  # deux clés peuvent partager un verrou : ne jamais en imbriquer deux
+QUARANTINE_DIR = "quarantine"
+_PREFIX = '{"sha256":"'
+_DATA_SEP = '","data":'
+_HEADER_LEN = len(_PREFIX) + 64 + len(_DATA_SEP)
+
+
+class CorruptCacheError(ValueError):
+    """Fichier de cache illisible ou dont la somme de contrôle ne correspond pas."""
+
+
+def _lock_path(path: Path) -> Path:
+    stripe = int.from_bytes(hashlib.sha1(path.name.encode("utf-8")).digest()[:4], "big") % LOCK_STRIPES
+    return path.parent / LOCK_DIR / f"{stripe:02d}.lock"
+
+
+@contextmanager
+def file_lock(path: str | Path, exclusive: bool = True):
+    """Verrou inter-processus sur `path` (via un fichier .lock partagé par plusieurs clés,
+    qui survit aux os.replace).
+    Sous Windows, msvcrt n'a pas de verrou partagé : les lectures sont aussi exclusives.
+    """
+    lock_file = _lock_path(Path(path))
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # réessaie 10 s puis OSError
+                    break
+                except OSError:
+                    continue
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+def dumps_checked(data, indent: int | None = 2) -> str:
+    payload = json.dumps(data, ensure_ascii=False, indent=indent)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{_PREFIX}{digest}{_DATA_SEP}{payload}}}"
+
+
+def loads_checked(text: str):
+    """Contenu d'un fichier de cache ; CorruptCacheError si illisible ou altéré."""
+    if text.startswith(_PREFIX):
+        digest = text[len(_PREFIX):len(_PREFIX) + 64]
+        payload = text[_HEADER_LEN:-1]
+        if (text[len(_PREFIX) + 64:_HEADER_LEN] != _DATA_SEP or not text.endswith("}")
+                or hashlib.sha256(payload.encode("utf-8")).hexdigest() != digest):
+            raise CorruptCacheError("somme de contrôle invalide")
+        text = payload
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise CorruptCacheError(f"JSON invalide : {e}") from e
+
+
+def atomic_write_text(path: str | Path, text: str):
+    """Écrit dans un fichier temporaire du même dossier puis le renomme sur `path`."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def write_json(path: str | Path, data):
+    """Écriture atomique, sous verrou exclusif, avec somme de contrôle."""
+    path = Path(path)
+    text = dumps_checked(data)
+    with file_lock(path, exclusive=True):
+        atomic_write_text(path, text)
+
+
+def read_json(path: str | Path):
+    """(contenu, mtime) de `path`, ou (None, None) s'il n'existe pas. Lève CorruptCacheError."""
+    path = Path(path)
+    if not path.exists():
+        return None, None
+    with file_lock(path, exclusive=False):
+        try:
+            mtime = path.stat().st_mtime
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None, None
+        except UnicodeDecodeError as e:
+            raise CorruptCacheError(f"encodage invalide : {e}") from e
+    return loads_checked(text), mtime
+
+
+def quarantine(path: str | Path) -> Path | None:
+    """Déplace un fichier corrompu dans quarantine/ (s'il l'est toujours sous verrou exclusif).
+    Retourne sa nouvelle place, ou None s'il a été réécrit correctement entre-temps.
+    """
+    path = Path(path)
+    with file_lock(path, exclusive=True):
+        try:
+            loads_checked(path.read_text(encoding="utf-8"))
+            return None
+        except FileNotFoundError:
+            return None
+        except (CorruptCacheError, UnicodeDecodeError):
+            pass
+        target = path.parent / QUARANTINE_DIR / f"{path.name}.{time.strftime('%Y%m%dT%H%M%S')}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+        return target
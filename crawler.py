@@ -0,0 +1,298 @@
+"""
+Crawler de préchauffage des caches op.gg (tier lists, matchups, builds).
+
+Parcourt une matrice régions x rôles x tiers et remplit les caches disque avant que les
+utilisateurs n'en aient besoin (premier utilisateur d'une région après un patch compris) :
+  1. tier list de chaque (région, tier, rôle) ;
+  2. matchups et build de chaque champion de ces tier lists, par (région, rôle)
+     (ces caches ne dépendent pas du tier : un champion présent dans plusieurs tiers
+     n'est scrapé qu'une fois).
+Un cache est rafraîchi dès qu'il a dépassé REFRESH_AHEAD x son TTL. En mode --loop, la
+passe suivante démarre (1 - REFRESH_AHEAD) x (plus petit TTL) - durée de la passe après le
+début de la précédente : un cache jugé assez récent est revu avant d'expirer, tant que les
+passes durent moins de (1 - REFRESH_AHEAD) / 2 x ce TTL (36 min pour 6 h) et de façon stable.
+
+Concurrence bornée (--concurrency) ; le débit vers op.gg est réglé par le limiteur adaptatif
+du scraper (ratelimit.py, --max-rate le plafonne en plus) et la passe se met en pause tant
+que le circuit op.gg est ouvert. État sauvegardé dans data/crawl_state.json : après une
+interruption, --resume reprend là où on s'était arrêté. Un rapport (compteurs par type et
+statut, erreurs) est affiché en fin de passe.
+
+    python crawler.py --regions euw kr --tiers emerald_plus diamond_plus
+    python crawler.py --resume
+    python crawler.py --loop --report data/crawl_report.json
+    python opgg_scraper.py --crawl --regions euw   (équivalent)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import opgg_scraper
+from cache_io import CorruptCacheError, read_json, write_json
+from ratelimit import CircuitOpenError, TokenBucket
+
+DEFAULT_STATE = opgg_scraper.DATA_DIR / "crawl_state.json"
+CHAMPION_KINDS = ("matchups", "build")  # les tier lists sont toujours crawlées (liste des champions)
+REFRESH_AHEAD = 0.8  # fraction du TTL au-delà de laquelle un cache est rafraîchi
+DEFAULT_MAX_RATE = 0.0  # scrapes lancés par seconde, au plus (0 = limiteur adaptatif seul)
+MAX_CIRCUIT_WAITS = 10  # pauses successives (circuit op.gg ouvert) avant d'abandonner une tâche
+STATE_SAVE_INTERVAL = 5.0  # secondes entre deux sauvegardes de l'état
+MAX_REPORTED_ERRORS = 20
+DONE_STATUSES = ("ok", "fresh", "empty")  # statuts sautés par --resume (les erreurs sont retentées)
+
+_HAS_DATA = {
+    "tierlist": bool,
+    "matchups": lambda r: bool(r and r.get("all_matchups")),
+    "build": lambda r: bool(r and r.get("core_items")),
+}
+
+
+class Crawler:
+    def __init__(self, regions: list[str], roles: list[str], tiers: list[str], kinds=CHAMPION_KINDS,
+                 concurrency: int = opgg_scraper.DRIVER_POOL_SIZE, max_rate: float = DEFAULT_MAX_RATE,
+                 refresh_ahead: float = REFRESH_AHEAD, state_path: str | Path = DEFAULT_STATE,
+                 resume: bool = False, progress=None):
+        self.matrix = {
+            "regions": list(regions),
+            "roles": [opgg_scraper.ROLE_TO_POSITION.get(r, r) for r in roles],
+            "tiers": list(tiers),
+            "kinds": [k for k in CHAMPION_KINDS if k in kinds],
+        }
+        self.concurrency = max(1, concurrency)
+        self.refresh_ahead = refresh_ahead
+        self.state_path = Path(state_path)
+        self.progress = progress
+        self._limiter = TokenBucket(max_rate) if max_rate > 0 else None  # départs espacés de 1 / max_rate s
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._counts: dict[str, dict] = {}
+        self._errors: list[dict] = []
+        self.state = self._load_state() if resume else None
+        if self.state is None:
+            self.state = {"matrix": self.matrix, "started_at": time.time(), "tasks": {}}
+
+    # --- État (reprise après interruption) ---
+
+    def _load_state(self) -> dict | None:
+        try:
+            state, _ = read_json(self.state_path)
+        except CorruptCacheError as e:
+            print(f"[!] État du crawler illisible ({e}) : nouvelle passe")
+            return None
+        if state is None:
+            return None
+        if state.get("matrix") != self.matrix:
+            print("[!] État du crawler pour une autre matrice : nouvelle passe")
+            return None
+        return state
+
+    def _record(self, cache_key: str, status: str, error: str | None = None):
+        with self._lock:
+            entry = {"status": status, "at": time.time()}
+            if error:
+                entry["error"] = error
+            self.state["tasks"][cache_key] = entry
+            if time.monotonic() - self._saved_at >= STATE_SAVE_INTERVAL:
+                self._save_state()
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(self.state_path, self.state)
+        self._saved_at = time.monotonic()
+
+    # --- Tâches ---
+
+    def _tierlist_tasks(self) -> list[tuple]:
+        return [
+            ("tierlist", f"tierlist_{region}_{tier}_{position}",
+             lambda r=region, t=tier, p=position: opgg_scraper.fetch_champion_stats(r, t, p))
+            for region in self.matrix["regions"]
+            for position in self.matrix["roles"]
+            for tier in self.matrix["tiers"]
+        ]
+
+    def _champion_tasks(self, tierlists: dict[tuple, list[dict]]) -> list[tuple]:
+        """Matchups / builds des champions des tier lists, dédupliqués par clé de cache."""
+        tasks = {}
+        for (region, position), champions in tierlists.items():
+            for c in champions:
+                name = c.get("name")
+                if not name:
+                    continue
+                slug = opgg_scraper.champion_slug(c)
+                if "matchups" in self.matrix["kinds"]:
+                    tasks.setdefault(f"matchups_{slug}_{position}_{region}", (
+                        "matchups", lambda n=name, s=slug, p=position, r=region:
+                            opgg_scraper.fetch_champion_matchups(n, p, r, slug=s)))
+                if "build" in self.matrix["kinds"]:
+                    tasks.setdefault(f"build_{slug}_{position}_{region}", (
+                        "build", lambda s=slug, p=position, r=region: opgg_scraper.fetch_champion_build(s, p, r)))
+        return [(kind, key, fetch) for key, (kind, fetch) in tasks.items()]
+
+    def _run_task(self, kind: str, cache_key: str, fetch):
+        """(statut, données) : "fresh" si le cache est assez récent, sinon scrape -> "ok" / "empty"."""
+        max_age_h = opgg_scraper.CACHE_TTL_H[kind] * self.refresh_ahead
+        data, age_h = opgg_scraper.load_cache(cache_key)
+        if data is not None and age_h < max_age_h:
+            return "fresh", data
+        for waits in range(MAX_CIRCUIT_WAITS + 1):
+            if self._limiter is not None:
+                self._limiter.acquire()
+            try:
+                with opgg_scraper.refresh_older_than(max_age_h):
+                    data = fetch()
+                break
+            except CircuitOpenError as e:
+                # op.gg dégradé : pause au lieu d'enchaîner les échecs sur toute la matrice
+                if waits == MAX_CIRCUIT_WAITS:
+                    raise
+                time.sleep(max(1.0, e.retry_in))
+        return ("ok" if _HAS_DATA[kind](data) else "empty"), data
+
+    def _run_phase(self, tasks: list[tuple], on_data=None):
+        """Exécute les tâches (sauf celles déjà faites d'après l'état), au plus `concurrency` à la fois."""
+        done_before = self.state["tasks"]
+        todo = []
+        for kind, key, fetch in tasks:
+            if done_before.get(key, {}).get("status") in DONE_STATUSES:
+                if on_data:
+                    on_data(key, opgg_scraper.load_cache(key)[0])
+                self._count(kind, "resumed")
+            else:
+                todo.append((kind, key, fetch))
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crawl")
+        try:
+            futures = {executor.submit(self._run_task, *task): task for task in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                kind, key, _ = futures[future]
+                try:
+                    status, data = future.result()
+                except Exception as e:
+                    status, data = "error", None
+                    self._record(key, status, f"{type(e).__name__}: {e}")
+                    self._errors.append({"key": key, "error": f"{type(e).__name__}: {e}"})
+                else:
+                    self._record(key, status)
+                self._count(kind, status)
+                if on_data and data:
+                    on_data(key, data)
+                if self.progress:
+                    self.progress(done, len(todo), key, status)
+        finally:
+            # Interruption : les tâches pas encore lancées sont abandonnées (reprise avec --resume)
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _count(self, kind: str, status: str):
+        with self._lock:
+            counts = self._counts.setdefault(kind, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    # --- Passe complète ---
+
+    def run(self) -> dict:
+        """Une passe sur toute la matrice. Retourne le rapport (aussi en cas d'interruption)."""
+        self._counts, self._errors = {}, []
+        start = time.time()
+        interrupted = False
+        tierlists: dict[tuple, list[dict]] = {}
+
+        def collect(cache_key, data):
+            _, region, rest = cache_key.split("_", 2)
+            position = rest.rsplit("_", 1)[1]
+            champions = tierlists.setdefault((region, position), [])
+            champions += [c for c in data or [] if c not in champions]
+
+        try:
+            self._run_phase(self._tierlist_tasks(), collect)
+            self._run_phase(self._champion_tasks(tierlists))
+        except KeyboardInterrupt:
+            interrupted = True
+        finally:
+            with self._lock:
+                self._save_state()
+
+        return {
+            "matrix": self.matrix,
+            "started_at": start,
+            "duration_s": round(time.time() - start, 1),
+            "interrupted": interrupted,
+            "counts": self._counts,
+            "errors": self._errors[:MAX_REPORTED_ERRORS],
+            "error_count": len(self._errors),
+        }
+
+    def next_pass_in(self, duration_s: float = 0.0) -> float:
+        """Secondes entre la fin d'une passe de `duration_s` s et la suivante.
+        Un cache laissé tel quel (âge < refresh_ahead x TTL) doit être revu avant d'expirer :
+        d'un passage au suivant il s'écoule au plus l'intervalle entre deux débuts de passe plus
+        la durée d'une passe, soit (1 - refresh_ahead) x (plus petit TTL) si la durée est stable.
+        """
+        ttl_h = min(opgg_scraper.CACHE_TTL_H[k] for k in ("tierlist", *self.matrix["kinds"]))
+        return max(0.0, ttl_h * (1 - self.refresh_ahead) * 3600 - 2 * duration_s)
+
+
+def print_report(report: dict):
+    status = "interrompue" if report["interrupted"] else "terminée"
+    print(f"[*] Passe {status} en {report['duration_s']} s")
+    for kind, counts in report["counts"].items():
+        detail = ", ".join(f"{n} {s}" for s, n in sorted(counts.items()))
+        print(f"    {kind:<9} {detail}")
+    if report["error_count"]:
+        print(f"[!] {report['error_count']} erreur(s) :")
+        for e in report["errors"]:
+            print(f"    {e['key']} : {e['error']}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Préchauffage des caches op.gg (régions x rôles x tiers)")
+    parser.add_argument("--regions", nargs="+", default=["euw"], choices=opgg_scraper.REGIONS)
+    parser.add_argument("--roles", nargs="+", default=opgg_scraper.ROLES,
+                        choices=sorted(opgg_scraper.ROLE_TO_POSITION))
+    parser.add_argument("--tiers", nargs="+", default=["emerald_plus"], choices=opgg_scraper.TIERS)
+    parser.add_argument("--kinds", nargs="+", default=list(CHAMPION_KINDS), choices=CHAMPION_KINDS,
+                        help="caches par champion à remplir en plus des tier lists")
+    parser.add_argument("--concurrency", type=int, default=opgg_scraper.DRIVER_POOL_SIZE)
+    parser.add_argument("--max-rate", type=float, default=DEFAULT_MAX_RATE,
+                        help="plafond de scrapes par seconde (0 = limiteur adaptatif du scraper seul)")
+    parser.add_argument("--refresh-ahead", type=float, default=REFRESH_AHEAD,
+                        help="rafraîchit les caches plus vieux que cette fraction de leur TTL")
+    parser.add_argument("--state", default=str(DEFAULT_STATE))
+    parser.add_argument("--resume", action="store_true", help="reprend la dernière passe interrompue")
+    parser.add_argument("--loop", action="store_true", help="repasse selon les TTL des caches")
+    parser.add_argument("--report", help="fichier JSON du rapport de la dernière passe")
+    args = parser.parse_args(argv)
+
+    def progress(done, total, key, status):
+        print(f"    [{done}/{total}] {key} {status}")
+
+    resume = args.resume
+    try:
+        while True:
+            crawler = Crawler(args.regions, args.roles, args.tiers, args.kinds, args.concurrency,
+                              args.max_rate, args.refresh_ahead, args.state, resume, progress)
+            print(f"[*] Crawl {crawler.matrix['regions']} x {crawler.matrix['roles']} x {crawler.matrix['tiers']}")
+            report = crawler.run()
+            print_report(report)
+            if args.report:
+                Path(args.report).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+            if report["interrupted"] or not args.loop:
+                return 1 if report["interrupted"] or report["error_count"] else 0
+            delay = crawler.next_pass_in(report["duration_s"])
+            print(f"[*] Prochaine passe dans {delay / 3600:.1f} h")
+            time.sleep(delay)
+            resume = False
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        opgg_scraper.close_driver()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,292 @@
+"""
+Sessions de draft pour DraftForMe.
+
+Une session garde l'état de la draft (bans, picks, priorité) et les composantes de
+score de chaque champion de la tier list. Chaque action ne met à jour que ce qu'elle
+touche, au lieu de rescorer toute la tier list à chaque clic :
+  - ban / pick : le champion sort du classement, l'ordre des autres ne change pas
+  - pick ennemi : une colonne de la matrice de matchups est ajoutée aux sommes counter
+  - pick allié : une colonne de la table de synergie est ajoutée aux sommes synergie
+  - priorité : nouveaux poids, les composantes sont réutilisées
+Les recommandations sont identiques à celles de recommend_champions() pour le même état.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from recommendation import (
+    ChampionStatsSnapshot,
+    MatchupMatrix,
+    SynergyTable,
+    _compute_weights,
+    _has_pool,
+    format_recommendation,
+    score_candidates,
+)
+
+# Listes d'état de la session -> (action d'ajout, action de retrait)
+LIST_ACTIONS = {
+    "banned": ("ban", "unban"),
+    "already_picked": ("pick", "unpick"),
+    "enemy_picks": ("enemy_pick", "remove_enemy"),
+    "ally_picks": ("ally_pick", "remove_ally"),
+}
+# Actions acceptées par DraftSession.apply() : op -> (liste d'état, ajout ?)
+LIST_OPS = {op: (attr, op == ops[0]) for attr, ops in LIST_ACTIONS.items() for op in ops}
+# Listes dont les champions sortent du classement (comme dans recommend_champions)
+EXCLUDING = ("banned", "already_picked", "ally_picks")
+
+
+def _round1(values: np.ndarray) -> np.ndarray:
+    """round(v, 1) vectorisé. np.round peut différer de round() à ±1 ulp près d'une demie :
+    ces valeurs-là sont arrondies une par une.
+    """
+    scaled = values * 10
+    rounded = np.rint(scaled) / 10
+    for k in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6):
+        rounded[k] = round(float(values[k]), 1)
+    return rounded
+
+
+class DraftSession:
+    def __init__(
+        self,
+        all_champion_stats: list[dict] | ChampionStatsSnapshot,
+        player_pool: list[dict],
+        matchup_data: dict[str, dict] | None = None,
+        matchup_matrix: MatchupMatrix | None = None,
+        synergy: SynergyTable | None = None,
+        synergy_loader=None,
+        priority: int = 50,
+        top_n: int = 10,
+        key=None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.key = key  # (region, tier, position) de la tier list
+        self.created_at = self.updated_at = time.time()
+        self.snapshot = ChampionStatsSnapshot.of(all_champion_stats)
+        if matchup_matrix is None:
+            matchup_matrix = MatchupMatrix.from_matchup_data(matchup_data or {})
+        self.matrix = matchup_matrix
+        self.synergy = synergy
+        # Sans table fournie : synergy_loader() est appelé au premier pick allié
+        self._synergy_loader = synergy_loader if synergy is None else None
+        self.priority = priority
+        self.top_n = top_n
+        self.player_pool: list[dict] = []
+        self.banned: list[str] = []
+        self.already_picked: list[str] = []
+        self.enemy_picks: list[str] = []
+        self.ally_picks: list[str] = []
+        self.lock = threading.Lock()
+
+        n = len(self.snapshot)
+        self._all = np.arange(n)
+        self._rows = self.snapshot.matrix_rows(matchup_matrix)
+        self._synergy_ids = self.snapshot.synergy_ids(synergy) if synergy is not None else None
+        self._eligible = self.snapshot.valid.copy()
+        self._counter_total = np.zeros(n)
+        self._synergy_total = np.zeros(n, dtype=np.int64)
+        self._base: dict = {}
+        self._scores: dict | None = None
+        self._ranking: list[int] | None = None  # positions éligibles, meilleur score d'abord
+        self._set_pool(player_pool)
+
+    # -- composantes ---------------------------------------------------------
+
+    def _set_pool(self, player_pool: list[dict]):
+        """Meta / joueur ne dépendent que du pool : calculés une fois pour toute la tier list."""
+        self.player_pool = list(player_pool)
+        self._base = score_candidates(self.snapshot, self._all, self.player_pool, [], {}, self.priority)
+        self._has_pool = _has_pool(self.player_pool)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._scores = None
+        self._ranking = None
+
+    def _enemy_column(self, enemy: str) -> np.ndarray:
+        return self.matrix.counter_deltas(self._rows, [enemy])[:, 0]
+
+    def _recompute_counter(self):
+        # Même ordre de sommation que counter_scores_for_rows
+        self._counter_total = np.zeros(len(self.snapshot))
+        for enemy in self.enemy_picks:
+            self._counter_total += self._enemy_column(enemy)
+
+    def _refresh_eligibility(self, name: str):
+        excluded = {n.lower() for attr in EXCLUDING for n in getattr(self, attr)}
+        for i in self.snapshot.index.get(name.lower(), ()):
+            eligible = bool(self.snapshot.valid[i]) and name.lower() not in excluded
+            if eligible == self._eligible[i]:
+                continue
+            self._eligible[i] = eligible
+            if self._ranking is None:
+                continue
+            rounded = self._scores["rounded"]
+            pos = bisect.bisect_left(self._ranking, (-rounded[i], i), key=lambda j: (-rounded[j], j))
+            if eligible:  # réinséré à sa place : le classement reste trié
+                self._ranking.insert(pos, i)
+            else:
+                del self._ranking[pos]
+
+    def set_matrix(self, matrix: MatchupMatrix):
+        """Passe sur une matrice de matchups plus récente (cache complété par le préchargement) :
+        lignes et sommes counter recalculées.
+        """
+        self.matrix = matrix
+        self._rows = self.snapshot.matrix_rows(matrix)
+        self._recompute_counter()
+        self._invalidate()
+
+    def _resolve_synergy(self) -> bool:
+        """Charge la table de synergie via synergy_loader (None = réessayé au prochain pick allié).
+        True si elle vient d'être chargée : les sommes synergie sont recalculées sur tous les alliés.
+        """
+        if self.synergy is not None or self._synergy_loader is None:
+            return False
+        synergy = self._synergy_loader()
+        if synergy is None:
+            return False
+        self.synergy, self._synergy_loader = synergy, None
+        self._synergy_ids = self.snapshot.synergy_ids(synergy)
+        self._synergy_total = np.zeros(len(self.snapshot), dtype=np.int64)
+        for ally in self.ally_picks:
+            self._synergy_total += synergy.column(self._synergy_ids, ally)
+        return True
+
+    # -- actions -------------------------------------------------------------
+
+    def _add(self, attr: str, name: str):
+        names = getattr(self, attr)
+        if name.lower() in (n.lower() for n in names):
+            return
+        names.append(name)
+        if attr == "enemy_picks":
+            self._counter_total += self._enemy_column(name)
+            self._invalidate()
+        elif attr == "ally_picks" and self._resolve_synergy():
+            self._invalidate()
+        elif attr == "ally_picks" and self.synergy is not None:
+            self._synergy_total += self.synergy.column(self._synergy_ids, name)
+            self._invalidate()
+        if attr in EXCLUDING:
+            self._refresh_eligibility(name)
+
+    def _remove(self, attr: str, name: str):
+        names = getattr(self, attr)
+        for k, n in enumerate(names):
+            if n.lower() == name.lower():
+                removed = names.pop(k)
+                break
+        else:
+            return
+        if attr == "enemy_picks":
+            self._recompute_counter()
+            self._invalidate()
+        elif attr == "ally_picks" and self.synergy is not None:
+            self._synergy_total -= self.synergy.column(self._synergy_ids, removed)
+            self._invalidate()
+        if attr in EXCLUDING:
+            self._refresh_eligibility(removed)
+
+    def apply(self, actions: list[dict]):
+        """Applique des actions : [{"op": "ban", "champion": "Zed"}, {"op": "priority", "value": 70}, ...]"""
+        for action in actions:
+            op = action.get("op")
+            if op in LIST_OPS:
+                attr, add = LIST_OPS[op]
+                name = action.get("champion")
+                if not name:
+                    raise ValueError(f"Action '{op}' sans champion")
+                (self._add if add else self._remove)(attr, name)
+            elif op == "priority":
+                self.priority = action.get("value", 50)
+                self._invalidate()
+            elif op == "player_pool":
+                self._set_pool(action.get("value") or [])
+            elif op == "top_n":
+                self.top_n = action.get("value", 10)
+            else:
+                raise ValueError(f"Action inconnue : {op!r}")
+        self.updated_at = time.time()
+
+    def sync(self, state: dict):
+        """Aligne la session sur un état complet (body de /api/recommend) en ne rejouant que les différences."""
+        actions = []
+        for attr, (add_op, remove_op) in LIST_ACTIONS.items():
+            if attr not in state:
+                continue
+            current = {n.lower() for n in getattr(self, attr)}
+            wanted = {n.lower() for n in state[attr]}
+            actions += [{"op": remove_op, "champion": n} for n in getattr(self, attr) if n.lower() not in wanted]
+            actions += [{"op": add_op, "champion": n} for n in state[attr] if n.lower() not in current]
+        if "priority" in state and state["priority"] != self.priority:
+            actions.append({"op": "priority", "value": state["priority"]})
+        if "player_pool" in state and state["player_pool"] != self.player_pool:
+            actions.append({"op": "player_pool", "value": state["player_pool"]})
+        if "top_n" in state:
+            actions.append({"op": "top_n", "value": state["top_n"]})
+        self.apply(actions)
+
+        # L'ordre des picks ennemis fixe l'ordre de sommation des scores counter
+        order = [n.lower() for n in state.get("enemy_picks", self.enemy_picks)]
+        if [n.lower() for n in self.enemy_picks] != order:
+            self.enemy_picks.sort(key=lambda n: order.index(n.lower()))
+            self._recompute_counter()
+            self._invalidate()
+
+    # -- scores et classement ------------------------------------------------
+
+    def _rescore(self):
+        base = self._base
+        has_enemy = bool(self.enemy_picks)
+        has_ally = bool(self.ally_picks) and self.synergy is not None
+        cs = (np.clip(50 + self._counter_total / len(self.enemy_picks), 0, 100) if has_enemy
+              else np.full(len(self._all), 50.0))
+        ss = (np.clip(50 + self._synergy_total / len(self.ally_picks), 0, 100) if has_ally
+              else np.full(len(self._all), 50.0))
+        weights = _compute_weights(self.priority, has_enemy, self._has_pool, has_ally)
+        w_meta, w_player, w_counter, w_synergy = weights
+        total = w_meta * base["meta"] + w_player * base["player"] + w_counter * cs + w_synergy * ss
+        rounded = _round1(total)
+        self._scores = {**base, "counter": cs, "synergy": ss, "has_ally": has_ally,
+                        "weights": weights, "total": total, "rounded": rounded}
+
+        idx = np.flatnonzero(self._eligible)
+        self._ranking = idx[np.lexsort((idx, -rounded[idx]))].tolist()
+
+    def recommendations(self, top_n: int | None = None) -> list[dict]:
+        if self._ranking is None:
+            self._rescore()
+        top_n = self.top_n if top_n is None else top_n
+        scores = self._scores
+        return [
+            format_recommendation(self.snapshot, i, scores, i, float(scores["rounded"][i]), bool(self.enemy_picks))
+            for i in self._ranking[:top_n]
+        ]
+
+    def state(self) -> dict:
+        return {
+            "session_id": self.id,
+            "banned": list(self.banned),
+            "already_picked": list(self.already_picked),
+            "enemy_picks": list(self.enemy_picks),
+            "ally_picks": list(self.ally_picks),
+            "priority": self.priority,
+            "top_n": self.top_n,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self._eligible, self._counter_total, self._synergy_total]
+        arrays += [v for v in self._base.values() if isinstance(v, np.ndarray)]
+        return sum(a.nbytes for a in arrays) + 64 * len(self.snapshot)
@@ -0,0 +1,406 @@
+"""
+Simulation de draft pour DraftForMe.
+
+Explore les picks / bans à venir des deux équipes (minimax alpha-beta) et renvoie
+le meilleur pick compte tenu des réponses ennemies probables. Les feuilles sont
+évaluées avec les scores meta / joueur / counter du module recommendation.
+
+La recherche est "anytime" : elle est relancée avec une largeur de beam croissante
+(nos candidats, picks ennemis probables) et garde le résultat de la dernière largeur
+terminée quand le budget de temps ou de noeuds est épuisé. Les coups racine peuvent
+être répartis sur un pool de processus (DRAFTFORME_SIM_WORKERS).
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from recommendation import (
+    ChampionStatsSnapshot,
+    MatchupMatrix,
+    SynergyTable,
+    _compute_weights,
+    _has_pool,
+    score_candidates,
+)
+
+# Étapes d'une séquence de draft
+PICK = "pick"              # notre pick (exactement un par séquence)
+BAN = "ban"                # notre ban : retire un pick ennemi possible
+ENEMY_PICK = "enemy_pick"
+ENEMY_BAN = "enemy_ban"    # ban ennemi : retire un de nos candidats
+STEPS = (PICK, BAN, ENEMY_PICK, ENEMY_BAN)
+DEFAULT_SEQUENCE = (PICK, ENEMY_PICK)
+
+SIM_WORKERS = int(os.environ.get("DRAFTFORME_SIM_WORKERS", "0"))  # 0/1 = dans le processus courant
+DEFAULT_BEAM_WIDTH = 6
+DEFAULT_ENEMY_WIDTH = 8
+DEFAULT_TIME_BUDGET = 5.0      # secondes
+DEFAULT_NODE_BUDGET = 200_000
+MAX_TIME_BUDGET = 30.0         # durée d'une phase de pick en champ select
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Contexte figé d'une simulation
+# ---------------------------------------------------------------------------
+
+class DraftContext:
+    """Scores précalculés d'une simulation (picklable : envoyé tel quel aux workers).
+    ours / theirs : positions (dans le snapshot) de nos candidats, triés par score actuel,
+    et des picks ennemis probables, triés par rang dans la tier list.
+    """
+
+    __slots__ = ("sequence", "names", "ours", "theirs", "our_pos", "their_pos", "meta", "player",
+                 "synergy", "base_sum", "base_n", "deltas", "w_enemy", "w_none")
+
+    def __init__(self, sequence, names, ours, theirs, meta, player, synergy, base_sum, base_n, deltas,
+                 w_enemy, w_none):
+        self.sequence = tuple(sequence)
+        self.names = names
+        self.ours = tuple(ours)
+        self.theirs = tuple(theirs)
+        self.our_pos = {c: i for i, c in enumerate(self.ours)}
+        self.their_pos = {e: j for j, e in enumerate(self.theirs)}
+        self.meta = meta
+        self.player = player
+        self.synergy = synergy    # fixe pendant la simulation (les alliés ne changent pas)
+        self.base_sum = base_sum  # somme des contributions counter contre les picks ennemis connus
+        self.base_n = base_n
+        self.deltas = deltas      # deltas[i][j] : contribution counter de ours[i] contre theirs[j]
+        self.w_enemy = w_enemy
+        self.w_none = w_none
+
+    def leaf_value(self, pick: int, enemies: tuple) -> float:
+        """Score total de notre pick contre les picks ennemis connus + simulés
+        (même formule que recommend_champions).
+        """
+        i = self.our_pos[pick]
+        n = self.base_n + len(enemies)
+        if n == 0:
+            w_meta, w_player, w_counter, w_synergy = self.w_none
+            cs = 50
+        else:
+            w_meta, w_player, w_counter, w_synergy = self.w_enemy
+            row = self.deltas[i]
+            total = self.base_sum[i] + sum(row[self.their_pos[e]] for e in enemies)
+            cs = max(0, min(100, 50 + total / n))
+        return w_meta * self.meta[i] + w_player * self.player[i] + w_counter * cs + w_synergy * self.synergy[i]
+
+
+def build_context(
+    all_champion_stats: list[dict] | ChampionStatsSnapshot,
+    player_pool: list[dict],
+    enemy_picks: list[str],
+    matchup_data: dict[str, dict],
+    banned_champions: list[str],
+    already_picked: list[str],
+    priority: int,
+    sequence=DEFAULT_SEQUENCE,
+    beam_width: int = DEFAULT_BEAM_WIDTH,
+    enemy_width: int = DEFAULT_ENEMY_WIDTH,
+    matchup_matrix: MatchupMatrix | None = None,
+    ally_picks: list[str] | None = None,
+    synergy: SynergyTable | None = None,
+) -> DraftContext:
+    ally_picks = ally_picks or []
+    snapshot = ChampionStatsSnapshot.of(all_champion_stats)
+    eligible = snapshot.valid.copy()
+    for names in (banned_champions, already_picked, enemy_picks, ally_picks):
+        eligible[snapshot.positions(names)] = False
+    idx = np.flatnonzero(eligible)
+
+    # Un ban / pick simulé peut retirer un candidat : on en garde un par étape en réserve
+    spare = len(sequence)
+    scores = score_candidates(snapshot, idx, player_pool, enemy_picks, matchup_data, priority, matchup_matrix,
+                              ally_picks, synergy)
+    order = np.lexsort((idx, -scores["total"]))[:beam_width + spare]
+    ours = idx[order]
+    theirs = idx[np.lexsort((idx, snapshot.ranks[idx]))[:enemy_width + spare]]
+
+    our_names = [snapshot.names[i] for i in ours]
+    enemy_names = list(enemy_picks) + [snapshot.names[e] for e in theirs]
+    matrix = matchup_matrix
+    if matrix is None:
+        matrix = MatchupMatrix.from_matchup_data(matchup_data, champions=our_names, enemies=enemy_names)
+    rows = snapshot.matrix_rows(matrix)[ours] if matchup_matrix is not None else matrix.row_ids(our_names)
+    deltas = matrix.counter_deltas(rows, enemy_names)
+    base_n = len(enemy_picks)
+
+    pool, has_ally = _has_pool(player_pool), scores["has_ally"]
+    return DraftContext(
+        sequence=sequence,
+        names={int(i): snapshot.names[i] for i in np.concatenate([ours, theirs])},
+        ours=[int(c) for c in ours],
+        theirs=[int(e) for e in theirs],
+        meta=scores["meta"][order].tolist(),
+        player=scores["player"][order].tolist(),
+        synergy=scores["synergy"][order].tolist(),
+        base_sum=deltas[:, :base_n].sum(axis=1).tolist(),
+        base_n=base_n,
+        deltas=deltas[:, base_n:].tolist(),
+        w_enemy=_compute_weights(priority, True, pool, has_ally),
+        w_none=_compute_weights(priority, False, pool, has_ally),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Minimax alpha-beta à largeur bornée
+# ---------------------------------------------------------------------------
+
+class _Search:
+    """Nous maximisons le score de notre pick, l'adversaire le minimise,
+    chacun parmi ses `width` / `enemy_width` meilleurs coups.
+    """
+
+    def __init__(self, ctx: DraftContext, width: int, enemy_width: int,
+                 deadline: float | None = None, node_budget: int | None = None):
+        self.ctx = ctx
+        self.width = width
+        self.enemy_width = enemy_width
+        self.deadline = deadline
+        self.node_budget = node_budget
+        self.nodes = 0
+
+    def _tick(self):
+        self.nodes += 1
+        if self.node_budget is not None and self.nodes > self.node_budget:
+            raise _BudgetExceeded
+        if self.deadline is not None and not self.nodes & 63 and time.time() > self.deadline:
+            raise _BudgetExceeded
+
+    def moves(self, step: str, pick, removed: frozenset, after: int = -1) -> list[int]:
+        """Coups possibles. `after` : position minimale (exclue) dans la liste de candidats,
+        pour ne pas énumérer deux fois le même ensemble de bans / picks consécutifs.
+        """
+        ctx = self.ctx
+        if step in (PICK, ENEMY_BAN):
+            if step == ENEMY_BAN and pick is not None:
+                return []  # notre pick est fait : un ban ennemi ne nous concerne plus
+            moves = [c for c in ctx.ours if c not in removed][:self.width]
+            return [c for c in moves if ctx.our_pos[c] > after]
+        moves = [e for e in ctx.theirs if e not in removed][:self.enemy_width]
+        moves = [e for e in moves if ctx.their_pos[e] > after]
+        if step == ENEMY_PICK and pick is not None:
+            # Les réponses les plus dangereuses d'abord : coupures alpha-beta plus précoces
+            row = ctx.deltas[ctx.our_pos[pick]]
+            moves.sort(key=lambda e: row[ctx.their_pos[e]])
+        return moves
+
+    @staticmethod
+    def apply(step: str, move: int, pick, enemies: tuple, removed: frozenset):
+        removed = removed | {move}
+        if step == PICK:
+            return move, enemies, removed
+        if step == ENEMY_PICK:
+            return pick, enemies + (move,), removed
+        return pick, enemies, removed
+
+    def _position(self, step: str, move: int) -> int:
+        return self.ctx.our_pos[move] if step in (PICK, ENEMY_BAN) else self.ctx.their_pos[move]
+
+    def search(self, depth: int, pick, enemies: tuple, removed: frozenset, alpha: float, beta: float,
+               last: int | None = None):
+        """(valeur, variante principale) du sous-arbre à partir de l'étape `depth`.
+        `last` : coup joué à l'étape précédente.
+        """
+        self._tick()
+        sequence = self.ctx.sequence
+        if depth == len(sequence):
+            return (None if pick is None else self.ctx.leaf_value(pick, enemies)), ()
+        step = sequence[depth]
+        # Deux étapes identiques consécutives (même joueur) : seul l'ensemble des coups compte
+        after = -1
+        if depth and last is not None and sequence[depth - 1] == step:
+            after = self._position(step, last)
+        moves = self.moves(step, pick, removed, after)
+        if not moves:
+            return self.search(depth + 1, pick, enemies, removed, alpha, beta)
+
+        maximize = step in (PICK, BAN)
+        best, best_pv = None, ()
+        for move in moves:
+            value, pv = self.search(depth + 1, *self.apply(step, move, pick, enemies, removed), alpha, beta, move)
+            if value is None:
+                continue
+            if best is None or (value > best if maximize else value < best):
+                best, best_pv = value, ((step, move),) + pv
+            if maximize:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return best, best_pv
+
+    def root_moves(self) -> list:
+        return self.moves(self.ctx.sequence[0], None, frozenset()) or [None]
+
+    def root(self, move):
+        """Valeur exacte (fenêtre complète) d'un coup racine."""
+        if move is None:
+            return self.search(1, None, (), frozenset(), -math.inf, math.inf)
+        step = self.ctx.sequence[0]
+        value, pv = self.search(1, *self.apply(step, move, None, (), frozenset()), -math.inf, math.inf, move)
+        return value, ((step, move),) + pv
+
+
+def _evaluate_root_move(task) -> tuple:
+    """Exécuté dans le processus courant ou dans un worker du pool."""
+    ctx, width, enemy_width, deadline, node_budget, move = task
+    search = _Search(ctx, width, enemy_width, deadline, node_budget)
+    try:
+        value, pv = search.root(move)
+    except _BudgetExceeded:
+        return False, None, (), search.nodes
+    return True, value, pv, search.nodes
+
+
+# ---------------------------------------------------------------------------
+# Pool de processus (créé au premier usage)
+# ---------------------------------------------------------------------------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn : pas de fork d'un serveur Flask multi-threadé
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _map(workers: int, tasks: list) -> list:
+    if workers > 1 and len(tasks) > 1:
+        return list(_get_pool(workers).map(_evaluate_root_move, tasks))
+    return [_evaluate_root_move(t) for t in tasks]
+
+
+# ---------------------------------------------------------------------------
+# Point d'entrée
+# ---------------------------------------------------------------------------
+
+def validate_sequence(sequence) -> tuple:
+    sequence = tuple(sequence)
+    unknown = [s for s in sequence if s not in STEPS]
+    if unknown:
+        raise ValueError(f"Étapes inconnues : {unknown} (attendu : {', '.join(STEPS)})")
+    if sequence.count(PICK) != 1:
+        raise ValueError(f"La séquence doit contenir exactement un '{PICK}'")
+    return sequence
+
+
+def simulate_draft(
+    all_champion_stats: list[dict] | ChampionStatsSnapshot,
+    player_pool: list[dict],
+    enemy_picks: list[str] | None = None,
+    matchup_data: dict[str, dict] | None = None,
+    banned_champions: list[str] | None = None,
+    already_picked: list[str] | None = None,
+    priority: int = 50,
+    sequence=DEFAULT_SEQUENCE,
+    beam_width: int = DEFAULT_BEAM_WIDTH,
+    enemy_width: int = DEFAULT_ENEMY_WIDTH,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    node_budget: int = DEFAULT_NODE_BUDGET,
+    workers: int | None = None,
+    matchup_matrix: MatchupMatrix | None = None,
+    ally_picks: list[str] | None = None,
+    synergy: SynergyTable | None = None,
+) -> dict:
+    """Meilleur pick pour la séquence de draft à venir.
+    `sequence` : étapes restantes dans l'ordre, ex. ["enemy_pick", "pick", "enemy_pick"].
+    La première largeur (1 coup par étape) est toujours terminée, quel que soit le budget.
+    """
+    started = time.time()
+    sequence = validate_sequence(sequence)
+    beam_width, enemy_width = max(1, beam_width), max(1, enemy_width)
+    workers = SIM_WORKERS if workers is None else workers
+    ctx = build_context(
+        all_champion_stats, player_pool, enemy_picks or [], matchup_data or {},
+        banned_champions or [], already_picked or [], priority, sequence,
+        beam_width, enemy_width, matchup_matrix, ally_picks, synergy,
+    )
+
+    deadline = started + min(time_budget, MAX_TIME_BUDGET)
+    nodes = 0
+    completed = None  # (largeur, largeur ennemie, résultats des coups racine)
+    levels = max(beam_width, enemy_width)
+    for level in range(1, levels + 1):
+        width, ew = min(level, beam_width), min(level, enemy_width)
+        moves = _Search(ctx, width, ew).root_moves()
+        remaining = node_budget - nodes
+        if level > 1 and (remaining <= 0 or time.time() > deadline):
+            break
+        tasks = [
+            (ctx, width, ew, None, None, m) if level == 1
+            else (ctx, width, ew, deadline, max(1, remaining // len(moves)), m)
+            for m in moves
+        ]
+        outcomes = _map(workers, tasks)
+        nodes += sum(o[3] for o in outcomes)
+        if not all(o[0] for o in outcomes):
+            break
+        completed = (width, ew, [(m, o[1], o[2]) for m, o in zip(moves, outcomes)])
+
+    width, ew, results = completed
+    return _format_result(ctx, results, {
+        "nodes": nodes,
+        "elapsed_ms": round((time.time() - started) * 1000, 1),
+        "beam_width": width,
+        "enemy_width": ew,
+        "complete": (width, ew) == (beam_width, enemy_width),
+        "workers": max(1, workers),
+    })
+
+
+def _format_result(ctx: DraftContext, results: list, search_stats: dict) -> dict:
+    root_step = ctx.sequence[0]
+    maximize = root_step in (PICK, BAN)
+    scored = [r for r in results if r[1] is not None]
+    scored.sort(key=lambda r: -r[1] if maximize else r[1])
+
+    def pick_of(pv):
+        return next((ctx.names[c] for step, c in pv if step == PICK), None)
+
+    best = scored[0] if scored else (None, None, ())
+    return {
+        "best_pick": pick_of(best[2]),
+        "value": round(best[1], 1) if best[1] is not None else None,
+        "principal_variation": [{"step": step, "champion": ctx.names[c]} for step, c in best[2]],
+        "moves": [
+            {
+                "step": root_step,
+                "champion": ctx.names[m] if m is not None else None,
+                "value": round(value, 1),
+                "pick": pick_of(pv),
+            }
+            for m, value, pv in scored
+        ],
+        "search": search_stats,
+    }
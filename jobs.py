@@ -0,0 +1,123 @@
+"""
+Jobs asynchrones pour DraftForMe.
+Les scrapes lents (5-15 s à froid) sont exécutés dans un pool de workers au lieu
+de bloquer le thread de la requête Flask : l'API renvoie un job id (202) et le
+client récupère le résultat via /api/jobs/<id> (long-poll possible).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(RuntimeError):
+    """Trop de jobs en attente : le client doit réessayer plus tard."""
+
+
+class Job:
+    __slots__ = ("id", "key", "state", "created_at", "started_at", "finished_at",
+                 "result", "error", "done")
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.state = "queued"  # queued -> running -> done | failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self, timeout: float | None) -> bool:
+        return self.done.wait(timeout)
+
+    def to_dict(self, with_result: bool = False) -> dict:
+        d = {
+            "job_id": self.id,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            d["error"] = self.error
+        if with_result and self.state == "done":
+            d["result"] = self.result
+        return d
+
+
+class JobManager:
+    """Exécuteur de jobs :
+    - max_pending : nombre max de jobs en attente ou en cours (sinon JobQueueFull)
+    - un job identique (même clé) déjà en attente est réutilisé
+    - les jobs terminés sont gardés `retention` secondes pour être consultés
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32, retention: float = 600,
+                 max_finished: int = 1000):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.max_pending = max_pending
+        self.retention = retention
+        self.max_finished = max_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._pending: dict = {}  # key -> Job
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn) -> Job:
+        with self._lock:
+            self._prune()
+            job = self._pending.get(key)
+            if job is not None:
+                return job
+            if len(self._pending) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._pending)} jobs en attente")
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._pending[key] = job
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn):
+        job.state = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn()
+            job.state = "done"
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.state = "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._pending.pop(job.key, None)
+            job.done.set()
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        expired = [j for j in finished if now - j.finished_at > self.retention]
+        overflow = len(finished) - len(expired) - self.max_finished
+        for j in expired:
+            del self._jobs[j.id]
+        if overflow > 0:
+            for j in [j for j in finished if j not in expired][:overflow]:
+                del self._jobs[j.id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            states: dict[str, int] = {}
+            for j in self._jobs.values():
+                states[j.state] = states.get(j.state, 0) + 1
+            return {"pending": len(self._pending), "max_pending": self.max_pending, "jobs": states}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,206 @@
+"""
+Métriques internes de DraftForMe, exposées au format texte Prometheus (/api/metrics).
+- Counter / Histogram : séries par labels, thread-safe
+- CallbackMetric : valeurs lues à l'export (stats du pool de drivers, des caches mémoire)
+- TimedLock : threading.Lock qui mesure le temps d'attente à l'acquisition
+DRAFTFORME_METRICS=0 désactive tout : les mesures retournent avant de lire l'horloge.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("DRAFTFORME_METRICS", "1") != "0"
+
+# Bornes (secondes) : de la sous-milliseconde (scoring, lock) à la minute (scrape Selenium)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry: dict[str, object] = {}
+_registry_lock = threading.Lock()
+_NULL_TIMER = nullcontext()
+
+
+def _register(metric):
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, **labels):
+        if not ENABLED:
+            return
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(tuple(labels.get(n, "") for n in self.labels), 0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    """Histogramme à bornes fixes (cumulées à l'export, comme Prometheus)."""
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # labels -> [compte par borne (+Inf en dernier), somme]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not ENABLED:
+            return
+        key = tuple(labels.get(n, "") for n in self.labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    def time(self, **labels):
+        """Context manager : observe la durée du bloc (no-op si les métriques sont désactivées)."""
+        if not ENABLED:
+            return _NULL_TIMER
+        return self._timer(labels)
+
+    @contextmanager
+    def _timer(self, labels: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(tuple(labels.get(n, "") for n in self.labels))
+            return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1])) for k, s in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """Valeurs calculées à l'export : fn() -> [(labels dict, valeur), ...]."""
+
+    def __init__(self, name: str, help: str, fn, kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.fn():
+            names, values = tuple(labels), tuple(labels.values())
+            lines.append(f"{self.name}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+
+def counter(name: str, help: str, labels: tuple = ()) -> Counter:
+    return _register(Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labels, buckets))
+
+
+def register_callback(name: str, help: str, fn, kind: str = "gauge") -> CallbackMetric:
+    return _register(CallbackMetric(name, help, fn, kind))
+
+
+def render() -> str:
+    """Toutes les métriques au format texte Prometheus (version 0.0.4)."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        try:
+            lines += metric.render()
+        except Exception as e:  # une source en erreur ne doit pas casser l'export
+            lines.append(f"# {metric.name} indisponible : {e}")
+    return "\n".join(lines) + "\n"
+
+
+LOCK_WAIT = histogram(
+    "draftforme_lock_wait_seconds", "Temps d'attente pour acquérir un lock", ("lock",),
+    buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 1, 10),
+)
+
+
+class TimedLock:
+    """threading.Lock dont le temps d'attente à l'acquisition est mesuré (LOCK_WAIT)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not ENABLED:
+            return self._lock.acquire(blocking, timeout)
+        start = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        LOCK_WAIT.observe(time.perf_counter() - start, lock=self.name)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -5,23 +5,41 @@ Module de scraping OP.GG pour DraftForMe.
 - Profil joueur (champions les plus joués)
 """
 
+import hashlib
 import json
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import quote, urlencode
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+import metrics
+from cache import BackgroundRefresher, SingleFlight
+from cache_io import CorruptCacheError, quarantine, read_json, write_json
+from ratelimit import AdaptiveRateLimiter, CircuitBreaker, CircuitOpenError, RetryableError, retry_call
+from store import Store, parse_cache_key
+
+try:
+    import lxml  # noqa: F401  (backend de parsing optionnel, ~2x plus rapide que html.parser)
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -29,23 +47,67 @@ REGIONS = ["euw", "na", "kr", "eune", "oce", "jp", "br", "las", "lan", "ru", "tr
 
 ROLES = ["top", "jungle", "middle", "bottom", "support"]
 
+# Valeurs du paramètre ?tier= des tier lists op.gg
+TIERS = ["all", "iron", "bronze", "silver", "gold", "platinum", "emerald", "diamond", "master",
+         "grandmaster", "challenger", "gold_plus", "platinum_plus", "emerald_plus", "diamond_plus",
+         "master_plus"]
+
+# Durée de validité des caches disque (heures)
+DDRAGON_TTL_H = 24
+TIERLIST_TTL_H = 6
+BUILD_TTL_H = 12
+MATCHUPS_TTL_H = 12
+PLAYER_TTL_H = 1
+CACHE_TTL_H = {
+    "ddragon": DDRAGON_TTL_H,
+    "tierlist": TIERLIST_TTL_H,
+    "build": BUILD_TTL_H,
+    "matchups": MATCHUPS_TTL_H,
+    "player": PLAYER_TTL_H,
+}
+
+# Métriques (/api/metrics)
+SCRAPE_PHASE = metrics.histogram(
+    "draftforme_scrape_phase_seconds",
+    "Durée des phases d'un scrape (http, navigate, wait, parse, extract)", ("page", "phase"),
+)
+PAGE_READY_TIMEOUTS = metrics.counter(
+    "draftforme_page_ready_timeouts_total", "Pages parsées après expiration du WebDriverWait", ("page",),
+)
+DISK_CACHE_LOOKUPS = metrics.counter(
+    "draftforme_disk_cache_lookups_total",
+    "Lectures du cache disque par famille (hit, stale, miss, corrupt, degraded)",
+    ("family", "result"),
+)
+DRIVER_CHECKOUT = metrics.histogram(
+    "draftforme_driver_checkout_seconds", "Attente + création / health check pour obtenir un driver",
+)
+
 # ---------------------------------------------------------------------------
-# Driver
+# Driver (pool borné partagé entre les threads Flask)
 # ---------------------------------------------------------------------------
 
-_driver_instance = None
+DRIVER_POOL_SIZE = int(os.environ.get("DRAFTFORME_DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_PAGES = int(os.environ.get("DRAFTFORME_DRIVER_MAX_PAGES", "50"))  # recyclage après N pages
+DRIVER_CHECKOUT_TIMEOUT = 120  # secondes d'attente max pour obtenir un driver
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
 
 
-def get_driver(headless: bool = True) -> webdriver.Chrome:
-    """Crée ou réutilise un driver Chrome."""
-    global _driver_instance
-    if _driver_instance is not None:
-        try:
-            _ = _driver_instance.title  # test si encore vivant
-            return _driver_instance
-        except Exception:
-            _driver_instance = None
+class DriverPoolClosed(RuntimeError):
+    """Levée quand on demande un driver après close_driver()."""
+
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """Installe chromedriver une seule fois par process (et pas par driver)."""
+    return ChromeDriverManager().install()
 
+
+def _create_driver(headless: bool = True) -> webdriver.Chrome:
+    """Lance un nouveau Chrome."""
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -53,20 +115,554 @@ def get_driver(headless: bool = True) -> webdriver.Chrome:
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
     options.add_argument("--window-size=1920,1080")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
-    service = Service(ChromeDriverManager().install())
-    _driver_instance = webdriver.Chrome(service=service, options=options)
-    return _driver_instance
+    options.add_argument(f"user-agent={USER_AGENT}")
+    service = Service(_chromedriver_path())
+    return webdriver.Chrome(service=service, options=options)
+
+
+def _driver_is_alive(driver) -> bool:
+    """Health check : le process chromedriver répond et la session est valide."""
+    try:
+        service = getattr(driver, "service", None)
+        if service is not None and not service.is_connectable():
+            return False
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """Pool borné de drivers Chrome.
+    - checkout / checkin via borrow() (context manager)
+    - health check à chaque checkout (les drivers morts sont remplacés)
+    - recyclage d'un driver après max_pages pages chargées
+    Les drivers sont créés à la demande, jamais plus de `size` en même temps.
+    """
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES,
+                 headless: bool = True, factory=None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.headless = headless
+        self._factory = factory or _create_driver
+        self._cond = threading.Condition()
+        self._idle: list = []
+        self._pages: dict[int, int] = {}  # id(driver) -> pages chargées
+        self._in_use = 0
+        self._closed = False
+
+    def _total(self) -> int:
+        return len(self._idle) + self._in_use
+
+    def acquire(self, timeout: float | None = DRIVER_CHECKOUT_TIMEOUT):
+        """Sort un driver du pool (en crée un si la taille le permet)."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DriverPoolClosed("Le pool de drivers est fermé")
+                if self._idle:
+                    driver = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._total() < self.size:
+                    driver = None
+                    self._in_use += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Aucun driver disponible après {timeout}s")
+                self._cond.wait(remaining)
+
+        # Création / health check hors du lock (peut prendre plusieurs secondes)
+        try:
+            if driver is not None and not _driver_is_alive(driver):
+                self._forget(driver)
+                _quit_driver(driver)
+                driver = None
+            if driver is None:
+                driver = self._factory(self.headless)
+                with self._cond:
+                    self._pages[id(driver)] = 0
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        DRIVER_CHECKOUT.observe(time.monotonic() - start)
+        return driver
+
+    def release(self, driver, discard: bool = False):
+        """Remet un driver dans le pool (ou le ferme s'il doit être recyclé)."""
+        with self._cond:
+            self._in_use -= 1
+            pages = self._pages.get(id(driver), 0)
+            recycle = discard or self._closed or (self.max_pages and pages >= self.max_pages)
+            if recycle:
+                self._pages.pop(id(driver), None)
+            else:
+                self._idle.append(driver)
+            self._cond.notify()
+        if recycle:
+            _quit_driver(driver)
+
+    @contextmanager
+    def borrow(self, timeout: float | None = DRIVER_CHECKOUT_TIMEOUT):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def note_page(self, driver):
+        with self._cond:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+
+    def _forget(self, driver):
+        with self._cond:
+            self._pages.pop(id(driver), None)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._total(),
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "closed": self._closed,
+            }
+
+    def close(self):
+        """Ferme les drivers inactifs ; ceux en cours d'utilisation sont fermés au checkin."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for d in idle:
+                self._pages.pop(id(d), None)
+            self._cond.notify_all()
+        for d in idle:
+            _quit_driver(d)
+
+
+_pool = DriverPool()
+
+
+def borrow_driver(timeout: float | None = DRIVER_CHECKOUT_TIMEOUT):
+    """Context manager : `with borrow_driver() as driver: ...`"""
+    return _pool.borrow(timeout)
+
+
+def _navigate(driver, url: str):
+    """driver.get() + comptage des pages pour le recyclage."""
+    driver.get(url)
+    _pool.note_page(driver)
+
+
+def driver_pool_stats() -> dict:
+    return _pool.stats()
+
+
+metrics.register_callback(
+    "draftforme_driver_pool", "Drivers du pool par état (size = taille max)",
+    lambda: [({"state": k}, v) for k, v in driver_pool_stats().items() if k != "closed"],
+)
 
 
 def close_driver():
-    global _driver_instance
-    if _driver_instance:
-        _driver_instance.quit()
-        _driver_instance = None
+    """Arrête proprement tous les drivers du pool."""
+    _pool.close()
+
+
+# ---------------------------------------------------------------------------
+# Readiness : attendre que la page soit prête au lieu de time.sleep()
+# ---------------------------------------------------------------------------
+
+# Par type de page : sélecteur des lignes utiles + timeout max (s)
+PAGE_READY = {
+    "tierlist": {"selector": "table tr a[href*='/build/']", "timeout": 15},
+    "build": {"selector": "img[src*='/item/']", "timeout": 10},
+    "matchups": {"selector": "table tbody tr", "timeout": 10},
+    "summary": {"selector": "img[src*='champion']", "timeout": 10},
+    "player_champions": {"selector": "table tbody tr", "timeout": 10},
+}
+READY_POLL_INTERVAL = 0.1
+READY_STABLE_FOR = 0.4  # le nombre de lignes ne doit plus bouger pendant ce délai
+READY_MIN_TIMEOUT = 3.0
+READY_TIMEOUT_FACTOR = 3.0  # timeout adaptatif = N x temps moyen observé
+
+_page_timings_lock = threading.Lock()
+_page_timings: dict[str, dict] = {}
+
+
+class _RowsStable:
+    """Condition WebDriverWait : au moins une ligne présente et DOM stable."""
+
+    def __init__(self, selector: str, stable_for: float):
+        self.selector = selector
+        self.stable_for = stable_for
+        self.count = -1
+        self.changed_at = time.monotonic()
+
+    def __call__(self, driver) -> bool:
+        count = len(driver.find_elements(By.CSS_SELECTOR, self.selector))
+        now = time.monotonic()
+        if count != self.count:
+            self.count = count
+            self.changed_at = now
+            return False
+        return count > 0 and now - self.changed_at >= self.stable_for
+
+
+def _adaptive_timeout(page: str) -> float:
+    """Timeout basé sur les temps observés, borné par le timeout max de la page."""
+    max_timeout = PAGE_READY[page]["timeout"]
+    with _page_timings_lock:
+        t = _page_timings.get(page)
+        avg = t["ewma"] if t else None
+    if avg is None:
+        return max_timeout
+    return max(READY_MIN_TIMEOUT, min(max_timeout, avg * READY_TIMEOUT_FACTOR))
+
+
+def _record_page_timing(page: str, elapsed: float, ready: bool):
+    with _page_timings_lock:
+        t = _page_timings.setdefault(
+            page, {"count": 0, "timeouts": 0, "ewma": None, "last": None, "max": 0.0}
+        )
+        t["count"] += 1
+        t["last"] = elapsed
+        t["max"] = max(t["max"], elapsed)
+        if ready:
+            t["ewma"] = elapsed if t["ewma"] is None else 0.8 * t["ewma"] + 0.2 * elapsed
+        else:
+            t["timeouts"] += 1
+
+
+def _wait_for_page(driver, page: str) -> bool:
+    """Attend que les lignes de la page soient présentes et stables.
+    Retourne False si le timeout est atteint (on parse quand même ce qu'on a).
+    """
+    spec = PAGE_READY[page]
+    start = time.monotonic()
+    ready = True
+    try:
+        WebDriverWait(driver, _adaptive_timeout(page), poll_frequency=READY_POLL_INTERVAL).until(
+            _RowsStable(spec["selector"], READY_STABLE_FOR)
+        )
+    except Exception:
+        ready = False
+    elapsed = time.monotonic() - start
+    _record_page_timing(page, elapsed, ready)
+    SCRAPE_PHASE.observe(elapsed, page=page, phase="wait")
+    if not ready:
+        PAGE_READY_TIMEOUTS.inc(page=page)
+    return ready
+
+
+def page_timing_stats() -> dict:
+    """Temps de chargement observés par type de page (secondes)."""
+    with _page_timings_lock:
+        return {page: dict(t) for page, t in _page_timings.items()}
+
+
+# ---------------------------------------------------------------------------
+# Chargement des pages : HTTP direct d'abord, Selenium en secours
+# ---------------------------------------------------------------------------
+
+# "auto" = HTTP puis Chrome si la page HTTP ne contient pas les données,
+# "http" = jamais de Chrome, "selenium" = toujours Chrome (ancien comportement)
+FETCH_MODE = os.environ.get("DRAFTFORME_FETCH_MODE", "auto")
+HTTP_TIMEOUT = 10
+HTTP_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """Session partagée : connexions keep-alive poolées vers op.gg."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HTTP_HEADERS)
+            _http_session = session
+        return _http_session
+
+
+# ---------------------------------------------------------------------------
+# Débit et résilience des requêtes op.gg (ratelimit.py)
+# ---------------------------------------------------------------------------
+
+# Débit adaptatif (AIMD) partagé par toutes les requêtes du processus vers op.gg, HTTP et Chrome.
+# Avec un service de scraping (SCRAPER_SERVICE_URL), c'est lui qui envoie toutes les requêtes :
+# le débit et le circuit sont ceux de ce seul processus, quel que soit le nombre de workers.
+OPGG_HOST = "op.gg"
+RATE_LIMIT = float(os.environ.get("DRAFTFORME_RATE_LIMIT", "2"))  # requêtes/s au démarrage
+RATE_LIMIT_MAX = float(os.environ.get("DRAFTFORME_RATE_LIMIT_MAX", "8"))
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5  # secondes, doublé à chaque essai (full jitter, max 8 s)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CIRCUIT_FAILURES = 5  # échecs consécutifs avant ouverture du circuit
+CIRCUIT_COOLDOWN = 60  # secondes sans requête vers op.gg une fois le circuit ouvert
+
+_rate_limiter = AdaptiveRateLimiter(initial_rate=RATE_LIMIT, max_rate=RATE_LIMIT_MAX)
+_breaker = CircuitBreaker(OPGG_HOST, CIRCUIT_FAILURES, CIRCUIT_COOLDOWN)
+
+RATE_LIMIT_WAIT = metrics.histogram(
+    "draftforme_rate_limit_wait_seconds", "Attente d'un jeton du limiteur de débit op.gg",
+)
+REQUEST_RETRIES = metrics.counter(
+    "draftforme_opgg_retries_total", "Nouvelles tentatives de requêtes op.gg", ("channel",),
+)
+metrics.register_callback(
+    "draftforme_opgg_rate_limit", "Débit autorisé vers op.gg (requêtes/s)",
+    lambda: [({}, _rate_limiter.rate(OPGG_HOST))],
+)
+metrics.register_callback(
+    "draftforme_opgg_circuit_open", "Circuit op.gg ouvert (1) ou non (0)",
+    lambda: [({}, 1 if _breaker.state == "open" else 0)],
+)
+
+
+def _throttle():
+    """CircuitOpenError si op.gg est en panne, sinon attend un jeton du limiteur."""
+    _breaker.check()
+    RATE_LIMIT_WAIT.observe(_rate_limiter.acquire(OPGG_HOST))
+
+
+def _report_request(ok: bool, latency: float | None = None):
+    _rate_limiter.record(OPGG_HOST, ok, latency)
+    if ok:
+        _breaker.record_success()
+    else:
+        _breaker.record_failure()
+
+
+def _retry(fn, channel: str):
+    def on_retry(attempt, delay, error):
+        REQUEST_RETRIES.inc(channel=channel)
+        print(f"[!] op.gg ({channel}) : {error}, essai {attempt + 1}/{RETRY_ATTEMPTS} dans {delay:.1f}s")
+
+    return retry_call(fn, RETRY_ATTEMPTS, base=RETRY_BASE_DELAY, on_retry=on_retry)
+
+
+def _retry_after(resp) -> float | None:
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def resilience_stats() -> dict:
+    """Débit adaptatif et état du circuit op.gg."""
+    return {"rate_limit": _rate_limiter.stats().get(OPGG_HOST), "circuit": _breaker.stats()}
+
+
+def _http_get(url: str) -> str | None:
+    """HTML rendu côté serveur, ou None si la requête échoue.
+    Les échecs transitoires (connexion, 429, 5xx) sont retentés avec backoff ; un 403 compte
+    comme un échec pour le limiteur et le circuit, sans être retenté.
+    """
+    if SCRAPER_SERVICE_URL:
+        return _remote_fetch(url)
+
+    def attempt():
+        _throttle()
+        start = time.monotonic()
+        try:
+            resp = _get_http_session().get(url, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            _report_request(False)
+            raise RetryableError(f"{type(e).__name__}: {e}") from e
+        if resp.status_code in RETRY_STATUSES:
+            _report_request(False)
+            raise RetryableError(f"HTTP {resp.status_code}", _retry_after(resp))
+        if resp.status_code == 403:
+            # Blocage anti-bot : échec (débit réduit, le circuit s'ouvre si ça dure), pas de
+            # nouvel essai immédiat ; Chrome prend le relais tant que le circuit est fermé
+            _report_request(False)
+            return None
+        _report_request(True, time.monotonic() - start)
+        return resp.text if resp.status_code == 200 else None
+
+    try:
+        return _retry(attempt, "http")
+    except RetryableError:
+        return None
+
+
+# Service de scraping (scraper_service.py) : si défini, les requêtes vers op.gg (rendu Chrome
+# et HTTP simple) sont déléguées à ce processus : un seul pool de drivers, un seul limiteur de
+# débit et un seul circuit pour tous les workers de serve.py. Le parsing et l'écriture du cache
+# disque partagé restent dans le worker.
+SCRAPER_SERVICE_URL = os.environ.get("DRAFTFORME_SCRAPER_URL", "").rstrip("/")
+
+
+class ScraperServiceError(RuntimeError):
+    """Le service de scraping est injoignable ou n'a pas pu rendre la page."""
+
+
+def _service_post(endpoint: str, payload: dict) -> dict:
+    """Réponse JSON du service de scraping. CircuitOpenError si son circuit op.gg est ouvert."""
+    try:
+        resp = requests.post(f"{SCRAPER_SERVICE_URL}/{endpoint}", json=payload, timeout=SCRAPE_WAIT_TIMEOUT)
+    except requests.RequestException as e:
+        raise ScraperServiceError(f"Service de scraping injoignable : {e}") from e
+    if resp.status_code == 503 and "retry_in" in resp.text:
+        body = resp.json()
+        raise CircuitOpenError(body["error"], body["retry_in"])
+    if resp.status_code != 200:
+        raise ScraperServiceError(f"Service de scraping : HTTP {resp.status_code} {resp.text[:200]}")
+    return resp.json()
+
+
+def _remote_render(url: str, page: str) -> str:
+    """HTML rendu par le service de scraping (POST /render)."""
+    return _service_post("render", {"url": url, "page": page})["html"]
+
+
+def _remote_fetch(url: str) -> str | None:
+    """HTML servi en HTTP, récupéré par le service de scraping (POST /fetch), ou None."""
+    return _service_post("fetch", {"url": url})["html"]
+
+
+def _selenium_get(url: str, page: str) -> str:
+    """HTML après rendu JavaScript dans Chrome (local, ou via le service de scraping)."""
+    if SCRAPER_SERVICE_URL:
+        with SCRAPE_PHASE.time(page=page, phase="navigate"):
+            return _remote_render(url, page)
+
+    def attempt():
+        _throttle()
+        with borrow_driver() as driver:
+            try:
+                with SCRAPE_PHASE.time(page=page, phase="navigate"):
+                    _navigate(driver, url)
+            except WebDriverException as e:
+                _report_request(False)
+                raise RetryableError(f"{type(e).__name__}: {e.msg}") from e
+            ready = _wait_for_page(driver, page)
+            # op.gg a répondu (circuit OK) ; une page jamais stable réduit quand même le débit
+            _breaker.record_success()
+            _rate_limiter.record(OPGG_HOST, ready)
+            return driver.page_source
+
+    return _retry(attempt, "selenium")
+
+
+def _fetch_parsed(url: str, page: str, parse, has_data=bool):
+    """Charge `url` et la passe à `parse(html)`.
+    Essaie d'abord le HTML servi en HTTP (pas de Chrome) ; si `has_data(résultat)`
+    est faux, recharge la page avec Selenium.
+    """
+    if FETCH_MODE != "selenium":
+        with SCRAPE_PHASE.time(page=page, phase="http"):
+            html = _http_get(url)
+        if html:
+            result = _timed_parse(parse, html, page)
+            if has_data(result):
+                if RECORD_DIR:
+                    record_page(url, page, html, result)
+                return result
+        if FETCH_MODE == "http":
+            return parse("")
+    html = _selenium_get(url, page)
+    result = _timed_parse(parse, html, page)
+    if RECORD_DIR:
+        record_page(url, page, html, result)
+    return result
+
+
+_soup_clock = threading.local()  # temps passé dans _make_soup par le thread courant
+
+
+def _timed_parse(parse, html: str, page: str):
+    """parse(html), en séparant la construction de l'arbre (parse) du reste (extract)."""
+    if not metrics.ENABLED:
+        return parse(html)
+    _soup_clock.elapsed = 0.0
+    start = time.perf_counter()
+    result = parse(html)
+    total = time.perf_counter() - start
+    SCRAPE_PHASE.observe(_soup_clock.elapsed, page=page, phase="parse")
+    SCRAPE_PHASE.observe(total - _soup_clock.elapsed, page=page, phase="extract")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Enregistrement des pages (corpus rejoué par bench/bench_scraper.py)
+# ---------------------------------------------------------------------------
+
+# Dossier du corpus : si défini, chaque page chargée y est enregistrée avec son résultat parsé
+RECORD_DIR = os.environ.get("DRAFTFORME_RECORD_DIR", "")
+_record_lock = threading.Lock()
+
+
+def record_page(url: str, page: str, html: str, result=None, directory: str | Path | None = None):
+    """Ajoute une page au corpus : <hash>.html (source), <hash>.json (résultat attendu)
+    et une entrée {url: {page, file, recorded_at}} dans index.json.
+    """
+    directory = Path(directory or RECORD_DIR)
+    name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    with _record_lock:
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{name}.html").write_text(html, encoding="utf-8")
+        (directory / f"{name}.json").write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        index_file = directory / "index.json"
+        index = json.loads(index_file.read_text(encoding="utf-8")) if index_file.exists() else {}
+        index[url] = {"page": page, "file": f"{name}.html", "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        index_file.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Parsing HTML (backend interchangeable)
+# ---------------------------------------------------------------------------
+
+# "auto" = lxml si installé, sinon html.parser (stdlib). Toute valeur "features" de bs4 est acceptée.
+PARSER_BACKEND = os.environ.get("DRAFTFORME_PARSER", "auto")
+
+# Les <script>/<style> (payload Next.js, pubs) font ~la moitié de la page et ne sont jamais lus
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.S | re.I)
+
+
+def _parser_features() -> str:
+    if PARSER_BACKEND == "auto":
+        return "lxml" if _HAS_LXML else "html.parser"
+    return PARSER_BACKEND
+
+
+def _make_soup(html: str, only: str | None = None) -> BeautifulSoup:
+    """Parse `html` avec le backend configuré.
+    `only="table"` ne construit que les sous-arbres <table> (SoupStrainer).
+    """
+    if not metrics.ENABLED:
+        return _build_soup(html, only)
+    start = time.perf_counter()
+    soup = _build_soup(html, only)
+    _soup_clock.elapsed = getattr(_soup_clock, "elapsed", 0.0) + time.perf_counter() - start
+    return soup
+
+
+def _build_soup(html: str, only: str | None) -> BeautifulSoup:
+    html = _SCRIPT_STYLE_RE.sub("", html)
+    strainer = SoupStrainer(only) if only else None
+    return BeautifulSoup(html, _parser_features(), parse_only=strainer)
 
 
 # ---------------------------------------------------------------------------
@@ -118,6 +714,172 @@ def _champion_key(name: str) -> str:
     return re.sub(r"['\s.]", "", name)
 
 
+def _slugify(name: str) -> str:
+    """Slug d'URL op.gg. Ex: "Kai'Sa" -> "kaisa"."""
+    return name.lower().replace(" ", "").replace("'", "").replace(".", "")
+
+
+def champion_slug(champion: dict) -> str:
+    """Slug op.gg d'une entrée de tier list (son slug, sinon son nom) : clé de ses caches."""
+    return _slugify(champion.get("slug") or champion.get("name") or "")
+
+
+# ---------------------------------------------------------------------------
+# Cache disque (data/<cache_key>.json ou base SQLite) + coalescing des scrapes
+# ---------------------------------------------------------------------------
+
+# "json" = un fichier data/<cache_key>.json par page,
+# "sqlite" = une seule base data/draftforme.db (store.py ; migration : python store.py --migrate)
+CACHE_BACKEND = os.environ.get("DRAFTFORME_CACHE_BACKEND", "json")
+_store: Store | None = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> Store:
+    global _store
+    with _store_lock:
+        path = DATA_DIR / "draftforme.db"
+        if _store is None or _store.path != path:
+            _store = Store(path)
+        return _store
+
+
+SCRAPE_WAIT_TIMEOUT = 180  # attente max d'un scrape lancé par un autre thread
+
+# Stale-while-revalidate : un cache expiré est servi tel quel et rafraîchi en arrière-plan
+STALE_WHILE_REVALIDATE = os.environ.get("DRAFTFORME_STALE_WHILE_REVALIDATE", "1") != "0"
+REFRESH_QUEUE_SIZE = 64
+
+_scrapes = SingleFlight(timeout=SCRAPE_WAIT_TIMEOUT)
+_refresher = BackgroundRefresher(workers=DRIVER_POOL_SIZE, max_queue=REFRESH_QUEUE_SIZE)
+_cache_listeners: list = []
+
+
+def add_cache_listener(fn):
+    """fn(cache_key, data) est appelé après chaque écriture d'un cache scrapé."""
+    _cache_listeners.append(fn)
+
+
+def _load_cache(cache_key: str):
+    """(contenu, âge en heures) de data/<cache_key>.json, ou (None, None)."""
+    if CACHE_BACKEND == "sqlite":
+        return _get_store().get(cache_key)
+    cache_file = DATA_DIR / f"{cache_key}.json"
+    try:
+        data, mtime = read_json(cache_file)
+    except CorruptCacheError as e:
+        # Fichier tronqué / altéré : mis de côté, la clé est traitée comme absente (re-scrape)
+        moved = quarantine(cache_file)
+        if moved is None:  # réécrit par un autre worker entre-temps
+            return _load_cache(cache_key)
+        DISK_CACHE_LOOKUPS.inc(family=cache_key.split("_", 1)[0], result="corrupt")
+        print(f"[!] Cache corrompu {cache_file.name} ({e}) -> {moved}")
+        return None, None
+    if data is None:
+        return None, None
+    return data, (time.time() - mtime) / 3600
+
+
+def load_cache(cache_key: str):
+    """Cache disque tel quel (même expiré), sans scrape : (contenu, âge en heures) ou (None, None)."""
+    return _load_cache(cache_key)
+
+
+def _read_cache(cache_key: str, ttl_h: float):
+    """Contenu de data/<cache_key>.json s'il a moins de ttl_h heures, sinon None."""
+    data, age_h = _load_cache(cache_key)
+    if data is not None and age_h < ttl_h:
+        return data
+    return None
+
+
+def _write_cache(cache_key: str, data, ttl_h: float | None = None):
+    if CACHE_BACKEND == "sqlite":
+        _get_store().put(cache_key, data, ttl_h)
+        return
+    write_json(DATA_DIR / f"{cache_key}.json", data)
+
+
+_fetch_context = threading.local()
+
+
+@contextmanager
+def refresh_older_than(max_age_h: float):
+    """Dans ce bloc (thread courant), un cache de plus de max_age_h heures est re-scrapé
+    tout de suite, sans stale-while-revalidate. Utilisé par crawler.py pour rafraîchir
+    les caches avant leur expiration.
+    """
+    previous = getattr(_fetch_context, "max_age_h", None)
+    _fetch_context.max_age_h = max_age_h
+    try:
+        yield
+    finally:
+        _fetch_context.max_age_h = previous
+
+
+def _cached_fetch(cache_key: str, ttl_h: float, scrape, has_data=bool, opgg: bool = True):
+    """Sert le cache disque s'il est frais, sinon lance `scrape()`.
+    Un cache expiré est servi immédiatement et rafraîchi en arrière-plan
+    (STALE_WHILE_REVALIDATE) : on ne bloque que s'il n'y a aucune donnée.
+    Les appels concurrents sur une même clé partagent un seul scrape.
+    Le résultat n'est mis en cache que si `has_data(résultat)`.
+    `opgg` : le scrape interroge op.gg (cache expiré servi si son circuit est ouvert).
+    """
+    family = cache_key.split("_", 1)[0]
+    max_age_h = getattr(_fetch_context, "max_age_h", None)
+    fresh_h = ttl_h if max_age_h is None else min(ttl_h, max_age_h)
+    cached, age_h = _load_cache(cache_key)
+    if cached is not None and age_h < fresh_h:
+        DISK_CACHE_LOOKUPS.inc(family=family, result="hit")
+        return cached
+
+    def scrape_and_store():
+        # Un autre thread a pu remplir le cache pendant qu'on attendait le lock
+        cached = _read_cache(cache_key, fresh_h)
+        if cached is not None:
+            return cached
+        data = scrape()
+        if has_data(data):
+            _write_cache(cache_key, data, ttl_h)
+            for listener in _cache_listeners:
+                listener(cache_key, data)
+        return data
+
+    # Dégradé : op.gg en panne (circuit ouvert), scrape en échec ou vide -> cache expiré servi tel quel.
+    # Pas sous refresh_older_than() : le crawler doit voir l'échec.
+    serve_stale = cached is not None and max_age_h is None
+    if serve_stale and opgg and _breaker.state == "open":
+        DISK_CACHE_LOOKUPS.inc(family=family, result="degraded")
+        return cached
+    if serve_stale and STALE_WHILE_REVALIDATE:
+        DISK_CACHE_LOOKUPS.inc(family=family, result="stale")
+        _refresher.submit(cache_key, lambda: _scrapes.do(cache_key, scrape_and_store))
+        return cached
+    DISK_CACHE_LOOKUPS.inc(family=family, result="miss")
+    try:
+        data = _scrapes.do(cache_key, scrape_and_store)
+    except (RetryableError, CircuitOpenError, ScraperServiceError) as e:
+        if not serve_stale:
+            raise
+        print(f"[!] {cache_key} : {e} -> cache expiré servi")
+        DISK_CACHE_LOOKUPS.inc(family=family, result="degraded")
+        return cached
+    if serve_stale and not has_data(data):
+        DISK_CACHE_LOOKUPS.inc(family=family, result="degraded")
+        return cached
+    return data
+
+
+def store_stats() -> dict | None:
+    """Contenu de la base SQLite par kind (None avec le backend JSON)."""
+    return _get_store().stats() if CACHE_BACKEND == "sqlite" else None
+
+
+def refresh_status() -> dict:
+    """État des rafraîchissements en arrière-plan (file, statut par clé)."""
+    return _refresher.status()
+
+
 # ---------------------------------------------------------------------------
 # Data Dragon : liste des champions + icônes
 # ---------------------------------------------------------------------------
@@ -126,12 +888,10 @@ def fetch_ddragon_champions() -> dict:
     """Récupère la liste des champions depuis Data Dragon (avec images).
     Retourne {champion_name: {id, key, image_url, ...}}
     """
-    cache = DATA_DIR / "ddragon_champions.json"
-    if cache.exists():
-        age_h = (time.time() - cache.stat().st_mtime) / 3600
-        if age_h < 24:
-            return json.loads(cache.read_text(encoding="utf-8"))
+    return _cached_fetch("ddragon_champions", DDRAGON_TTL_H, _fetch_ddragon_champions, opgg=False)
 
+
+def _fetch_ddragon_champions() -> dict:
     versions = requests.get("https://ddragon.leagueoflegends.com/api/versions.json", timeout=10).json()
     latest = versions[0]
 
@@ -147,8 +907,6 @@ def fetch_ddragon_champions() -> dict:
             "image": f"https://ddragon.leagueoflegends.com/cdn/{latest}/img/champion/{info['image']['full']}",
             "tags": info.get("tags", []),
         }
-
-    cache.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
     return result
 
 
@@ -179,26 +937,17 @@ def fetch_champion_stats(region: str = "euw", tier: str = "emerald_plus", role:
     """
     position = ROLE_TO_POSITION.get(role, role)
     cache_key = f"tierlist_{region}_{tier}_{position}"
-    cache_file = DATA_DIR / f"{cache_key}.json"
-    if cache_file.exists():
-        age_h = (time.time() - cache_file.stat().st_mtime) / 3600
-        if age_h < 6:
-            return json.loads(cache_file.read_text(encoding="utf-8"))
-
-    driver = get_driver()
     params = {"position": position, "tier": tier, "region": region}
     url = f"https://op.gg/lol/champions?{urlencode(params)}"
-    driver.get(url)
+    return _cached_fetch(
+        cache_key, TIERLIST_TTL_H,
+        lambda: _fetch_parsed(url, "tierlist", lambda html: _parse_tierlist(html, position)),
+    )
 
-    try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table tr a[href*='/build/']"))
-        )
-    except Exception:
-        pass
-    time.sleep(2)
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+def _parse_tierlist(html: str, position: str) -> list[dict]:
+    """Parse la tier list (une <tr> par champion)."""
+    soup = _make_soup(html, only="table")
     champions = []
 
     # La tier list est dans une <table>, chaque champion est un <tr>
@@ -267,11 +1016,7 @@ def fetch_champion_stats(region: str = "euw", tier: str = "emerald_plus", role:
         if c["name"].lower() not in seen:
             seen.add(c["name"].lower())
             unique.append(c)
-    champions = unique
-
-    if champions:
-        cache_file.write_text(json.dumps(champions, ensure_ascii=False, indent=2), encoding="utf-8")
-    return champions
+    return unique
 
 
 # ---------------------------------------------------------------------------
@@ -286,28 +1031,21 @@ def fetch_champion_build(champion_slug: str, role: str = "mid", region: str = "e
     """Récupère les items recommandés pour un champion depuis la page build op.gg.
     Retourne {"items": [...], "boots": ..., "starter": [...], "skills": ...}
     """
-    slug = champion_slug.lower().replace(" ", "").replace("'", "").replace(".", "")
+    slug = _slugify(champion_slug)
     position = ROLE_TO_POSITION.get(role, role)
     cache_key = f"build_{slug}_{position}_{region}"
-    cache_file = DATA_DIR / f"{cache_key}.json"
-    if cache_file.exists():
-        age_h = (time.time() - cache_file.stat().st_mtime) / 3600
-        if age_h < 12:
-            return json.loads(cache_file.read_text(encoding="utf-8"))
-
-    driver = get_driver()
     url = f"https://op.gg/lol/champions/{slug}/build/{position}?region={region}"
-    driver.get(url)
+    has_items = lambda b: bool(b["core_items"])
+    return _cached_fetch(
+        cache_key, BUILD_TTL_H,
+        lambda: _fetch_parsed(url, "build", lambda html: _parse_build(html, champion_slug, position), has_items),
+        has_items,
+    )
 
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "img[src*='item']"))
-        )
-    except Exception:
-        pass
-    time.sleep(2)
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+def _parse_build(html: str, champion_slug: str, position: str) -> dict:
+    """Parse la page build : items (images /item/<id>.png) et ordre des skills."""
+    soup = _make_soup(html)
     build = {"champion": champion_slug, "role": position, "core_items": [], "starter_items": [], "boots": None, "skill_order": None}
 
     # Items sont des images avec src contenant "item/" et un ID
@@ -349,33 +1087,32 @@ def fetch_champion_build(champion_slug: str, role: str = "mid", region: str = "e
         if skill_m:
             skill_text = f"{skill_m.group(1)} > {skill_m.group(2)} > {skill_m.group(3)}"
     build["skill_order"] = skill_text or None
-
-    if build["core_items"]:
-        cache_file.write_text(json.dumps(build, ensure_ascii=False, indent=2), encoding="utf-8")
     return build
 
 
-def fetch_champion_matchups(champion_name: str, role: str = "", region: str = "euw") -> dict:
-    """Récupère les matchups pour un champion donné.
+def fetch_champion_matchups(champion_name: str, role: str = "", region: str = "euw",
+                            slug: str | None = None) -> dict:
+    """Récupère les matchups pour un champion donné (nom affiché, ex: "Wukong").
+    `slug` : slug op.gg s'il diffère du nom (ex: "monkeyking"), pour l'URL et la clé de cache.
     Retourne {"strong_against": [...], "weak_against": [...], "all_matchups": [...]}
     """
-    slug = champion_name.lower().replace(" ", "").replace("'", "").replace(".", "")
+    slug = _slugify(slug or champion_name)
     cache_key = f"matchups_{slug}_{role}_{region}"
-    cache_file = DATA_DIR / f"{cache_key}.json"
-    if cache_file.exists():
-        age_h = (time.time() - cache_file.stat().st_mtime) / 3600
-        if age_h < 12:
-            return json.loads(cache_file.read_text(encoding="utf-8"))
-
-    driver = get_driver()
     url = f"https://op.gg/lol/champions/{slug}/counters"
     if role:
         url += f"/{role}"
     url += f"?region={region}"
-    driver.get(url)
-    time.sleep(3)
+    has_matchups = lambda r: bool(r["all_matchups"])
+    return _cached_fetch(
+        cache_key, MATCHUPS_TTL_H,
+        lambda: _fetch_parsed(url, "matchups", lambda html: _parse_matchups(html, champion_name, role), has_matchups),
+        has_matchups,
+    )
+
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+def _parse_matchups(html: str, champion_name: str, role: str) -> dict:
+    """Parse la page counters : tables de matchups (ou blocs div en secours)."""
+    soup = _make_soup(html, only="table")
     result = {"champion": champion_name, "role": role, "strong_against": [], "weak_against": [], "all_matchups": []}
 
     # Chercher les sections de matchup dans la page
@@ -406,8 +1143,9 @@ def fetch_champion_matchups(champion_name: str, role: str = "", region: str = "e
             matchup = {"enemy": enemy_name, "win_rate": win_rate, "games": games}
             result["all_matchups"].append(matchup)
 
-    # Si pas de table, chercher des blocs div / sections
+    # Si pas de table, chercher des blocs div / sections (parsing complet)
     if not result["all_matchups"]:
+        soup = _make_soup(html)
         for section in soup.select("[class*='counter'], [class*='matchup'], [class*='Matchup']"):
             items = section.select("[class*='item'], [class*='row'], [class*='Row'], li, tr")
             for item in items:
@@ -438,9 +1176,61 @@ def fetch_champion_matchups(champion_name: str, role: str = "", region: str = "e
 
     result["strong_against"].sort(key=lambda x: x.get("win_rate", 0), reverse=True)
     result["weak_against"].sort(key=lambda x: x.get("win_rate", 0))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Matchups en masse : tous les champions de la tier list d'un rôle
+# ---------------------------------------------------------------------------
+
+def fetch_role_matchups(region: str = "euw", tier: str = "emerald_plus", role: str = "mid",
+                        concurrency: int = DRIVER_POOL_SIZE, progress=None) -> dict[str, dict]:
+    """Récupère (et met en cache disque) les matchups de chaque champion de la tier list.
+    Les scrapes tournent en parallèle, au plus `concurrency` à la fois.
+    progress(done, total, champion, ok) est appelé après chaque champion.
+    Retourne {nom du champion: matchups}.
+    """
+    position = ROLE_TO_POSITION.get(role, role)
+    champions = [c for c in fetch_champion_stats(region, tier, position) if c.get("name")]
+    total = len(champions)
+    result = {}
 
-    if result["all_matchups"]:
-        cache_file.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    def load(c):
+        return fetch_champion_matchups(c["name"], position, region, slug=c.get("slug"))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="matchups") as executor:
+        futures = {executor.submit(load, c): c["name"] for c in champions}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                data = future.result()
+            except Exception:
+                data = None
+            ok = bool(data and data.get("all_matchups"))
+            if ok:
+                result[name] = data
+            if progress:
+                progress(done, total, name, ok)
+    return result
+
+
+def load_cached_matchups(region: str, role: str, champions: list[dict]) -> dict[str, dict]:
+    """Matchups déjà en cache disque pour ces champions (même expirés), sans aucun scrape."""
+    position = ROLE_TO_POSITION.get(role, role)
+    # SQLite : tous les matchups du rôle en une requête au lieu d'un fichier par champion
+    bulk = _get_store().bulk("matchups", region=region, role=position) if CACHE_BACKEND == "sqlite" else None
+    result = {}
+    for c in champions:
+        name = c.get("name")
+        if not name:
+            continue
+        slug = champion_slug(c)
+        if bulk is not None:
+            data = bulk.get(slug, (None, None))[0]
+        else:
+            data, _ = _load_cache(f"matchups_{slug}_{position}_{region}")
+        if data and data.get("all_matchups"):
+            result[name] = data
     return result
 
 
@@ -454,13 +1244,14 @@ def fetch_player_profile(summoner_name: str, region: str = "euw") -> dict:
     """
     name_slug = summoner_name.replace("#", "-")
     cache_key = f"player_{region}_{re.sub(r'[^a-zA-Z0-9]', '_', name_slug)}"
-    cache_file = DATA_DIR / f"{cache_key}.json"
-    if cache_file.exists():
-        age_h = (time.time() - cache_file.stat().st_mtime) / 3600
-        if age_h < 1:
-            return json.loads(cache_file.read_text(encoding="utf-8"))
+    return _cached_fetch(
+        cache_key, PLAYER_TTL_H,
+        lambda: _scrape_player_profile(summoner_name, region, name_slug),
+        lambda p: bool(p["most_played"] or p["tier"]),
+    )
 
-    driver = get_driver()
+
+def _scrape_player_profile(summoner_name: str, region: str, name_slug: str) -> dict:
     profile = {
         "summoner_name": summoner_name,
         "region": region,
@@ -469,18 +1260,35 @@ def fetch_player_profile(summoner_name: str, region: str = "euw") -> dict:
         "most_played": [],
     }
 
-    # --- Étape 1 : Page summary pour le rang ---
+    # --- Étapes 1 et 2 : page summary (rang + champions récents) ---
     summary_url = f"https://op.gg/lol/summoners/{region}/{quote(name_slug)}"
-    driver.get(summary_url)
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "img[src*='champion']"))
-        )
-    except Exception:
-        pass
-    time.sleep(2)
+    summary = _fetch_parsed(
+        summary_url, "summary", _parse_player_summary,
+        lambda r: bool(r["most_played"] or r["tier"] or r["lp"] is not None),
+    )
+    profile.update(summary)
+
+    # --- Étape 3 : Page /champions pour les stats détaillées ---
+    champs_url = f"https://op.gg/lol/summoners/{region}/{quote(name_slug)}/champions"
+    profile["most_played"] += _fetch_parsed(champs_url, "player_champions", _parse_player_champions)
+
+    # Dédupliquer (garder la version avec le plus de données)
+    seen = {}
+    for c in profile["most_played"]:
+        name = c.get("champion", "")
+        if not name:
+            continue
+        existing = seen.get(name)
+        if existing is None or (c.get("games") and not existing.get("games")):
+            seen[name] = c
+    profile["most_played"] = list(seen.values())
+    return profile
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+
+def _parse_player_summary(html: str) -> dict:
+    """Parse la page summary : rang, LP et champions des 20 dernières games."""
+    soup = _make_soup(html)
+    profile = {"tier": None, "lp": None, "most_played": []}
 
     # Rang : chercher l'image du badge de rang (ex: Gold, Emerald, etc.)
     rank_img = soup.select_one("img[src*='medals'], img[src*='tier'], img[alt*='Ranked']")
@@ -515,35 +1323,15 @@ def fetch_player_profile(summoner_name: str, region: str = "euw") -> dict:
     # --- Étape 2 : Résumé rapide (recent 20 games played champions) ---
     # Ces données sont dans des <li> contenant <img alt="ChampName" src="...champion/...">
     _extract_recent_champions(soup, profile)
+    return profile
 
-    # --- Étape 3 : Page /champions pour les stats détaillées ---
-    champs_url = f"https://op.gg/lol/summoners/{region}/{quote(name_slug)}/champions"
-    driver.get(champs_url)
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr, img[src*='champion']"))
-        )
-    except Exception:
-        pass
-    time.sleep(2)
 
-    soup2 = BeautifulSoup(driver.page_source, "html.parser")
-    _extract_champion_table(soup2, profile)
-
-    # Dédupliquer (garder la version avec le plus de données)
-    seen = {}
-    for c in profile["most_played"]:
-        name = c.get("champion", "")
-        if not name:
-            continue
-        existing = seen.get(name)
-        if existing is None or (c.get("games") and not existing.get("games")):
-            seen[name] = c
-    profile["most_played"] = list(seen.values())
-
-    if profile["most_played"] or profile["tier"]:
-        cache_file.write_text(json.dumps(profile, ensure_ascii=False, indent=2), encoding="utf-8")
-    return profile
+def _parse_player_champions(html: str) -> list[dict]:
+    """Parse la page /champions du profil (stats détaillées par champion)."""
+    soup = _make_soup(html, only="table")
+    profile = {"most_played": []}
+    _extract_champion_table(soup, profile)
+    return profile["most_played"]
 
 
 def _extract_recent_champions(soup: BeautifulSoup, profile: dict):
@@ -652,12 +1440,21 @@ if __name__ == "__main__":
     parser.add_argument("--region", default="euw", choices=REGIONS)
     parser.add_argument("--champions", action="store_true", help="Stats des champions")
     parser.add_argument("--matchups", type=str, help="Matchups pour un champion (ex: 'Aatrox')")
+    parser.add_argument("--role-matchups", action="store_true",
+                        help="Matchups de tous les champions de la tier list du rôle (--role)")
     parser.add_argument("--player", type=str, help="Profil joueur (ex: 'Faker-KR1')")
     parser.add_argument("--role", default="", help="Rôle : top, jungle, middle, bottom, support")
     parser.add_argument("--tier", default="emerald_plus")
     parser.add_argument("-o", "--output", type=str, help="Fichier JSON de sortie")
+    parser.add_argument("--crawl", nargs=argparse.REMAINDER,
+                        help="Préchauffage régions x rôles x tiers (options : python crawler.py --help)")
     args = parser.parse_args()
 
+    if args.crawl is not None:
+        import crawler
+
+        raise SystemExit(crawler.main(args.crawl))
+
     result = {}
     try:
         if args.champions:
@@ -670,6 +1467,14 @@ if __name__ == "__main__":
             result["matchups"] = fetch_champion_matchups(args.matchups, args.role, args.region)
             print(f"    -> {len(result['matchups'].get('all_matchups', []))} matchups")
 
+        if args.role_matchups:
+            print(f"[*] Matchups de tous les champions ({args.region}, role={args.role or 'mid'})...")
+            result["role_matchups"] = fetch_role_matchups(
+                args.region, args.tier, args.role or "mid",
+                progress=lambda done, total, name, ok: print(f"    [{done}/{total}] {name}{'' if ok else ' (vide)'}"),
+            )
+            print(f"    -> {len(result['role_matchups'])} champions avec matchups")
+
         if args.player:
             print(f"[*] Profil de {args.player} ({args.region})...")
             result["player"] = fetch_player_profile(args.player, args.region)
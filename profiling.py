@@ -0,0 +1,181 @@
+"""
+Profilage à la demande d'une requête DraftForMe (réservé aux admins).
+
+Activé seulement si DRAFTFORME_PROFILE_TOKEN est défini ; une requête est profilée si
+elle porte ce jeton (header X-DraftForMe-Profile ou paramètre ?profile=) :
+  - mode "cprofile" (défaut) : cProfile du handler -> fichier .pstats (snakeviz, pstats)
+  - mode "sample" : échantillonnage de la pile du thread toutes les SAMPLE_INTERVAL s
+    -> piles repliées .collapsed (flamegraph.pl, speedscope)
+Le mode se choisit avec X-DraftForMe-Profile-Mode ou ?profile_mode=.
+Un seul cProfile peut être actif à la fois dans le processus (ValueError en Python 3.12+) :
+si un autre est en cours, la requête est profilée en mode "sample".
+Portée (champ "scope" des métadonnées) :
+  - "request" : seul le thread de la requête (handler -> fetch_* -> BeautifulSoup -> scoring),
+    pas les rafraîchissements en arrière-plan. Mode "sample", et "cprofile" avant Python 3.12.
+  - "process" : cProfile en Python 3.12+ (sys.monitoring) trace tous les threads du processus,
+    le profil contient aussi le travail des requêtes concurrentes et des threads d'arrière-plan.
+    Pour isoler une requête sur un serveur chargé, utiliser le mode "sample".
+
+Les profils sont gardés dans un buffer circulaire sur disque (les plus anciens sont supprimés).
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+PROFILE_TOKEN = os.environ.get("DRAFTFORME_PROFILE_TOKEN", "")
+PROFILE_DIR = Path(os.environ.get("DRAFTFORME_PROFILE_DIR", Path(__file__).parent / "data" / "profiles"))
+PROFILE_KEEP = int(os.environ.get("DRAFTFORME_PROFILE_KEEP", "20"))
+SAMPLE_INTERVAL = 0.005  # secondes
+MODES = ("cprofile", "sample")
+ARTIFACT_SUFFIX = {"cprofile": ".pstats", "sample": ".collapsed"}
+CPROFILE_SCOPE = "process" if sys.version_info >= (3, 12) else "request"  # threads tracés par cProfile
+_cprofile_lock = threading.Lock()  # un seul cProfile actif par processus
+
+
+def is_authorized(token: str | None) -> bool:
+    """Jeton admin valide (toujours faux si le profilage n'est pas configuré)."""
+    return bool(PROFILE_TOKEN) and bool(token) and hmac.compare_digest(token, PROFILE_TOKEN)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Échantillonne la pile d'un thread depuis un thread annexe (sys._current_frames)."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """Profil d'une requête : start() dans before_request, stop() dans after_request.
+    En mode cprofile, start() bascule en mode sample si un autre cProfile est déjà actif.
+    """
+
+    def __init__(self, mode: str = "cprofile"):
+        if mode not in MODES:
+            raise ValueError(f"Mode de profilage inconnu : {mode!r} (attendu : {', '.join(MODES)})")
+        self.mode = mode
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self._profile = None
+        self._sampler = None
+
+    def start(self):
+        if self.mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+                return
+            except ValueError:  # profileur installé hors de ce module
+                self._profile = None
+                _cprofile_lock.release()
+        self.mode = "sample"
+        self._sampler = StackSampler(threading.get_ident())
+        self._sampler.start()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+            _cprofile_lock.release()
+        else:
+            self._sampler.stop()
+        self.duration = time.perf_counter() - self._start
+
+    @property
+    def scope(self) -> str:
+        """Threads couverts par le profil : "request" ou "process" (cf. docstring du module)."""
+        return CPROFILE_SCOPE if self.mode == "cprofile" else "request"
+
+    def write(self, path: Path):
+        if self._profile is not None:
+            self._profile.dump_stats(str(path))
+        else:
+            path.write_text(self._sampler.collapsed(), encoding="utf-8")
+
+
+class ProfileStore:
+    """Buffer circulaire de profils sur disque : <id>.json (métadonnées) + <id>.pstats / .collapsed."""
+
+    def __init__(self, directory: Path = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+
+    def save(self, profiler: RequestProfiler, meta: dict) -> str:
+        # Préfixe horodaté : l'ordre alphabétique des fichiers est l'ordre chronologique
+        started = profiler.started_at
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(started)) + f"{int(started % 1 * 1e6):06d}"
+        profile_id = f"{stamp}-{uuid.uuid4().hex[:8]}"
+        artifact = profile_id + ARTIFACT_SUFFIX[profiler.mode]
+        meta = {
+            **meta,
+            "id": profile_id,
+            "mode": profiler.mode,
+            "scope": profiler.scope,
+            "artifact": artifact,
+            "started_at": profiler.started_at,
+            "duration_ms": round(profiler.duration * 1000, 2),
+        }
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.write(self.directory / artifact)
+            (self.directory / f"{profile_id}.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            for old in sorted(self.directory.glob("*.json"))[:-self.keep]:
+                self._delete(old.stem)
+        return profile_id
+
+    def _delete(self, profile_id: str):
+        for suffix in (".json", *ARTIFACT_SUFFIX.values()):
+            (self.directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """Métadonnées des profils, du plus récent au plus ancien."""
+        with self._lock:
+            files = sorted(self.directory.glob("*.json"), reverse=True) if self.directory.exists() else []
+            return [json.loads(f.read_text(encoding="utf-8")) for f in files]
+
+    def artifact_path(self, profile_id: str) -> Path | None:
+        """Chemin de l'artefact d'un profil, ou None s'il n'existe pas (ou plus)."""
+        meta_file = self.directory / f"{Path(profile_id).name}.json"
+        if not meta_file.exists():
+            return None
+        path = self.directory / json.loads(meta_file.read_text(encoding="utf-8"))["artifact"]
+        return path if path.exists() else None
@@ -0,0 +1,271 @@
+"""
+Débit et résilience des requêtes vers op.gg.
+- TokenBucket : seau à jetons (débit en requêtes/s, rafale max `burst`)
+- AdaptiveRateLimiter : un seau par hôte, débit ajusté en AIMD d'après les requêtes
+  observées (+increase par succès, x decrease sur erreur, 429 ou latence anormale)
+- retry_call : nouvelles tentatives avec backoff exponentiel et jitter (full jitter),
+  en respectant un éventuel Retry-After
+- CircuitBreaker : ouvert après N échecs consécutifs -> plus aucune requête pendant
+  `cooldown` s (le scraper sert alors ses caches, même expirés), puis semi-ouvert :
+  une seule requête test, qui referme ou rouvre le circuit
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe. acquire() réserve un jeton et attend qu'il soit disponible
+    (les jetons peuvent être « empruntés » : les appelants sont servis dans l'ordre d'arrivée).
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def reserve(self, timeout: float | None = None) -> float:
+        """Réserve un jeton ; retourne l'attente nécessaire (s). TimeoutError si elle dépasse timeout."""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                raise TimeoutError(f"Pas de jeton avant {timeout}s (débit {self.rate:.2f}/s)")
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, timeout: float | None = None) -> float:
+        wait = self.reserve(timeout)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class AdaptiveRateLimiter:
+    """Débit par hôte en AIMD :
+    - succès : débit + increase (jusqu'à max_rate)
+    - échec, 429, ou latence > slow_factor x latence moyenne : débit x decrease (jusqu'à min_rate),
+      au plus une fois par `hold` s (une rafale d'erreurs simultanées ne compte qu'une fois)
+    """
+
+    def __init__(self, initial_rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 10.0,
+                 increase: float = 0.1, decrease: float = 0.5, burst: float = 2.0,
+                 slow_factor: float = 3.0, hold: float = 1.0):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.slow_factor = slow_factor
+        self.hold = hold
+        self._hosts: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> dict:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = {
+                    "bucket": TokenBucket(self.initial_rate, self.burst),
+                    "latency_ewma": None, "decreased_at": 0.0,
+                    "successes": 0, "failures": 0, "slow": 0, "waited_s": 0.0,
+                }
+            return state
+
+    def acquire(self, host: str, timeout: float | None = None) -> float:
+        """Attend un jeton pour `host`. Retourne l'attente (s)."""
+        state = self._host(host)
+        wait = state["bucket"].acquire(timeout)
+        with self._lock:
+            state["waited_s"] += wait
+        return wait
+
+    def record(self, host: str, ok: bool, latency: float | None = None):
+        """Résultat d'une requête : ajuste le débit de l'hôte."""
+        state = self._host(host)
+        bucket = state["bucket"]
+        with self._lock:
+            avg = state["latency_ewma"]
+            slow = ok and latency is not None and avg is not None and latency > self.slow_factor * avg
+            if ok and latency is not None:
+                state["latency_ewma"] = latency if avg is None else 0.8 * avg + 0.2 * latency
+            if ok and not slow:
+                state["successes"] += 1
+                rate = min(self.max_rate, bucket.rate + self.increase)
+            else:
+                state["slow" if ok else "failures"] += 1
+                now = time.monotonic()
+                if now - state["decreased_at"] < self.hold:
+                    return
+                state["decreased_at"] = now
+                rate = max(self.min_rate, bucket.rate * self.decrease)
+        bucket.set_rate(rate)
+
+    def rate(self, host: str) -> float:
+        return self._host(host)["bucket"].rate
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {
+                "rate": round(s["bucket"].rate, 3),
+                "tokens": round(s["bucket"].tokens, 2),
+                "latency_ewma": s["latency_ewma"],
+                "successes": s["successes"],
+                "failures": s["failures"],
+                "slow": s["slow"],
+                "waited_s": round(s["waited_s"], 3),
+            }
+            for host, s in hosts.items()
+        }
+
+
+# ---------------------------------------------------------------------------
+# Retry avec backoff
+# ---------------------------------------------------------------------------
+
+class RetryableError(Exception):
+    """Échec transitoire : l'appel peut être retenté (après au moins retry_after s si fourni)."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """Full jitter : uniforme dans [0, min(cap, base x 2^attempt)]."""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_call(fn, attempts: int = 3, base: float = 0.5, cap: float = 8.0, retry_after_cap: float = 60.0,
+               sleep=time.sleep, on_retry=None):
+    """fn(), retentée jusqu'à `attempts` fois tant qu'elle lève RetryableError.
+    on_retry(attempt, delay, error) est appelé avant chaque nouvelle tentative.
+    La dernière RetryableError est propagée.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except RetryableError as e:
+            if attempt + 1 >= attempts:
+                raise
+            delay = backoff_delay(attempt, base, cap)
+            if e.retry_after is not None:
+                delay = max(delay, min(e.retry_after, retry_after_cap))
+            if on_retry:
+                on_retry(attempt + 1, delay, e)
+            sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+class CircuitOpenError(RuntimeError):
+    """Circuit ouvert : l'hôte est considéré en panne, aucune requête n'est envoyée."""
+
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """closed -> open après failure_threshold échecs consécutifs ;
+    open -> half_open après cooldown s ; half_open : une requête test à la fois,
+    un succès referme le circuit, un échec le rouvre.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0  # nombre d'ouvertures
+
+    def _update(self, now: float):
+        if self._state == "open" and now - self._opened_at >= self.cooldown:
+            self._state = "half_open"
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update(time.monotonic())
+            return self._state
+
+    def retry_in(self) -> float:
+        """Secondes avant la prochaine requête test (0 si le circuit n'est pas ouvert)."""
+        with self._lock:
+            now = time.monotonic()
+            self._update(now)
+            return max(0.0, self._opened_at + self.cooldown - now) if self._state == "open" else 0.0
+
+    def allow(self) -> bool:
+        """Une requête peut-elle partir ? (en half_open, seule la première est autorisée ;
+        une requête test restée sans résultat depuis cooldown s est remplacée)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._update(now)
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and (not self._probing or now - self._probe_at >= self.cooldown):
+                self._probing = True
+                self._probe_at = now
+                return True
+            return False
+
+    def check(self):
+        """allow() ou CircuitOpenError."""
+        if not self.allow():
+            retry_in = self.retry_in()
+            raise CircuitOpenError(f"{self.name} indisponible (circuit ouvert, nouvel essai dans {retry_in:.0f}s)",
+                                   retry_in)
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._update(time.monotonic())
+            return {"state": self._state, "consecutive_failures": self._failures, "opened": self.opened}
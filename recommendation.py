@@ -1,19 +1,47 @@
 """
 Moteur de recommandation de champions pour DraftForMe.
 
-3 axes :
+4 axes :
   1. Meta : basé sur le RANG dans la tier list op.gg (rang 1 = meilleur)
   2. Pool joueur : champions avec 10+ games (en dessous = pas significatif)
   3. Counter : matchups contre les picks ennemis
+  4. Synergie : paires avec les picks alliés (table précalculée, classes DDragon)
 
 priority (0-100) : 0 = full pool, 50 = mix, 100 = full meta
 """
 
 from __future__ import annotations
 
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
 MIN_GAMES_FOR_POOL = 10  # Seuil : 10+ games pour etre considere comme un pick du joueur
 
 
+def _rank_value(champion_stats: dict) -> float:
+    """Rang numérique ("1" -> 1). 50 si absent ou illisible."""
+    rank = champion_stats.get("rank", 50)
+    if isinstance(rank, (int, float)):
+        return rank
+    try:
+        return int(str(rank).strip())
+    except ValueError:
+        return 50
+
+
+def _parse_count(v) -> int | None:
+    """'1 396 649' / '1,396,649' / 1396649 -> 1396649."""
+    if v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return int(v)
+    digits = "".join(ch for ch in str(v) if ch.isdigit())
+    return int(digits) if digits else None
+
+
 def _safe_float(v, default=0.0) -> float:
     if v is None:
         return default
@@ -33,9 +61,7 @@ def meta_score(champion_stats: dict, total_champions: int) -> float:
     """Score meta (0-100) base sur le rang dans la tier list.
     Rang 1 = 100, dernier rang = ~10.
     """
-    rank = champion_stats.get("rank", 50)
-    if not isinstance(rank, (int, float)):
-        rank = 50
+    rank = _rank_value(champion_stats)
     total = max(total_champions, 1)
     # Rang 1 -> 100, dernier -> 10
     score = 100 - (rank - 1) / total * 90
@@ -86,11 +112,215 @@ def counter_score(
     return max(0, min(100, 50 + avg))
 
 
+# ---------------------------------------------------------------------------
+# Matrice de matchups (counter_score vectorisé)
+# ---------------------------------------------------------------------------
+
+class MatchupMatrix:
+    """Win rates de matchup compilés en matrice dense champion x ennemi.
+    win_rates[i, j] = win rate du champion i contre l'ennemi j, known[i, j] = matchup connu.
+    Les lignes sont indexées par nom exact, les colonnes par nom en minuscules
+    (mêmes règles de lookup que counter_score).
+    """
+
+    __slots__ = ("rows", "cols", "win_rates", "known")
+
+    def __init__(self, rows: dict[str, int], cols: dict[str, int], win_rates: np.ndarray, known: np.ndarray):
+        self.rows = rows
+        self.cols = cols
+        self.win_rates = win_rates
+        self.known = known
+
+    @classmethod
+    def from_matchup_data(cls, matchup_data: dict[str, dict], champions: list[str] | None = None,
+                          enemies: list[str] | None = None) -> MatchupMatrix:
+        """Compile matchup_data. `champions` / `enemies` restreignent les lignes / colonnes
+        (matrice partielle construite à la volée pour une seule requête).
+        """
+        rows: dict[str, int] = {}
+        cols: dict[str, int] = {}
+        enemy_filter = {e.lower() for e in enemies} if enemies is not None else None
+        entries = []
+        for champion in (matchup_data if champions is None else champions):
+            data = matchup_data.get(champion)
+            if data is None:
+                continue
+            i = rows.setdefault(champion, len(rows))
+            for m in data.get("all_matchups", []):
+                if not m.get("enemy"):
+                    continue
+                enemy = m["enemy"].lower()
+                if enemy_filter is not None and enemy not in enemy_filter:
+                    continue
+                j = cols.setdefault(enemy, len(cols))
+                entries.append((i, j, m.get("win_rate")))
+
+        win_rates = np.full((len(rows), len(cols)), 50.0)
+        known = np.zeros((len(rows), len(cols)), dtype=bool)
+        for i, j, wr in entries:  # le dernier matchup listé l'emporte, comme dans counter_score
+            known[i, j] = wr is not None
+            win_rates[i, j] = _safe_float(wr, 50) if wr is not None else 50.0
+        return cls(rows, cols, win_rates, known)
+
+    @property
+    def nbytes(self) -> int:
+        return self.win_rates.nbytes + self.known.nbytes
+
+    def row_ids(self, champion_names) -> np.ndarray:
+        """Indice de ligne de chaque champion (-1 si pas de matchups)."""
+        return np.array([self.rows.get(n, -1) for n in champion_names], dtype=np.intp)
+
+    def counter_scores(self, champion_names: list[str], enemy_picks: list[str]) -> np.ndarray:
+        """counter_score() de chaque champion contre enemy_picks, en une passe."""
+        return self.counter_scores_for_rows(self.row_ids(champion_names), enemy_picks)
+
+    def counter_deltas(self, row_ids: np.ndarray, enemies: list[str]) -> np.ndarray:
+        """Contribution (wr - 50) * 4 de chaque ligne contre chaque ennemi (0 si matchup inconnu)."""
+        deltas = np.zeros((len(row_ids), len(enemies)))
+        has_row = row_ids >= 0
+        safe_rows = np.where(has_row, row_ids, 0)
+        for k, enemy in enumerate(enemies):
+            j = self.cols.get(enemy.lower())
+            if j is None or not self.win_rates.size:
+                continue
+            known = self.known[safe_rows, j] & has_row
+            deltas[:, k] = np.where(known, (self.win_rates[safe_rows, j] - 50) * 4, 0.0)
+        return deltas
+
+    def counter_scores_for_rows(self, row_ids: np.ndarray, enemy_picks: list[str]) -> np.ndarray:
+        if not enemy_picks:
+            return np.full(len(row_ids), 50.0)
+        total = np.zeros(len(row_ids))
+        for column in self.counter_deltas(row_ids, enemy_picks).T:  # même ordre de sommation que counter_score
+            total += column
+        return np.clip(50 + total / len(enemy_picks), 0, 100)
+
+
+# ---------------------------------------------------------------------------
+# Synergie alliée (table de paires précalculée)
+# ---------------------------------------------------------------------------
+
+# Points de synergy_score entre deux classes DDragon (symétrique, 0 si absent) :
+# une frontline qui protège les carries, pas deux rôles identiques.
+TAG_SYNERGY = {
+    ("Tank", "Marksman"): 30,
+    ("Tank", "Mage"): 20,
+    ("Tank", "Assassin"): 10,
+    ("Tank", "Fighter"): 10,
+    ("Tank", "Tank"): -20,
+    ("Support", "Marksman"): 30,
+    ("Support", "Mage"): 10,
+    ("Support", "Fighter"): 10,
+    ("Support", "Support"): -30,
+    ("Fighter", "Mage"): 10,
+    ("Fighter", "Marksman"): 10,
+    ("Mage", "Marksman"): 10,
+    ("Mage", "Mage"): -20,
+    ("Assassin", "Assassin"): -20,
+    ("Marksman", "Marksman"): -30,
+}
+
+
+def _synergy_key(name: str) -> str:
+    """"Kai'Sa" / "KaiSa" / "kaisa" -> "kaisa" (noms DDragon, op.gg et frontend)."""
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+class SynergyTable:
+    """Synergie de chaque paire de champions, en matrice dense int8 (~30 Ko pour 170 champions).
+    pairs[i, j] = points ajoutés au synergy_score de i quand j est un allié.
+    """
+
+    __slots__ = ("index", "pairs")
+
+    def __init__(self, names: list[str], pairs: np.ndarray):
+        self.index = {_synergy_key(n): i for i, n in enumerate(names)}
+        self.pairs = pairs
+        self.pairs.flags.writeable = False
+
+    @classmethod
+    def from_ddragon(cls, ddragon: dict[str, dict], tag_synergy: dict | None = None) -> SynergyTable:
+        """Table dérivée des `tags` de ddragon_champions.json : moyenne sur les paires de classes."""
+        tag_synergy = TAG_SYNERGY if tag_synergy is None else tag_synergy
+        tags = sorted({t for info in ddragon.values() for t in info.get("tags", [])})
+        tag_ids = {t: k for k, t in enumerate(tags)}
+        tag_table = np.zeros((len(tags), len(tags)))
+        for (a, b), points in tag_synergy.items():
+            if a in tag_ids and b in tag_ids:
+                tag_table[tag_ids[a], tag_ids[b]] = tag_table[tag_ids[b], tag_ids[a]] = points
+
+        # Profil de classes de chaque champion (poids égaux entre ses tags)
+        names = list(ddragon)
+        profiles = np.zeros((len(names), len(tags)))
+        for i, name in enumerate(names):
+            champ_tags = [tag_ids[t] for t in ddragon[name].get("tags", [])]
+            if champ_tags:
+                profiles[i, champ_tags] = 1 / len(champ_tags)
+        pairs = np.rint(profiles @ tag_table @ profiles.T).astype(np.int8)
+        return cls(names, pairs)
+
+    @classmethod
+    def from_pairs(cls, pairs: list[dict]) -> SynergyTable:
+        """Table chargée depuis un dataset : [{"champion": "Yasuo", "ally": "Malphite", "synergy": 25}, ...]
+        (synergy en points, symétrisée si la paire inverse est absente).
+        """
+        names = list(dict.fromkeys(n for p in pairs for n in (p["champion"], p["ally"])))
+        ids = {n: i for i, n in enumerate(names)}
+        table = np.zeros((len(names), len(names)), dtype=np.int8)
+        seen = set()
+        for p in pairs:
+            i, j = ids[p["champion"]], ids[p["ally"]]
+            points = int(np.clip(round(_safe_float(p.get("synergy"))), -100, 100))
+            table[i, j] = points
+            seen.add((i, j))
+            if (j, i) not in seen:
+                table[j, i] = points
+        return cls(names, table)
+
+    @property
+    def nbytes(self) -> int:
+        return self.pairs.nbytes
+
+    def ids(self, names) -> np.ndarray:
+        """Indice de chaque champion dans la table (-1 si inconnu)."""
+        return np.array([self.index.get(_synergy_key(n), -1) for n in names], dtype=np.intp)
+
+    def scores_for_ids(self, champion_ids: np.ndarray, ally_picks: list[str]) -> np.ndarray:
+        """synergy_score (0-100) de chaque champion avec les alliés : 50 + moyenne des points."""
+        if not ally_picks:
+            return np.full(len(champion_ids), 50.0)
+        allies = self.ids(ally_picks)
+        allies = allies[allies >= 0]
+        known = champion_ids >= 0
+        total = np.zeros(len(champion_ids))
+        if len(allies):
+            points = self.pairs[np.where(known, champion_ids, 0)][:, allies].sum(axis=1)
+            total = np.where(known, points, 0)
+        return np.clip(50 + total / len(ally_picks), 0, 100)
+
+    def column(self, champion_ids: np.ndarray, ally: str) -> np.ndarray:
+        """Points de synergie de chaque champion avec un seul allié (0 si inconnu)."""
+        j = self.index.get(_synergy_key(ally), -1)
+        known = champion_ids >= 0
+        if j < 0:
+            return np.zeros(len(champion_ids), dtype=np.int64)
+        return np.where(known, self.pairs[np.where(known, champion_ids, 0), j], 0).astype(np.int64)
+
+    def scores(self, champion_names: list[str], ally_picks: list[str]) -> np.ndarray:
+        return self.scores_for_ids(self.ids(champion_names), ally_picks)
+
+
 # ---------------------------------------------------------------------------
 # Poids selon priority
 # ---------------------------------------------------------------------------
 
-def _compute_weights(priority: int, has_enemy: bool, has_pool: bool) -> tuple[float, float, float]:
+def _has_pool(player_pool: list[dict]) -> bool:
+    """Le joueur a au moins 1 champion avec 10+ games."""
+    return any(_safe_float(p.get("games"), 0) >= MIN_GAMES_FOR_POOL for p in player_pool)
+
+
+def _compute_weights(priority: int, has_enemy: bool, has_pool: bool,
+                     has_ally: bool = False) -> tuple[float, float, float, float]:
     p = max(0, min(100, priority)) / 100.0
     base_meta = 0.05 + p * 0.90
     base_player = 0.95 - p * 0.90
@@ -99,18 +329,15 @@ def _compute_weights(priority: int, has_enemy: bool, has_pool: bool) -> tuple[fl
         base_meta = 0.95
         base_player = 0.05
 
-    if has_enemy:
-        counter_share = 0.40
-        w_meta = base_meta * (1 - counter_share)
-        w_player = base_player * (1 - counter_share)
-        w_counter = counter_share
-    else:
-        w_meta = base_meta
-        w_player = base_player
-        w_counter = 0.0
+    counter_share = 0.40 if has_enemy else 0.0
+    synergy_share = 0.15 if has_ally else 0.0
+    w_meta = base_meta * (1 - counter_share - synergy_share)
+    w_player = base_player * (1 - counter_share - synergy_share)
+    w_counter = counter_share
+    w_synergy = synergy_share
 
-    total = w_meta + w_player + w_counter
-    return (w_meta / total, w_player / total, w_counter / total)
+    total = w_meta + w_player + w_counter + w_synergy
+    return (w_meta / total, w_player / total, w_counter / total, w_synergy / total)
 
 
 # ---------------------------------------------------------------------------
@@ -125,20 +352,22 @@ def compute_champion_score(
     matchup_data: dict[str, dict],
     priority: int = 50,
     total_champions: int = 55,
+    counter: float | None = None,
+    ally_picks: list[str] | None = None,
+    synergy: SynergyTable | None = None,
 ) -> dict:
     ms = meta_score(champion_stats, total_champions)
     ps = player_score(champion_name, player_pool)
-    cs = counter_score(champion_name, enemy_picks, matchup_data)
+    cs = counter_score(champion_name, enemy_picks, matchup_data) if counter is None else counter
+    has_ally = bool(ally_picks) and synergy is not None
+    ss = float(synergy.scores([champion_name], ally_picks)[0]) if has_ally else 50
 
     has_enemy = len(enemy_picks) > 0
-    # has_pool = le joueur a au moins 1 champion avec 10+ games
-    has_pool = any(
-        _safe_float(p.get("games"), 0) >= MIN_GAMES_FOR_POOL
-        for p in player_pool
+    w_meta, w_player, w_counter, w_synergy = _compute_weights(
+        priority, has_enemy, _has_pool(player_pool), has_ally,
     )
-    w_meta, w_player, w_counter = _compute_weights(priority, has_enemy, has_pool)
 
-    total = w_meta * ms + w_player * ps + w_counter * cs
+    total = w_meta * ms + w_player * ps + w_counter * cs + w_synergy * ss
 
     # Flags utiles pour le frontend
     is_in_pool = False
@@ -155,18 +384,220 @@ def compute_champion_score(
         "meta_score": round(ms, 1),
         "player_score": round(ps, 1),
         "counter_score": round(cs, 1),
+        "synergy_score": round(ss, 1),
         "is_in_pool": is_in_pool,
         "player_games": int(player_games),
         "weights": {
             "meta": round(w_meta, 3),
             "player": round(w_player, 3),
             "counter": round(w_counter, 3),
+            "synergy": round(w_synergy, 3),
         },
     }
 
 
+# ---------------------------------------------------------------------------
+# Snapshot des stats champions (normalisé une fois au chargement)
+# ---------------------------------------------------------------------------
+
+def _frozen(values, dtype=float) -> np.ndarray:
+    arr = np.array(values, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+
+class ChampionStatsSnapshot:
+    """Tier list normalisée en colonnes typées, immuable et partageable entre requêtes.
+    Accepte toutes les sources (floats de data/*.json, chaînes "49.85%" / "1 396 649"
+    de champions.json) : le hot path de scoring ne parse plus aucune chaîne.
+    """
+
+    __slots__ = ("names", "names_lower", "index", "valid", "ranks", "win_rates", "pick_rates",
+                 "ban_rates", "games_played", "stats", "_matrix_memo", "_synergy_memo")
+
+    def __init__(self, champion_stats: list[dict]):
+        self.names = tuple(c.get("name", "") or "" for c in champion_stats)
+        self.names_lower = tuple(n.lower() for n in self.names)
+        index: dict[str, tuple] = {}
+        for i, n in enumerate(self.names_lower):
+            if n:
+                index[n] = index.get(n, ()) + (i,)
+        self.index = index  # nom en minuscules -> positions (doublons possibles)
+        self.valid = _frozen([bool(n) for n in self.names], dtype=bool)
+        self.ranks = _frozen([_rank_value(c) for c in champion_stats])
+        self.win_rates = _frozen([_safe_float(c.get("win_rate")) for c in champion_stats])
+        self.pick_rates = _frozen([_safe_float(c.get("pick_rate")) for c in champion_stats])
+        self.ban_rates = _frozen([_safe_float(c.get("ban_rate")) for c in champion_stats])
+        self.games_played = tuple(_parse_count(c.get("games_played")) for c in champion_stats)
+        # Bloc "stats" des recommandations, précalculé
+        self.stats = tuple(
+            {
+                "win_rate": float(self.win_rates[i]),
+                "pick_rate": float(self.pick_rates[i]),
+                "ban_rate": float(self.ban_rates[i]),
+                "kda": c.get("kda"),
+                "games_played": c.get("games_played"),
+                "cs": c.get("cs"),
+                "gold": c.get("gold"),
+                "counters": list(c.get("counters", [])),
+                "rank": c.get("rank"),
+            }
+            for i, c in enumerate(champion_stats)
+        )
+        # Mémos (objet source, indices) : un seul tuple, remplacé d'un bloc (snapshot partagé entre threads)
+        self._matrix_memo = (None, None)
+        self._synergy_memo = (None, None)
+
+    @classmethod
+    def of(cls, champion_stats) -> ChampionStatsSnapshot:
+        """Snapshot tel quel, ou construit depuis une liste de dicts."""
+        return champion_stats if isinstance(champion_stats, cls) else cls(champion_stats)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def positions(self, names) -> list[int]:
+        """Positions des champions nommés (insensible à la casse)."""
+        return [i for n in names for i in self.index.get(n.lower(), ())]
+
+    def matrix_rows(self, matrix: MatchupMatrix) -> np.ndarray:
+        """Indices de ligne de chaque champion dans `matrix` (mémorisés pour la dernière matrice)."""
+        memo_matrix, rows = self._matrix_memo
+        if memo_matrix is not matrix:
+            rows = matrix.row_ids(self.names)
+            self._matrix_memo = (matrix, rows)
+        return rows
+
+    def synergy_ids(self, synergy: SynergyTable) -> np.ndarray:
+        """Indices de chaque champion dans la table de synergie (mémorisés pour la dernière table)."""
+        memo_synergy, ids = self._synergy_memo
+        if memo_synergy is not synergy:
+            ids = synergy.ids(self.names)
+            self._synergy_memo = (synergy, ids)
+        return ids
+
+
+# ---------------------------------------------------------------------------
+# Scoring vectorisé : tous les candidats en une passe
+# ---------------------------------------------------------------------------
+
+def _py_clamped(v: float):
+    """Reproduit max(0, min(100, v)) : les bornes sont renvoyées en int (0 / 100)."""
+    if v >= 100:
+        return 100
+    if v <= 0:
+        return 0
+    return v
+
+
+def _py_player_score(v: float, significant: bool, int_score: bool):
+    """Valeur de player_score() avec le même type (int / float) pour une sortie JSON identique."""
+    if not significant:
+        return 5
+    if int_score:
+        return 70
+    return round(_py_clamped(v), 1)
+
+
+def _pool_lookup(player_pool: list[dict]) -> dict[str, dict]:
+    """nom en minuscules -> première entrée du pool (même règle que player_score)."""
+    lookup = {}
+    for p in player_pool:
+        lookup.setdefault(p.get("champion", "").lower(), p)
+    return lookup
+
+
+def score_candidates(
+    snapshot: ChampionStatsSnapshot,
+    idx: np.ndarray,
+    player_pool: list[dict],
+    enemy_picks: list[str],
+    matchup_data: dict[str, dict],
+    priority: int,
+    matchup_matrix: MatchupMatrix | None = None,
+    ally_picks: list[str] | None = None,
+    synergy: SynergyTable | None = None,
+) -> dict:
+    """Scores meta / joueur / counter / synergie / total des candidats `idx` du snapshot, en colonnes.
+    Résultats identiques (bit à bit) à compute_champion_score() appelé champion par champion.
+    """
+    n_all = len(snapshot)
+    # Meta : même formule que meta_score()
+    ms = np.clip(100 - (snapshot.ranks[idx] - 1) / max(n_all, 1) * 90, 0, 100)
+
+    # Joueur : games / WR du pool projetés sur les positions du snapshot
+    games = np.zeros(n_all)
+    wrs = np.full(n_all, 50.0)
+    in_pool = np.zeros(n_all, dtype=bool)
+    wr_missing = np.zeros(n_all, dtype=bool)
+    for name, p in _pool_lookup(player_pool).items():
+        positions = snapshot.index.get(name)
+        if not positions:
+            continue
+        wr = _safe_float(p.get("win_rate"), None)
+        for i in positions:
+            in_pool[i] = True
+            games[i] = _safe_float(p.get("games"), 0)
+            wr_missing[i] = wr is None
+            wrs[i] = 50 if wr is None else wr
+    games, wrs, in_pool, wr_missing = games[idx], wrs[idx], in_pool[idx], wr_missing[idx]
+    significant = in_pool & (games >= MIN_GAMES_FOR_POOL)
+    ps = np.where(significant, np.clip(35 + (wrs - 50) * 2 + np.minimum(games * 0.6, 35), 0, 100), 5.0)
+    # player_score() renvoie l'int 70 quand le WR manque et que le bonus games est plafonné
+    int_player = wr_missing & (games * 0.6 > 35)
+
+    # Counter
+    if not enemy_picks:
+        cs = np.full(len(idx), 50.0)
+    elif matchup_matrix is not None:
+        cs = matchup_matrix.counter_scores_for_rows(snapshot.matrix_rows(matchup_matrix)[idx], enemy_picks)
+    else:
+        names = [snapshot.names[i] for i in idx]
+        matrix = MatchupMatrix.from_matchup_data(matchup_data, champions=names, enemies=enemy_picks)
+        cs = matrix.counter_scores(names, enemy_picks)
+
+    # Synergie
+    has_ally = bool(ally_picks) and synergy is not None
+    if has_ally:
+        ss = synergy.scores_for_ids(snapshot.synergy_ids(synergy)[idx], ally_picks)
+    else:
+        ss = np.full(len(idx), 50.0)
+
+    weights = _compute_weights(priority, bool(enemy_picks), _has_pool(player_pool), has_ally)
+    w_meta, w_player, w_counter, w_synergy = weights
+    total = w_meta * ms + w_player * ps + w_counter * cs + w_synergy * ss
+
+    return {
+        "meta": ms,
+        "player": ps,
+        "counter": cs,
+        "synergy": ss,
+        "has_ally": has_ally,
+        "total": total,
+        "significant": significant,
+        "int_player": int_player,
+        "player_games": games,
+        "weights": weights,
+    }
+
+
+def _top_indices(keys: list[float], top_n: int) -> list[int]:
+    """Indices triés par clé décroissante (ordre d'origine en cas d'égalité), limités à top_n.
+    Sélection partielle (argpartition) puis tri des seuls survivants.
+    """
+    arr = np.asarray(keys, dtype=float)
+    n = len(arr)
+    if 0 < top_n < n:
+        threshold = arr[np.argpartition(-arr, top_n - 1)[:top_n]].min()
+        selected = np.flatnonzero(arr >= threshold)  # garde toutes les égalités au seuil
+    else:
+        selected = np.arange(n)
+    order = selected[np.lexsort((selected, -arr[selected]))]
+    return order.tolist()[:top_n]
+
+
 def recommend_champions(
-    all_champion_stats: list[dict],
+    all_champion_stats: list[dict] | ChampionStatsSnapshot,
     player_pool: list[dict],
     enemy_picks: list[str] | None = None,
     matchup_data: dict[str, dict] | None = None,
@@ -175,35 +606,127 @@ def recommend_champions(
     already_picked: list[str] | None = None,
     priority: int = 50,
     top_n: int = 10,
+    matchup_matrix: MatchupMatrix | None = None,
+    ally_picks: list[str] | None = None,
+    synergy: SynergyTable | None = None,
 ) -> list[dict]:
+    """`ally_picks` : picks alliés (exclus des candidats), scorés avec la table `synergy`."""
     enemy_picks = enemy_picks or []
+    ally_picks = ally_picks or []
     matchup_data = matchup_data or {}
-    banned = set(c.lower() for c in (banned_champions or []))
-    picked = set(c.lower() for c in (already_picked or []))
-    total_champions = len(all_champion_stats)
-
-    scored = []
-    for champ_stat in all_champion_stats:
-        name = champ_stat.get("name", "")
-        if not name or name.lower() in banned or name.lower() in picked:
-            continue
+    snapshot = ChampionStatsSnapshot.of(all_champion_stats)
+
+    eligible = snapshot.valid.copy()
+    eligible[snapshot.positions(banned_champions or [])] = False
+    eligible[snapshot.positions(already_picked or [])] = False
+    eligible[snapshot.positions(ally_picks)] = False
+    idx = np.flatnonzero(eligible)
+    if not len(idx):
+        return []
+
+    scores = score_candidates(
+        snapshot, idx, player_pool, enemy_picks, matchup_data, priority, matchup_matrix,
+        ally_picks, synergy,
+    )
+    total_scores = [round(t, 1) for t in scores["total"].tolist()]
+    return [
+        format_recommendation(snapshot, idx[k], scores, k, total_scores[k], bool(enemy_picks))
+        for k in _top_indices(total_scores, top_n)
+    ]
+
+
+def format_recommendation(snapshot: ChampionStatsSnapshot, i: int, scores: dict, k: int,
+                          total_score: float, has_enemy: bool) -> dict:
+    """Recommandation JSON du champion i du snapshot (colonne k des scores de score_candidates)."""
+    significant = bool(scores["significant"][k])
+    w_meta, w_player, w_counter, w_synergy = scores["weights"]
+    return {
+        "champion": snapshot.names[i],
+        "total_score": total_score,
+        "meta_score": round(_py_clamped(float(scores["meta"][k])), 1),
+        "player_score": _py_player_score(float(scores["player"][k]), significant, bool(scores["int_player"][k])),
+        "counter_score": round(_py_clamped(float(scores["counter"][k])), 1) if has_enemy else 50,
+        "synergy_score": round(float(scores["synergy"][k]), 1) if scores["has_ally"] else 50,
+        "is_in_pool": significant,
+        "player_games": int(scores["player_games"][k]),
+        "weights": {
+            "meta": round(w_meta, 3),
+            "player": round(w_player, 3),
+            "counter": round(w_counter, 3),
+            "synergy": round(w_synergy, 3),
+        },
+        "stats": {**snapshot.stats[i], "counters": list(snapshot.stats[i]["counters"])},
+    }
 
-        result = compute_champion_score(
-            champ_stat, name, player_pool, enemy_picks, matchup_data,
-            priority, total_champions,
-        )
-        result["stats"] = {
-            "win_rate": _safe_float(champ_stat.get("win_rate")),
-            "pick_rate": _safe_float(champ_stat.get("pick_rate")),
-            "ban_rate": _safe_float(champ_stat.get("ban_rate")),
-            "kda": champ_stat.get("kda"),
-            "games_played": champ_stat.get("games_played"),
-            "cs": champ_stat.get("cs"),
-            "gold": champ_stat.get("gold"),
-            "counters": champ_stat.get("counters", []),
-            "rank": champ_stat.get("rank"),
-        }
-        scored.append(result)
-
-    scored.sort(key=lambda x: x["total_score"], reverse=True)
-    return scored[:top_n]
+
+# ---------------------------------------------------------------------------
+# Batch : beaucoup de drafts, données chargées une seule fois
+# ---------------------------------------------------------------------------
+
+def recommend_batch(drafts, load, synergy: SynergyTable | None = None, workers: int = 1):
+    """Recommandations pour une suite de drafts (body de /api/recommend), dans l'ordre.
+    `load(region, tier, role) -> (snapshot, matchup_data, matchup_matrix)` n'est appelé
+    qu'une fois par tier list : toutes les drafts qui la partagent réutilisent le même
+    snapshot et la même matrice. Le scoring est réparti sur `workers` threads, avec au
+    plus quelques drafts d'avance (mémoire bornée même pour des milliers de drafts).
+    Génère {"index": i, "recommendations": [...]} ou {"index": i, "error": "..."}.
+    """
+    loaded: dict[tuple, tuple] = {}
+
+    def prepare(draft):
+        if not isinstance(draft, dict):
+            raise ValueError("draft invalide (objet JSON attendu)")
+        key = (draft.get("region", "euw"), draft.get("tier", "emerald_plus"), draft.get("role", "all"))
+        if key not in loaded:
+            try:
+                loaded[key] = load(*key)
+            except Exception as e:
+                loaded[key] = e  # une tier list introuvable n'est pas rechargée pour chaque draft
+        if isinstance(loaded[key], Exception):
+            raise loaded[key]
+        return loaded[key]
+
+    def run(i, draft, resources=None):
+        try:
+            if resources is None:
+                resources = prepare(draft)
+            snapshot, matchup_data, matchup_matrix = resources
+            enemy_picks = draft.get("enemy_picks", [])
+            recs = recommend_champions(
+                snapshot,
+                player_pool=draft.get("player_pool", []),
+                enemy_picks=enemy_picks,
+                matchup_data=matchup_data,
+                role=draft.get("role", "all"),
+                banned_champions=draft.get("banned", []),
+                already_picked=draft.get("already_picked", []),
+                priority=draft.get("priority", 50),
+                top_n=draft.get("top_n", 10),
+                matchup_matrix=matchup_matrix,
+                ally_picks=draft.get("ally_picks", []),
+                synergy=synergy,
+            )
+        except Exception as e:
+            return {"index": i, "error": str(e) or type(e).__name__}
+        return {"index": i, "recommendations": recs}
+
+    if workers <= 1:
+        for i, draft in enumerate(drafts):
+            yield run(i, draft)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        pending: deque = deque()  # résultats (dict) ou futures, dans l'ordre des drafts
+        for i, draft in enumerate(drafts):
+            try:
+                resources = prepare(draft)  # chargement dans ce thread : pas de lock côté workers
+            except Exception as e:
+                pending.append({"index": i, "error": str(e) or type(e).__name__})
+            else:
+                pending.append(executor.submit(run, i, draft, resources))
+            while len(pending) > workers * 4:
+                item = pending.popleft()
+                yield item if isinstance(item, dict) else item.result()
+        while pending:
+            item = pending.popleft()
+            yield item if isinstance(item, dict) else item.result()
@@ -0,0 +1,99 @@
+"""
+DraftForMe - Service de scraping (processus séparé, propriétaire des navigateurs).
+
+En mode multi-processus (serve.py), les workers Flask n'envoient aucune requête à op.gg :
+ils demandent à ce service (DRAFTFORME_SCRAPER_URL) le HTML servi en HTTP (/fetch) ou la page
+rendue en JavaScript (/render). Le service garde l'unique pool de drivers
+(DRAFTFORME_DRIVER_POOL_SIZE), l'unique limiteur de débit et circuit op.gg
+(DRAFTFORME_RATE_LIMIT est donc un débit global, pas par worker), et partage une même
+requête entre les workers qui demandent la même URL en même temps.
+Les workers parsent le HTML et écrivent le cache disque partagé (cache_io / store.py).
+
+    python scraper_service.py --port 5001
+"""
+
+import argparse
+from urllib.parse import urlparse
+
+from flask import Flask, jsonify, request
+
+import opgg_scraper
+from cache import SingleFlight
+from ratelimit import CircuitOpenError
+
+app = Flask(__name__)
+
+ALLOWED_HOSTS = ("op.gg", "www.op.gg")  # pas de proxy ouvert : seules les pages op.gg sont demandées
+_renders = SingleFlight(timeout=opgg_scraper.SCRAPE_WAIT_TIMEOUT)
+_fetches = SingleFlight(timeout=opgg_scraper.SCRAPE_WAIT_TIMEOUT)
+
+
+def _invalid_url(url: str):
+    """Réponse 400 si `url` n'est pas une page op.gg, sinon None."""
+    parsed = urlparse(url)
+    if parsed.scheme != "https" or parsed.hostname not in ALLOWED_HOSTS:
+        return jsonify({"error": f"URL non autorisée : {url!r}"}), 400
+    return None
+
+
+def _run(flight: SingleFlight, url: str, fn):
+    """{"html": fn()} ; 503 + retry_in si le circuit op.gg est ouvert, 502 sur les autres erreurs."""
+    try:
+        html = flight.do(url, fn)
+    except CircuitOpenError as e:
+        return jsonify({"error": str(e), "retry_in": e.retry_in}), 503
+    except Exception as e:
+        print(f"[!] Requête impossible {url} : {e}")
+        return jsonify({"error": str(e)}), 502
+    return jsonify({"html": html})
+
+
+@app.route("/render", methods=["POST"])
+def render():
+    """{"url": ..., "page": <type de page PAGE_READY>} -> {"html": ...}"""
+    body = request.get_json(silent=True) or {}
+    url, page = body.get("url", ""), body.get("page", "")
+    denied = _invalid_url(url)
+    if denied:
+        return denied
+    if page not in opgg_scraper.PAGE_READY:
+        return jsonify({"error": f"Type de page inconnu : {page!r}"}), 400
+    return _run(_renders, url, lambda: opgg_scraper._selenium_get(url, page))
+
+
+@app.route("/fetch", methods=["POST"])
+def fetch():
+    """{"url": ...} -> {"html": ... ou null} : requête HTTP simple (sans Chrome)."""
+    url = (request.get_json(silent=True) or {}).get("url", "")
+    return _invalid_url(url) or _run(_fetches, url, lambda: opgg_scraper._http_get(url))
+
+
+@app.route("/health")
+def health():
+    return jsonify({
+        "status": "ok",
+        "driver_pool": opgg_scraper.driver_pool_stats(),
+        "page_timings": opgg_scraper.page_timing_stats(),
+        "opgg": opgg_scraper.resilience_stats(),
+        "coalesced": _renders.coalesced + _fetches.coalesced,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service de scraping DraftForMe (pool Chrome partagé)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    args = parser.parse_args()
+
+    # Ce processus rend les pages lui-même, même s'il hérite de l'URL du service
+    opgg_scraper.SCRAPER_SERVICE_URL = ""
+    print(f"[*] Service de scraping sur http://{args.host}:{args.port} "
+          f"({opgg_scraper.DRIVER_POOL_SIZE} drivers max)")
+    try:
+        app.run(host=args.host, port=args.port, threaded=True, use_reloader=False)
+    finally:
+        opgg_scraper.close_driver()
+
+
+if __name__ == "__main__":
+    main()
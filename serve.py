@@ -0,0 +1,202 @@
+"""
+DraftForMe - Serveur de production multi-processus.
+
+    python serve.py --workers 4 --port 8000
+
+Lance :
+  - un service de scraping (scraper_service.py), seul processus à envoyer des requêtes à
+    op.gg (HTTP et Chrome) : le débit DRAFTFORME_RATE_LIMIT et le circuit sont globaux,
+    pas multipliés par le nombre de workers ;
+  - N workers WSGI (gunicorn s'il est installé, sinon pré-fork werkzeug sur un socket
+    partagé) : /api/recommend, CPU-bound, passe à l'échelle sur plusieurs cœurs.
+Les workers et le service partagent le cache disque (data/*.json sous verrou, ou
+DRAFTFORME_CACHE_BACKEND=sqlite). Les caches mémoire de chaque worker sont relus depuis
+le disque toutes les DRAFTFORME_WORKER_CACHE_TTL s (60 par défaut dans ce mode).
+
+L'état en mémoire reste propre à chaque worker : sessions de draft (l'interface en recrée
+une si la requête tombe sur un autre worker), jobs asynchrones (?async=1), player pool
+manuel, métriques. Pour les clients qui suivent un job, passer par un répartiteur avec
+affinité de session, ou lancer avec --workers 1.
+"""
+
+import argparse
+import importlib.util
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_WORKER_CACHE_TTL = "60"
+SCRAPER_START_TIMEOUT = 30  # secondes
+
+
+# ---------------------------------------------------------------------------
+# Service de scraping
+# ---------------------------------------------------------------------------
+
+def start_scraper_service(host: str, port: int) -> subprocess.Popen:
+    """Démarre scraper_service.py et attend qu'il réponde sur /health."""
+    env = {k: v for k, v in os.environ.items() if k != "DRAFTFORME_SCRAPER_URL"}
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "scraper_service.py"), "--host", host, "--port", str(port)],
+        env=env,
+    )
+    url = f"http://{host}:{port}"
+    deadline = time.monotonic() + SCRAPER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Le service de scraping s'est arrêté (code {proc.returncode})")
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"Le service de scraping ne répond pas sur {url}")
+
+
+def stop_process(proc: subprocess.Popen | None, timeout: float = 10):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ---------------------------------------------------------------------------
+# Workers WSGI
+# ---------------------------------------------------------------------------
+
+def worker_env(scraper_url: str) -> dict:
+    """Variables d'environnement des workers (héritées par gunicorn / les processus forkés)."""
+    return {
+        "DRAFTFORME_SCRAPER_URL": scraper_url,
+        "DRAFTFORME_WORKER_CACHE_TTL": os.environ.get("DRAFTFORME_WORKER_CACHE_TTL", DEFAULT_WORKER_CACHE_TTL),
+    }
+
+
+def run_gunicorn(args) -> int:
+    cmd = [
+        sys.executable, "-m", "gunicorn", "app:app",
+        "--bind", f"{args.host}:{args.port}",
+        "--workers", str(args.workers),
+        "--threads", str(args.threads),
+        "--timeout", "200",  # > SCRAPE_WAIT_TIMEOUT : un scrape à froid ne tue pas le worker
+        "--chdir", str(ROOT),
+    ]
+    return subprocess.call(cmd)
+
+
+def _serve_worker(sock: socket.socket):
+    """Corps d'un worker forké : importe l'app (après le fork) et sert le socket partagé."""
+    from werkzeug.serving import make_server
+
+    import app as draftforme
+
+    # SIGTERM du parent -> sortie propre de serve_forever (qui intercepte KeyboardInterrupt)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    server = make_server(sock.getsockname()[0], sock.getsockname()[1], draftforme.app,
+                         threaded=True, fd=sock.fileno())
+    try:
+        server.serve_forever()
+    finally:
+        draftforme._jobs.shutdown()
+        draftforme._prefetch_jobs.shutdown()
+        draftforme.shutdown_pool()
+
+
+def _fork_worker(sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _serve_worker(sock)
+        except BaseException as e:
+            print(f"[!] Worker {os.getpid()} : {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def run_prefork(args) -> int:
+    """N processus forkés qui acceptent les connexions sur un même socket ; un worker mort est relancé."""
+    if not hasattr(os, "fork"):
+        print("[!] Pré-fork indisponible sur cette plateforme : installer gunicorn ou lancer app.py")
+        return 1
+    sock = socket.create_server((args.host, args.port), backlog=128)
+    sock.set_inheritable(True)
+    workers = {_fork_worker(sock) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"[!] Worker {pid} arrêté (statut {status}), relance")
+            workers.add(_fork_worker(sock))
+    sock.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DraftForMe en production (workers + service de scraping)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=4, help="threads par worker (gunicorn)")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "prefork"], default="auto")
+    parser.add_argument("--scraper-port", type=int, default=5001)
+    parser.add_argument("--scraper-url", default="",
+                        help="service de scraping déjà lancé (sinon démarré ici)")
+    args = parser.parse_args()
+
+    server = args.server
+    if server == "auto":
+        server = "gunicorn" if importlib.util.find_spec("gunicorn") else "prefork"
+
+    scraper = None
+    scraper_url = args.scraper_url.rstrip("/")
+    if not scraper_url:
+        scraper = start_scraper_service("127.0.0.1", args.scraper_port)
+        scraper_url = f"http://127.0.0.1:{args.scraper_port}"
+    os.environ.update(worker_env(scraper_url))
+
+    print("=" * 50)
+    print(f"  DraftForMe - http://{args.host}:{args.port}")
+    print(f"  {args.workers} workers ({server}), scraping : {scraper_url}")
+    print("=" * 50)
+    try:
+        code = run_gunicorn(args) if server == "gunicorn" else run_prefork(args)
+    finally:
+        stop_process(scraper)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ const state = {
     region:'euw', role:'mid', priority:50, clickMode:'enemy',
     ddragon:{}, championStats:[], playerPool:[], enemyPicks:[], bannedChamps:[],
     recommendations:[], statsLoaded:false, currentStatsRole:null, helpVisible:false,
+    draftSession:null, // {id, key} : session serveur, seules les différences sont recalculées
 };
 const MIN_GAMES = 10;
 
@@ -193,11 +194,17 @@ function filterPoolGrid(){renderPoolEditorGrid()}
 /* ===================== RECOMMENDATIONS ===================== */
 async function updateRecommendations(){
     if(!state.statsLoaded)return;
+    const draft={player_pool:state.playerPool,enemy_picks:state.enemyPicks,banned:state.bannedChamps,
+        already_picked:state.enemyPicks,role:state.role,region:state.region,priority:state.priority,top_n:10};
+    const key=`${state.region}/${state.role}`,opts=(method)=>({method,headers:{'Content-Type':'application/json'},body:JSON.stringify(draft)});
     try{
-        state.recommendations=await(await fetch('/api/recommend',{method:'POST',headers:{'Content-Type':'application/json'},
-            body:JSON.stringify({player_pool:state.playerPool,enemy_picks:state.enemyPicks,banned:state.bannedChamps,
-                already_picked:state.enemyPicks,role:state.role,region:state.region,priority:state.priority,top_n:10})})).json();
-    }catch(e){state.recommendations=[]}
+        let r=null;
+        if(state.draftSession&&state.draftSession.key===key)r=await fetch(`/api/draft/session/${state.draftSession.id}`,opts('PUT'));
+        if(!r||r.status===404){r=await fetch('/api/draft/session',opts('POST'));state.draftSession=null}
+        const d=await r.json();
+        if(!r.ok)throw new Error(d.error);
+        state.draftSession={id:d.session_id,key};state.recommendations=d.recommendations;
+    }catch(e){state.recommendations=[];state.draftSession=null}
     renderRecommendations();renderChampionGrid();
 }
 
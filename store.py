@@ -0,0 +1,209 @@
+"""
+Stockage des caches scrapés dans une base SQLite unique (au lieu d'un data/<clé>.json par page).
+- une ligne typée par enregistrement : (kind, region, tier, role, champion) -> JSON compact
+- écritures atomiques (transaction SQLite), lectures concurrentes (WAL)
+- colonne TTL + date de mise à jour, purge des enregistrements expirés
+- lectures groupées (ex: tous les matchups d'un rôle en une requête)
+- migrate_json_cache() importe les data/*.json existants
+
+Activé dans le scraper avec DRAFTFORME_CACHE_BACKEND=sqlite. Migration :
+    python store.py --migrate
+    python store.py --stats
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from cache_io import CorruptCacheError, read_json
+
+DEFAULT_DB = Path(__file__).parent / "data" / "draftforme.db"
+
+# Préfixe de clé de cache -> kind. Les clés viennent des fetch_* de opgg_scraper :
+#   tierlist_{region}_{tier}_{position}, build_{slug}_{position}_{region},
+#   matchups_{slug}_{role}_{region}, player_{region}_{nom}, ddragon_champions
+KINDS = ("tierlist", "build", "matchups", "player", "ddragon")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind       TEXT NOT NULL,
+    region     TEXT NOT NULL DEFAULT '',
+    tier       TEXT NOT NULL DEFAULT '',
+    role       TEXT NOT NULL DEFAULT '',
+    champion   TEXT NOT NULL DEFAULT '',
+    data       BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    ttl_h      REAL,
+    PRIMARY KEY (kind, region, tier, role, champion)
+) WITHOUT ROWID;
+"""
+
+
+def parse_cache_key(cache_key: str) -> tuple[str, str, str, str, str]:
+    """Clé de cache du scraper -> (kind, region, tier, role, champion).
+    Les clés inconnues sont gardées telles quelles dans `kind`.
+    """
+    kind, _, rest = cache_key.partition("_")
+    if kind == "tierlist" and rest.count("_") >= 2:
+        region, rest = rest.split("_", 1)
+        tier, position = rest.rsplit("_", 1)
+        return kind, region, tier, position, ""
+    if kind in ("build", "matchups") and rest.count("_") >= 2:
+        slug, role, region = rest.rsplit("_", 2)
+        return kind, region, "", role, slug
+    if kind == "player" and "_" in rest:
+        region, name = rest.split("_", 1)
+        return kind, region, "", "", name
+    if cache_key == "ddragon_champions":
+        return "ddragon", "", "", "", ""
+    return cache_key, "", "", "", ""
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(blob: bytes):
+    return json.loads(blob)
+
+
+class Store:
+    """Base SQLite des caches. Une connexion par thread ; les écritures sont sérialisées par SQLite."""
+
+    def __init__(self, path: str | Path = DEFAULT_DB):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, cache_key: str):
+        """(contenu, âge en heures) de la clé, ou (None, None)."""
+        row = self._connect().execute(
+            "SELECT data, updated_at FROM records"
+            " WHERE kind = ? AND region = ? AND tier = ? AND role = ? AND champion = ?",
+            parse_cache_key(cache_key),
+        ).fetchone()
+        if row is None:
+            return None, None
+        return _decode(row[0]), (time.time() - row[1]) / 3600
+
+    def put(self, cache_key: str, data, ttl_h: float | None = None, updated_at: float | None = None):
+        self.put_many([(cache_key, data, ttl_h, updated_at)])
+
+    def put_many(self, records):
+        """Écrit [(cache_key, data, ttl_h, updated_at)] en une seule transaction (tout ou rien)."""
+        now = time.time()
+        rows = [
+            (*parse_cache_key(key), _encode(data), now if updated_at is None else updated_at, ttl_h)
+            for key, data, ttl_h, updated_at in records
+        ]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def bulk(self, kind: str, region: str | None = None, tier: str | None = None,
+             role: str | None = None) -> dict[str, tuple]:
+        """Tous les enregistrements d'un kind filtrés par region / tier / role :
+        {champion: (contenu, âge en heures)}. Ex: bulk("matchups", region="euw", role="mid").
+        """
+        clauses, params = ["kind = ?"], [kind]
+        for column, value in (("region", region), ("tier", tier), ("role", role)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        now = time.time()
+        rows = self._connect().execute(
+            f"SELECT champion, data, updated_at FROM records WHERE {' AND '.join(clauses)}", params
+        )
+        return {champion: (_decode(blob), (now - updated_at) / 3600) for champion, blob, updated_at in rows}
+
+    def delete(self, cache_key: str):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM records WHERE kind = ? AND region = ? AND tier = ? AND role = ? AND champion = ?",
+                parse_cache_key(cache_key),
+            )
+
+    def purge_expired(self, grace_h: float = 0) -> int:
+        """Supprime les enregistrements expirés depuis plus de grace_h heures. Retourne leur nombre."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM records WHERE ttl_h IS NOT NULL AND updated_at + (ttl_h + ?) * 3600 < ?",
+                (grace_h, time.time()),
+            )
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        rows = self._connect().execute(
+            "SELECT kind, COUNT(*), SUM(LENGTH(data)) FROM records GROUP BY kind ORDER BY kind"
+        ).fetchall()
+        return {
+            "path": str(self.path),
+            "file_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "kinds": {kind: {"records": n, "bytes": size or 0} for kind, n, size in rows},
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def migrate_json_cache(data_dir: str | Path, store: Store, ttl_by_kind: dict[str, float] | None = None) -> dict:
+    """Importe les data/<clé>.json du scraper (date de modification conservée comme date de mise à jour).
+    Les fichiers qui ne sont pas des caches du scraper (ex: champion_stats_*.json) sont ignorés.
+    """
+    ttl_by_kind = ttl_by_kind or {}
+    records, skipped = [], []
+    for f in sorted(Path(data_dir).glob("*.json")):
+        kind = parse_cache_key(f.stem)[0]
+        if kind not in KINDS:
+            skipped.append(f.name)
+            continue
+        try:
+            data, mtime = read_json(f)
+        except (OSError, CorruptCacheError):
+            skipped.append(f.name)
+            continue
+        records.append((f.stem, data, ttl_by_kind.get(kind), mtime))
+    store.put_many(records)
+    return {"imported": len(records), "skipped": skipped}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Base SQLite des caches DraftForMe")
+    parser.add_argument("--db", default=str(DEFAULT_DB))
+    parser.add_argument("--migrate", action="store_true", help="Importe les data/*.json existants")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DB.parent))
+    parser.add_argument("--purge", action="store_true", help="Supprime les enregistrements expirés")
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args()
+
+    db = Store(args.db)
+    if args.migrate:
+        import opgg_scraper
+
+        report = migrate_json_cache(args.data_dir, db, opgg_scraper.CACHE_TTL_H)
+        print(f"[*] {report['imported']} fichiers importés dans {args.db}")
+        for name in report["skipped"]:
+            print(f"    ignoré : {name}")
+    if args.purge:
+        print(f"[*] {db.purge_expired()} enregistrements expirés supprimés")
+    if args.stats or not (args.migrate or args.purge):
+        print(json.dumps(db.stats(), indent=2))
@@ -0,0 +1,992 @@
+"""
+Tests DraftForMe (offline : aucun accès réseau, aucun Chrome).
+Lancer avec : python -m pytest test/test.py
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import cache_io
+import crawler
+import metrics
+import opgg_scraper
+import profiling
+import ratelimit
+import scraper_service
+from cache import LRUCache, SingleFlight
+from jobs import JobManager, JobQueueFull
+from draft_session import LIST_OPS, DraftSession
+from draft_sim import build_context, simulate_draft
+from store import Store, migrate_json_cache, parse_cache_key
+from recommendation import ChampionStatsSnapshot, MatchupMatrix, SynergyTable, recommend_batch, _safe_float, compute_champion_score, counter_score, recommend_champions
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+PROFILE_HTML = (DATA_DIR / "debug_profile.html").read_text(encoding="utf-8")
+
+
+
+def read_cache(name: str | Path, directory: Path = DATA_DIR):
+    """Contenu d'un cache data/*.json, avec ou sans enveloppe de somme de contrôle (cache_io)."""
+    data, _ = cache_io.read_json(directory / name)
+    return data
+
+
+TIERLIST_HTML = """
+<table><tbody>
+<tr><td>1</td><td><a href="/lol/champions/jinx/build/adc">Jinx</a></td>
+<td>52.05%</td><td>15.33%</td><td>4.44%</td>
+<td><a href="/lol/champions/jinx/counters/adc?target_champion=velkoz"><img alt="Vel'Koz"></a></td></tr>
+<tr><td>2</td><td><a href="/lol/champions/caitlyn/build/adc">Caitlyn</a></td>
+<td>50.41%</td><td>19.61%</td><td>28.62%</td></tr>
+</tbody></table>
+"""
+
+
+class FakeDriver:
+    """Driver minimal pour tester le pool sans Chrome."""
+
+    created = 0
+
+    def __init__(self, headless=True):
+        FakeDriver.created += 1
+        self.alive = True
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("session morte")
+        return 1
+
+    def get(self, url):
+        time.sleep(0.05)
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+# ---------------------------------------------------------------------------
+# Pool de drivers
+# ---------------------------------------------------------------------------
+
+def test_driver_pool_bounded_and_recycled():
+    FakeDriver.created = 0
+    pool = opgg_scraper.DriverPool(size=2, max_pages=3, factory=FakeDriver)
+    in_use = []
+    peak = []
+
+    def worker():
+        with pool.borrow() as d:
+            in_use.append(d)
+            peak.append(len(in_use))
+            d.get("https://op.gg")
+            pool.note_page(d)
+            in_use.remove(d)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(peak) <= 2
+    assert FakeDriver.created == 4  # 8 pages / 3 pages par driver -> recyclés
+    pool.close()
+    assert pool.stats()["created"] == 0
+
+
+def test_driver_pool_replaces_dead_driver():
+    pool = opgg_scraper.DriverPool(size=1, factory=FakeDriver)
+    with pool.borrow() as d:
+        d.alive = False
+    with pool.borrow() as d2:
+        assert d2 is not d and d2.alive
+    assert d.quit_calls == 1
+    pool.close()
+
+
+# ---------------------------------------------------------------------------
+# Readiness
+# ---------------------------------------------------------------------------
+
+class GrowingTableDriver(FakeDriver):
+    """Les lignes apparaissent progressivement puis se stabilisent."""
+
+    def __init__(self, final_rows=5):
+        super().__init__()
+        self.final_rows = final_rows
+        self.start = time.monotonic()
+
+    def find_elements(self, by, selector):
+        rows = int((time.monotonic() - self.start) / 0.05)
+        return [object()] * min(rows, self.final_rows)
+
+
+def test_wait_for_page_returns_once_rows_are_stable():
+    start = time.monotonic()
+    assert opgg_scraper._wait_for_page(GrowingTableDriver(), "matchups")
+    elapsed = time.monotonic() - start
+    assert elapsed < 2  # bien en dessous de l'ancien time.sleep(3)
+    stats = opgg_scraper.page_timing_stats()["matchups"]
+    assert stats["count"] >= 1 and stats["last"] <= elapsed
+
+
+# ---------------------------------------------------------------------------
+# Fast path HTTP (fixtures HTML, pas de Chrome)
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def offline_scraper(monkeypatch, tmp_path):
+    """Scraper branché sur des pages HTML fixes ; Selenium interdit par défaut."""
+    pages = {}
+    monkeypatch.setattr(opgg_scraper, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(opgg_scraper, "FETCH_MODE", "auto")
+    monkeypatch.setattr(opgg_scraper, "_http_get", lambda url: pages.get(url.split("?")[0]))
+
+    def no_selenium(url, page):
+        raise AssertionError(f"Selenium utilisé pour {url}")
+
+    monkeypatch.setattr(opgg_scraper, "_selenium_get", no_selenium)
+    return pages
+
+
+def test_tierlist_http_fast_path(offline_scraper):
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    champions = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert [c["name"] for c in champions] == ["Jinx", "Caitlyn"]
+    assert champions[0]["win_rate"] == 52.05
+    assert champions[0]["counters"] == ["velkoz"]
+
+
+def test_player_summary_http_fast_path(offline_scraper, monkeypatch):
+    offline_scraper["https://op.gg/lol/summoners/euw/theslim194-EUW"] = PROFILE_HTML
+    selenium_pages = []
+    monkeypatch.setattr(
+        opgg_scraper, "_selenium_get", lambda url, page: selenium_pages.append(page) or ""
+    )
+    profile = opgg_scraper.fetch_player_profile("theslim194#EUW", "euw")
+    names = [c["champion"] for c in profile["most_played"]]
+    assert "Braum" in names and len(names) == len(set(names)) == 8
+    # Pas de fixture pour /champions -> seule cette page passe par Selenium
+    assert selenium_pages == ["player_champions"]
+
+
+def test_selenium_fallback_when_http_has_no_data(offline_scraper, monkeypatch):
+    offline_scraper["https://op.gg/lol/champions"] = "<html><body>loading</body></html>"
+    calls = []
+
+    def fake_selenium(url, page):
+        calls.append(page)
+        return TIERLIST_HTML
+
+    monkeypatch.setattr(opgg_scraper, "_selenium_get", fake_selenium)
+    champions = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert calls == ["tierlist"] and len(champions) == 2
+
+
+def test_lxml_backend_matches_html_parser(monkeypatch):
+    pytest.importorskip("lxml")
+    monkeypatch.setattr(opgg_scraper, "PARSER_BACKEND", "html.parser")
+    reference = opgg_scraper._parse_player_summary(PROFILE_HTML)
+    monkeypatch.setattr(opgg_scraper, "PARSER_BACKEND", "lxml")
+    assert opgg_scraper._parse_player_summary(PROFILE_HTML) == reference
+
+
+def test_fetched_pages_are_recorded_for_replay(offline_scraper, monkeypatch, tmp_path):
+    corpus = tmp_path / "corpus"
+    monkeypatch.setattr(opgg_scraper, "RECORD_DIR", str(corpus))
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    champions = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+
+    index = json.loads((corpus / "index.json").read_text(encoding="utf-8"))
+    [(url, meta)] = index.items()
+    assert url.startswith("https://op.gg/lol/champions?") and meta["page"] == "tierlist"
+    assert (corpus / meta["file"]).read_text(encoding="utf-8") == TIERLIST_HTML
+    expected = json.loads((corpus / meta["file"].replace(".html", ".json")).read_text(encoding="utf-8"))
+    assert expected == champions
+
+
+def test_worker_delegates_chrome_rendering_to_scraper_service(monkeypatch, tmp_path):
+    """Mode serve.py : le worker parse et écrit le cache partagé, le service garde les drivers."""
+    def rendering_driver(headless=True):
+        driver = FakeDriver(headless)
+        driver.page_source = TIERLIST_HTML
+        return driver
+
+    service_pool = opgg_scraper.DriverPool(size=1, factory=rendering_driver)
+    worker_pool = opgg_scraper.DriverPool(size=1, factory=None)
+    client = scraper_service.app.test_client()
+
+    service_requests = []
+    service_session = SimpleNamespace(get=lambda url, timeout: service_requests.append(url) or SimpleNamespace(
+        status_code=200, headers={}, text=TIERLIST_HTML))
+
+    def worker_session():
+        raise AssertionError("requête op.gg envoyée par le worker")
+
+    def post(url, json, timeout):
+        assert url.startswith("http://scraper:5001/")
+        with monkeypatch.context() as m:  # côté service : requêtes locales, son propre pool
+            m.setattr(opgg_scraper, "SCRAPER_SERVICE_URL", "")
+            m.setattr(opgg_scraper, "_pool", service_pool)
+            m.setattr(opgg_scraper, "_get_http_session", lambda: service_session)
+            resp = client.post(url.removeprefix("http://scraper:5001"), json=json)
+        return SimpleNamespace(status_code=resp.status_code, text=resp.get_data(as_text=True), json=resp.get_json)
+
+    monkeypatch.setattr(opgg_scraper, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(opgg_scraper, "FETCH_MODE", "selenium")
+    monkeypatch.setattr(opgg_scraper, "SCRAPER_SERVICE_URL", "http://scraper:5001")
+    monkeypatch.setattr(opgg_scraper, "_pool", worker_pool)
+    monkeypatch.setattr(opgg_scraper, "_wait_for_page", lambda driver, page: True)
+    monkeypatch.setattr(opgg_scraper.requests, "post", post)
+
+    champions = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert [c["name"] for c in champions] == ["Jinx", "Caitlyn"]
+    assert (tmp_path / "tierlist_euw_emerald_plus_adc.json").exists()  # cache disque partagé
+    assert service_pool.stats()["created"] == 1 and worker_pool.stats()["created"] == 0
+    service_pool.close()
+
+    # Chemin HTTP aussi via le service : un seul limiteur et un seul circuit pour tous les workers
+    monkeypatch.setattr(opgg_scraper, "FETCH_MODE", "http")
+    monkeypatch.setattr(opgg_scraper, "_get_http_session", worker_session)
+    champions = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "mid")
+    assert [c["name"] for c in champions] == ["Jinx", "Caitlyn"] and len(service_requests) == 1
+    assert client.post("/fetch", json={"url": "http://169.254.169.254/"}).status_code == 400
+
+    assert client.post("/render", json={"url": "https://example.com/", "page": "tierlist"}).status_code == 400
+    monkeypatch.setattr(opgg_scraper.requests, "post",
+                        lambda url, json, timeout: SimpleNamespace(status_code=502, text="boom"))
+    with pytest.raises(opgg_scraper.ScraperServiceError):
+        opgg_scraper._remote_render("https://op.gg/lol/champions", "tierlist")
+
+
+def test_rate_limiter_retries_and_circuit_breaker_serve_stale_cache(monkeypatch, tmp_path):
+    limiter = ratelimit.AdaptiveRateLimiter(initial_rate=2, increase=0.5, decrease=0.5, hold=60)
+    limiter.record("op.gg", True, 0.1)
+    assert limiter.rate("op.gg") == 2.5  # AI
+    limiter.record("op.gg", False)
+    limiter.record("op.gg", False)  # même rafale d'erreurs (fenêtre `hold`) : une seule baisse
+    assert limiter.rate("op.gg") == 1.25  # MD
+    limiter.record("op.gg", True, 1.0)  # latence > 3x la moyenne : signal de lenteur
+    assert limiter.stats()["op.gg"]["slow"] == 1
+
+    calls, delays = [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ratelimit.RetryableError("HTTP 503", retry_after=2 if len(calls) == 1 else None)
+        return "ok"
+
+    assert ratelimit.retry_call(flaky, attempts=3, base=0.1, cap=1, sleep=delays.append) == "ok"
+    assert delays[0] == 2 and 0 <= delays[1] <= 0.2  # Retry-After respecté, puis full jitter
+
+    # op.gg répond 503 : retries, circuit ouvert après 2 échecs, cache expiré servi
+    requests_sent = []
+
+    class FailingSession:
+        def get(self, url, timeout):
+            requests_sent.append(url)
+            return SimpleNamespace(status_code=503, headers={}, text="")
+
+    monkeypatch.setattr(opgg_scraper, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(opgg_scraper, "FETCH_MODE", "http")
+    monkeypatch.setattr(opgg_scraper, "STALE_WHILE_REVALIDATE", False)
+    monkeypatch.setattr(opgg_scraper, "RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(opgg_scraper, "_get_http_session", FailingSession)
+    monkeypatch.setattr(opgg_scraper, "_rate_limiter", ratelimit.AdaptiveRateLimiter(initial_rate=1000))
+    monkeypatch.setattr(opgg_scraper, "_breaker", ratelimit.CircuitBreaker("op.gg", failure_threshold=2))
+    stale = [{"name": "Jinx"}]
+    opgg_scraper._write_cache("tierlist_euw_emerald_plus_adc", stale)
+    old = time.time() - 7 * 3600
+    os.utime(tmp_path / "tierlist_euw_emerald_plus_adc.json", (old, old))
+
+    assert opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc") == stale
+    assert len(requests_sent) == 2 and opgg_scraper._breaker.state == "open"
+    assert opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc") == stale
+    assert len(requests_sent) == 2  # circuit ouvert : plus aucune requête
+    with pytest.raises(ratelimit.CircuitOpenError):  # pas de cache : l'API répond 503
+        opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "mid")
+
+    # 403 (anti-bot) : pas de nouvel essai, mais un échec pour le limiteur et le circuit
+    requests_sent.clear()
+    monkeypatch.setattr(opgg_scraper, "_get_http_session", lambda: SimpleNamespace(
+        get=lambda url, timeout: requests_sent.append(url) or SimpleNamespace(status_code=403, headers={}, text="")))
+    monkeypatch.setattr(opgg_scraper, "_breaker", ratelimit.CircuitBreaker("op.gg", failure_threshold=2))
+    assert opgg_scraper._http_get("https://op.gg/lol/champions") is None
+    assert opgg_scraper._http_get("https://op.gg/lol/champions") is None
+    assert len(requests_sent) == 2 and opgg_scraper._breaker.state == "open"
+    assert opgg_scraper._rate_limiter.stats()["op.gg"]["failures"] >= 2
+
+
+# ---------------------------------------------------------------------------
+# Cache mémoire
+# ---------------------------------------------------------------------------
+
+def test_lru_cache_ttl_and_eviction():
+    c = LRUCache(max_entries=2, default_ttl=60)
+    c.set(("euw", "emerald_plus", "adc"), [1])
+    c.set(("euw", "emerald_plus", "mid"), [2])
+    assert c.get(("euw", "emerald_plus", "adc")) == [1]  # adc devient le plus récent
+    c.set(("kr", "emerald_plus", "adc"), [3])
+    assert c.get(("euw", "emerald_plus", "mid")) is None  # évincé (LRU)
+    assert c.get(("euw", "emerald_plus", "adc")) == [1]
+    c.set("expired", [4], ttl=0)
+    assert c.get("expired") is None
+
+
+def test_lru_cache_byte_cap():
+    c = LRUCache(max_entries=100, max_bytes=50)
+    c.set("a", "x" * 20)
+    c.set("b", "y" * 20)
+    c.set("c", "z" * 20)
+    assert c.get("a") is None and c.get("c") == "z" * 20
+    assert c.stats()["bytes"] <= 50
+
+
+# ---------------------------------------------------------------------------
+# Coalescing des scrapes
+# ---------------------------------------------------------------------------
+
+def test_concurrent_scrapes_of_same_key_are_coalesced(offline_scraper, monkeypatch):
+    calls = []
+
+    def slow_http(url):
+        calls.append(url)
+        time.sleep(0.2)
+        return TIERLIST_HTML
+
+    monkeypatch.setattr(opgg_scraper, "_http_get", slow_http)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")))
+        for _ in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 10 and all(r == results[0] for r in results)
+
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+    errors = []
+
+    def boom():
+        time.sleep(0.1)
+        raise ValueError("op.gg down")
+
+    def call():
+        try:
+            flight.do("k", boom)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3 and flight.in_flight() == []
+
+
+# ---------------------------------------------------------------------------
+# Stale-while-revalidate
+# ---------------------------------------------------------------------------
+
+def test_stale_cache_is_served_and_refreshed_in_background(offline_scraper, tmp_path):
+    stale = [{"rank": 1, "name": "Old", "win_rate": 50.0}]
+    cache_file = tmp_path / "tierlist_euw_emerald_plus_adc.json"
+    cache_file.write_text(json.dumps(stale), encoding="utf-8")
+    old = time.time() - (opgg_scraper.TIERLIST_TTL_H + 1) * 3600
+    os.utime(cache_file, (old, old))
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+
+    assert opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc") == stale
+    opgg_scraper._refresher.join()
+    status = opgg_scraper.refresh_status()["keys"]["tierlist_euw_emerald_plus_adc"]
+    assert status["state"] == "done"
+    fresh = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert [c["name"] for c in fresh] == ["Jinx", "Caitlyn"]
+
+
+def test_disk_cache_atomic_writes_checksums_and_quarantine(offline_scraper, tmp_path):
+    path = tmp_path / "tierlist_euw_emerald_plus_adc.json"
+    payloads = [[{"name": f"C{i}", "win_rate": 50 + i}] * (200 + i * 50) for i in range(4)]
+    errors = []
+
+    def writer(data):
+        for _ in range(20):
+            cache_io.write_json(path, data)
+
+    def reader():
+        for _ in range(60):
+            try:
+                data, _ = cache_io.read_json(path)
+                assert data is None or data in payloads
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(p,)) for p in payloads]
+    threads += [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # Contenu altéré : mis en quarantaine puis re-scrapé
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text.replace('"C', '"X', 1), encoding="utf-8")
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    champions = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert [c["name"] for c in champions] == ["Jinx", "Caitlyn"]
+    assert len(list((tmp_path / cache_io.QUARANTINE_DIR).iterdir())) == 1
+
+    # Fichier sans somme de contrôle (format historique) : toujours lisible
+    legacy = tmp_path / "build_ahri_mid_euw.json"
+    legacy.write_text(json.dumps({"core_items": [1]}, indent=2), encoding="utf-8")
+    assert cache_io.read_json(legacy)[0] == {"core_items": [1]}
+    legacy.write_text('{"core_items": [1', encoding="utf-8")
+    with pytest.raises(cache_io.CorruptCacheError):
+        cache_io.read_json(legacy)
+
+    # Verrous répartis sur LOCK_STRIPES fichiers, pas un .lock par clé
+    for i in range(3 * cache_io.LOCK_STRIPES):
+        cache_io.write_json(tmp_path / f"matchups_c{i}_mid_euw.json", [i])
+    assert len(list((tmp_path / cache_io.LOCK_DIR).iterdir())) <= cache_io.LOCK_STRIPES
+
+
+def test_fixture_loader_reads_checksummed_caches(tmp_path):
+    # Les fixtures de data/ réécrites par le scraper portent l'enveloppe sha256 de cache_io
+    for name in ("tierlist_euw_emerald_plus_mid.json", "ddragon_champions.json", "player_euw_Phanta_107.json"):
+        data = read_cache(name)
+        cache_io.write_json(tmp_path / name, data)
+        assert (tmp_path / name).read_text(encoding="utf-8").startswith('{"sha256":"')
+        assert read_cache(name, tmp_path) == data
+
+
+# ---------------------------------------------------------------------------
+# Métriques
+# ---------------------------------------------------------------------------
+
+def test_scrape_metrics_and_prometheus_export(offline_scraper, monkeypatch):
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    lookups = opgg_scraper.DISK_CACHE_LOOKUPS
+    misses = lookups.value(family="tierlist", result="miss")
+    hits = lookups.value(family="tierlist", result="hit")
+    parses = opgg_scraper.SCRAPE_PHASE.count(page="tierlist", phase="parse")
+
+    opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert lookups.value(family="tierlist", result="miss") == misses + 1
+    assert lookups.value(family="tierlist", result="hit") == hits + 1
+    assert opgg_scraper.SCRAPE_PHASE.count(page="tierlist", phase="parse") == parses + 1
+
+    lock = metrics.TimedLock("test")
+    with lock:
+        pass
+    text = metrics.render()
+    assert 'draftforme_lock_wait_seconds_count{lock="test"} 1' in text
+    assert 'draftforme_scrape_phase_seconds_bucket{page="tierlist",phase="extract",le="+Inf"}' in text
+    assert "# TYPE draftforme_driver_pool gauge" in text
+
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    with lock:
+        pass
+    assert lookups.value(family="tierlist", result="hit") == hits + 1
+    assert metrics.LOCK_WAIT.count(lock="test") == 1
+
+
+def test_request_profiles_kept_in_bounded_ring_buffer(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "admin")
+    assert profiling.is_authorized("admin") and not profiling.is_authorized("nope")
+    store = profiling.ProfileStore(tmp_path, keep=2)
+    ids = []
+    for mode in ("cprofile", "sample", "sample"):
+        profiler = profiling.RequestProfiler(mode)
+        profiler.start()
+        time.sleep(0.03)
+        profiler.stop()
+        ids.append(store.save(profiler, {"path": "/api/recommend"}))
+
+    assert [p["id"] for p in store.list()] == ids[:0:-1]
+    assert store.artifact_path(ids[0]) is None
+    collapsed = store.artifact_path(ids[-1]).read_text(encoding="utf-8")
+    assert "test_request_profiles_kept_in_bounded_ring_buffer" in collapsed
+    with pytest.raises(ValueError):
+        profiling.RequestProfiler("perf")
+
+    # Deux requêtes profilées en même temps : la seconde passe en échantillonnage
+    first, second = profiling.RequestProfiler("cprofile"), profiling.RequestProfiler("cprofile")
+    first.start()
+    second.start()
+    second.stop()
+    first.stop()
+    assert (first.mode, second.mode) == ("cprofile", "sample")
+    assert (first.scope, second.scope) == (profiling.CPROFILE_SCOPE, "request")
+    third = profiling.RequestProfiler("cprofile")
+    third.start()
+    third.stop()
+    assert third.mode == "cprofile"
+
+
+# ---------------------------------------------------------------------------
+# Jobs asynchrones
+# ---------------------------------------------------------------------------
+
+def test_role_prefetch_has_own_executor_and_expires_with_matchups_ttl(monkeypatch):
+    import app as draftforme
+
+    runs = []
+
+    def fake_role_matchups(region, tier, position, progress=None):
+        runs.append(position)
+        return {"Jinx": {"all_matchups": [{"enemy": "Caitlyn", "win_rate": 51.0}]}}
+
+    monkeypatch.setattr(draftforme, "fetch_role_matchups", fake_role_matchups)
+    monkeypatch.setattr(draftforme, "_prefetch_progress", {})
+    monkeypatch.setattr(draftforme, "_jobs", None)  # les préchargements n'utilisent pas les workers ?async=1
+
+    def prefetch():
+        draftforme._start_matchup_prefetch("euw", "emerald_plus", "bottom", force=False)
+        for _ in range(100):
+            if draftforme._prefetch_progress[("euw", "emerald_plus", "adc")]["state"] == "done":
+                return
+            time.sleep(0.01)
+        raise AssertionError("préchargement non terminé")
+
+    prefetch()
+    prefetch()  # encore valable : pas relancé
+    assert runs == ["adc"]
+    progress = draftforme._prefetch_progress[("euw", "emerald_plus", "adc")]
+    progress["finished_at"] -= draftforme.MATCHUPS_TTL_H * 3600
+    prefetch()  # expiré : relancé
+    assert runs == ["adc", "adc"]
+    draftforme._prefetch_progress[("euw", "emerald_plus", "adc")]["finished_at"] = 0
+    draftforme._prune_prefetch_progress(time.time())
+    assert ("euw", "emerald_plus", "adc") not in draftforme._prefetch_progress  # entrée expirée purgée
+
+
+def test_job_manager_dedup_and_queue_cap():
+    release = threading.Event()
+    jobs = JobManager(workers=1, max_pending=2)
+    a = jobs.submit(("matchups", "Jinx"), lambda: release.wait(5) and "ok")
+    assert jobs.submit(("matchups", "Jinx"), lambda: "other") is a
+    jobs.submit(("matchups", "Ahri"), lambda: "ahri")
+    with pytest.raises(JobQueueFull):
+        jobs.submit(("matchups", "Zed"), lambda: "zed")
+    release.set()
+    assert a.wait(5) and a.state == "done" and a.result == "ok"
+    jobs.shutdown(wait=True)
+
+
+# ---------------------------------------------------------------------------
+# Matchups en masse
+# ---------------------------------------------------------------------------
+
+MATCHUPS_HTML = """
+<table><tbody>
+<tr><td><a href="/lol/champions/ahri">Ahri</a></td><td>55.5%</td><td>1,200</td></tr>
+<tr><td><a href="/lol/champions/zed">Zed</a></td><td>47.1%</td><td>800</td></tr>
+</tbody></table>
+"""
+
+
+def test_fetch_role_matchups_loads_whole_tierlist(offline_scraper):
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    offline_scraper["https://op.gg/lol/champions/jinx/counters/adc"] = MATCHUPS_HTML
+    offline_scraper["https://op.gg/lol/champions/caitlyn/counters/adc"] = MATCHUPS_HTML
+    progress = []
+    data = opgg_scraper.fetch_role_matchups(
+        "euw", "emerald_plus", "bottom", concurrency=2,
+        progress=lambda done, total, name, ok: progress.append((done, total, ok)),
+    )
+    assert set(data) == {"Jinx", "Caitlyn"}
+    assert data["Jinx"]["champion"] == "Jinx"  # nom affiché, pas le slug op.gg
+    assert sorted(progress) == [(1, 2, True), (2, 2, True)]
+    stats = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert opgg_scraper.load_cached_matchups("euw", "adc", stats) == data
+
+
+def test_crawler_warms_matrix_skips_fresh_and_resumes(offline_scraper, monkeypatch, tmp_path):
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    offline_scraper["https://op.gg/lol/champions/jinx/counters/adc"] = MATCHUPS_HTML
+    offline_scraper["https://op.gg/lol/champions/caitlyn/counters/adc"] = MATCHUPS_HTML
+    http_get = opgg_scraper._http_get
+    fetched = []
+    monkeypatch.setattr(opgg_scraper, "_http_get", lambda url: fetched.append(url) or http_get(url))
+    state = tmp_path / "crawl_state.json"
+
+    def crawl(**kwargs):
+        return crawler.Crawler(["euw"], ["bottom"], ["emerald_plus", "diamond_plus"], kinds=["matchups"],
+                               max_rate=0, state_path=state, **kwargs).run()
+
+    report = crawl()
+    # 2 tier lists ; matchups dédupliqués entre les deux tiers
+    assert report["counts"] == {"tierlist": {"ok": 2}, "matchups": {"ok": 2}}
+    assert len(fetched) == 4 and not report["interrupted"]
+    assert (tmp_path / "matchups_jinx_adc_euw.json").exists()
+
+    fetched.clear()
+    assert crawl()["counts"] == {"tierlist": {"fresh": 2}, "matchups": {"fresh": 2}}
+    assert crawl(resume=True)["counts"] == {"tierlist": {"resumed": 2}, "matchups": {"resumed": 2}}
+    assert fetched == []
+    # Rafraîchissement anticipé : tout cache plus vieux que 0 x TTL est re-scrapé
+    assert crawl(refresh_ahead=0)["counts"] == {"tierlist": {"ok": 2}, "matchups": {"ok": 2}}
+    assert len(fetched) == 4
+
+    # --loop : passes planifiées depuis leur début, la durée de la passe est décomptée
+    loop = crawler.Crawler(["euw"], ["bottom"], ["emerald_plus"], kinds=["matchups"], max_rate=1000, state_path=state)
+    ttl_s = opgg_scraper.TIERLIST_TTL_H * 3600
+    assert loop.next_pass_in() == pytest.approx(0.2 * ttl_s)
+    assert loop.next_pass_in(600) == pytest.approx(0.2 * ttl_s - 1200)
+    assert loop.next_pass_in(ttl_s) == 0
+    assert loop.run()["counts"] == {"tierlist": {"fresh": 1}, "matchups": {"fresh": 2}}
+
+
+def test_sqlite_store_backend_and_json_migration(offline_scraper, monkeypatch, tmp_path):
+    offline_scraper["https://op.gg/lol/champions"] = TIERLIST_HTML
+    offline_scraper["https://op.gg/lol/champions/jinx/counters/adc"] = MATCHUPS_HTML
+    offline_scraper["https://op.gg/lol/champions/caitlyn/counters/adc"] = MATCHUPS_HTML
+    json_data = opgg_scraper.fetch_role_matchups("euw", "emerald_plus", "adc", concurrency=1)
+
+    # Migration des data/*.json écrits ci-dessus, puis lecture via le backend SQLite
+    db = Store(tmp_path / "migrated.db")
+    report = migrate_json_cache(tmp_path, db, opgg_scraper.CACHE_TTL_H)
+    assert report["imported"] == 3 and report["skipped"] == []
+    assert set(db.bulk("matchups", region="euw", role="adc")) == {"jinx", "caitlyn"}
+    assert parse_cache_key("tierlist_euw_emerald_plus_adc") == ("tierlist", "euw", "emerald_plus", "adc", "")
+
+    monkeypatch.setattr(opgg_scraper, "CACHE_BACKEND", "sqlite")
+    monkeypatch.setattr(opgg_scraper, "DATA_DIR", tmp_path / "sqlite")
+    (tmp_path / "sqlite").mkdir()
+    stats = opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc")
+    assert opgg_scraper.fetch_role_matchups("euw", "emerald_plus", "adc", concurrency=1) == json_data
+    assert opgg_scraper.load_cached_matchups("euw", "adc", stats) == json_data
+    assert list((tmp_path / "sqlite").glob("*.json")) == []
+    kinds = opgg_scraper.store_stats()["kinds"]
+    assert kinds["tierlist"]["records"] == 1 and kinds["matchups"]["records"] == 2
+
+    # Aucun scrape : tout est servi par la base
+    offline_scraper.clear()
+    assert opgg_scraper.fetch_champion_stats("euw", "emerald_plus", "adc") == stats
+    assert db.purge_expired() == 0
+
+
+# ---------------------------------------------------------------------------
+# Recommandations
+# ---------------------------------------------------------------------------
+
+def _synthetic_matchups(names, seed=1):
+    rng = random.Random(seed)
+    data = {}
+    for name in names:
+        matchups = []
+        for enemy in rng.sample(names, min(20, len(names))):
+            wr = rng.choice([None, round(rng.uniform(40, 60), 2), "51.3%"])
+            matchups.append({"enemy": rng.choice([enemy, enemy.lower()]), "win_rate": wr})
+        data[name] = {"all_matchups": matchups}
+    return data
+
+
+def test_matchup_matrix_matches_counter_score():
+    stats = read_cache("tierlist_euw_emerald_plus_adc.json")
+    names = [c["name"] for c in stats]
+    matchup_data = _synthetic_matchups(names)
+    matrix = MatchupMatrix.from_matchup_data(matchup_data)
+    rng = random.Random(2)
+    for _ in range(200):
+        enemies = rng.sample(names + ["Unknown"], rng.randint(0, 5))
+        candidates = rng.sample(names, 10) + ["NotInData"]
+        expected = [counter_score(c, enemies, matchup_data) for c in candidates]
+        assert matrix.counter_scores(candidates, enemies).tolist() == expected
+
+
+def _reference_recommend(all_champion_stats, player_pool, enemy_picks, matchup_data,
+                         banned_champions, already_picked, priority, top_n, ally_picks=(), synergy=None):
+    """Ancienne implémentation (un compute_champion_score par champion), pour la non-régression."""
+    banned = {c.lower() for c in banned_champions}
+    picked = {c.lower() for c in list(already_picked) + list(ally_picks)}
+    scored = []
+    for c in all_champion_stats:
+        name = c.get("name", "")
+        if not name or name.lower() in banned or name.lower() in picked:
+            continue
+        result = compute_champion_score(c, name, player_pool, enemy_picks, matchup_data,
+                                        priority, len(all_champion_stats),
+                                        ally_picks=ally_picks, synergy=synergy)
+        result["stats"] = {
+            "win_rate": _safe_float(c.get("win_rate")),
+            "pick_rate": _safe_float(c.get("pick_rate")),
+            "ban_rate": _safe_float(c.get("ban_rate")),
+            "kda": c.get("kda"),
+            "games_played": c.get("games_played"),
+            "cs": c.get("cs"),
+            "gold": c.get("gold"),
+            "counters": c.get("counters", []),
+            "rank": c.get("rank"),
+        }
+        scored.append(result)
+    scored.sort(key=lambda x: x["total_score"], reverse=True)
+    return scored[:top_n]
+
+
+def test_batch_scoring_output_identical_to_reference():
+    rng = random.Random(3)
+    tierlists = sorted(DATA_DIR.glob("tierlist_*.json")) + sorted(DATA_DIR.glob("champion_stats_*.json"))
+    pools = [read_cache(f)["most_played"] for f in sorted(DATA_DIR.glob("player_*.json"))]
+    synergy = SynergyTable.from_ddragon(read_cache("ddragon_champions.json"))
+    for _ in range(300):
+        stats = read_cache(rng.choice(tierlists))
+        names = [c["name"] for c in stats]
+        pool = rng.choice(pools + [[], [
+            {"champion": rng.choice(names), "games": rng.choice([None, 5, 20, 200, "30"]),
+             "win_rate": rng.choice([None, 90, 10, 55])}
+            for _ in range(8)
+        ]])
+        kwargs = dict(
+            all_champion_stats=stats,
+            player_pool=pool,
+            enemy_picks=rng.sample(names, rng.randint(0, 5)),
+            matchup_data=_synthetic_matchups(rng.sample(names, rng.randint(0, len(names))), seed=rng.random()),
+            banned_champions=rng.sample(names, rng.randint(0, 10)),
+            already_picked=rng.sample(names, rng.randint(0, 3)),
+            priority=rng.choice([0, 15, 50, 85, 100]),
+            top_n=rng.choice([1, 5, 10, 200]),
+            ally_picks=rng.sample(names, rng.choice([0, 0, 1, 4])) + rng.choice([[], ["Unknown"]]),
+            synergy=rng.choice([synergy, None]),
+        )
+        expected = json.dumps(_reference_recommend(**kwargs))
+        assert json.dumps(recommend_champions(**kwargs)) == expected
+
+
+def test_stats_snapshot_reused_across_requests():
+    stats = read_cache("tierlist_euw_emerald_plus_mid.json")
+    names = [c["name"] for c in stats]
+    snapshot = ChampionStatsSnapshot(stats)
+    matchup_data = _synthetic_matchups(names)
+    matrix = MatchupMatrix.from_matchup_data(matchup_data)
+    rng = random.Random(4)
+    for _ in range(50):
+        kwargs = dict(player_pool=[], enemy_picks=rng.sample(names, 3), matchup_data=matchup_data,
+                      banned_champions=[n.upper() for n in rng.sample(names, 5)], top_n=10)
+        expected = recommend_champions(stats, **kwargs)
+        assert recommend_champions(snapshot, matchup_matrix=matrix, **kwargs) == expected
+    # Les recommandations sont des copies : le snapshot partagé reste intact
+    recommend_champions(snapshot, [])[0]["stats"]["counters"].append("x")
+    assert "x" not in snapshot.stats[0]["counters"]
+    assert not snapshot.win_rates.flags.writeable
+
+    # Requêtes concurrentes avec deux matrices différentes (avant / après rafraîchissement des matchups)
+    matrices = [matrix, MatchupMatrix.from_matchup_data(dict(reversed(list(matchup_data.items()))))]
+    errors = []
+
+    def rows_for(m):
+        for _ in range(300):
+            if snapshot.matrix_rows(m).tolist() != m.row_ids(snapshot.names).tolist():
+                errors.append(m)
+
+    threads = [threading.Thread(target=rows_for, args=(matrices[k % 2],)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+    legacy = ChampionStatsSnapshot([{"name": "Ahri", "rank": "3", "win_rate": "51.2%", "games_played": "1 396 649"}])
+    assert legacy.ranks.tolist() == [3.0]
+    assert legacy.win_rates.tolist() == [51.2]
+    assert legacy.games_played == (1396649,)
+
+
+def test_draft_simulation_minimax_and_budget():
+    stats = read_cache("tierlist_euw_emerald_plus_mid.json")
+    names = [c["name"] for c in stats]
+    matchup_data = _synthetic_matchups(names)
+    enemies = names[:1]
+
+    # Sans étape ennemie : même meilleur pick que /api/recommend
+    result = simulate_draft(stats, [], enemies, matchup_data, sequence=["pick"])
+    best = recommend_champions(stats, [], enemies, matchup_data, already_picked=enemies)[0]
+    assert (result["best_pick"], result["value"]) == (best["champion"], best["total_score"])
+
+    # Pick puis réponse ennemie : max sur nos candidats du min sur les réponses
+    ctx = build_context(stats, [], enemies, matchup_data, [], [], 50, ("pick", "enemy_pick"), 4, 5)
+    expected = max(
+        min(ctx.leaf_value(c, (e,)) for e in [e for e in ctx.theirs if e != c][:5])
+        for c in ctx.ours[:4]
+    )
+    result = simulate_draft(stats, [], enemies, matchup_data, beam_width=4, enemy_width=5)
+    assert result["value"] == round(expected, 1)
+    assert result["search"]["complete"]
+
+    # Budget épuisé : résultat de la dernière largeur terminée
+    result = simulate_draft(stats, [], enemies, matchup_data, sequence=["pick"] + ["enemy_pick"] * 3,
+                            beam_width=10, enemy_width=12, node_budget=300)
+    assert result["best_pick"] and not result["search"]["complete"]
+
+    with pytest.raises(ValueError):
+        simulate_draft(stats, [], sequence=["enemy_pick"])
+
+    import app as draftforme
+
+    client = draftforme.app.test_client()
+    for bad in ({"beam_width": None}, {"time_budget": [5]}, {"node_budget": "beaucoup"}):
+        resp = client.post("/api/draft/simulate", json={"role": "mid", **bad})
+        assert resp.status_code == 400 and "error" in resp.get_json()
+
+
+def test_synergy_table_from_ddragon_tags_and_dataset():
+    ddragon = read_cache("ddragon_champions.json")
+    table = SynergyTable.from_ddragon(ddragon)
+    assert table.pairs.dtype == np.int8 and table.nbytes == len(ddragon) ** 2
+    # Un tank protège un marksman, deux marksmen se gênent ; "Kai'Sa" / "KaiSa" : même champion
+    jinx, kaisa = table.scores(["Jinx", "Kai'Sa"], ["Leona"]).tolist()
+    assert jinx > 50 > table.scores(["Jinx"], ["Caitlyn"])[0]
+    assert table.scores(["KaiSa"], ["Leona"])[0] == kaisa
+    assert table.scores(["Jinx", "Unknown"], []).tolist() == [50.0, 50.0]
+
+    dataset = SynergyTable.from_pairs([{"champion": "Yasuo", "ally": "Malphite", "synergy": 40}])
+    assert dataset.scores(["Malphite", "Yasuo"], ["Yasuo", "Unknown"]).tolist() == [70.0, 50.0]
+
+
+def test_draft_session_incremental_updates_match_full_recommend():
+    stats = read_cache("tierlist_euw_emerald_plus_mid.json")
+    names = [c["name"] for c in stats]
+    matchup_data = _synthetic_matchups(names)
+    synergy = SynergyTable.from_ddragon(read_cache("ddragon_champions.json"))
+    pool = read_cache("player_euw_Phanta_107.json")["most_played"]
+    rng = random.Random(5)
+
+    session = DraftSession(stats, pool, matchup_data=matchup_data, synergy=synergy)
+    for _ in range(200):
+        op = rng.choice(list(LIST_OPS) + ["priority"])
+        if op == "priority":
+            session.apply([{"op": op, "value": rng.choice([0, 30, 50, 85, 100])}])
+        else:
+            attr, add = LIST_OPS[op]
+            current = getattr(session, attr)
+            name = rng.choice(names) if add or not current else rng.choice(current)
+            session.apply([{"op": op, "champion": rng.choice([name, name.upper()])}])
+        expected = recommend_champions(
+            stats, pool, session.enemy_picks, matchup_data, banned_champions=session.banned,
+            already_picked=session.already_picked, priority=session.priority,
+            ally_picks=session.ally_picks, synergy=synergy,
+        )
+        assert json.dumps(session.recommendations()) == json.dumps(expected)
+
+    # État complet (frontend) : l'ordre des picks ennemis est celui du client
+    state = {"enemy_picks": names[3:5], "banned": names[:2], "already_picked": [], "ally_picks": [], "priority": 20}
+    session.sync(state)
+    assert session.enemy_picks == names[3:5] and session.banned == names[:2]
+    assert session.recommendations() == recommend_champions(stats, pool, names[3:5], matchup_data,
+                                                            banned_champions=names[:2], priority=20)
+    with pytest.raises(ValueError):
+        session.apply([{"op": "nope"}])
+
+
+def test_synergy_table_loaded_lazily_and_failures_cached(monkeypatch):
+    import app as draftforme
+
+    stats = read_cache("tierlist_euw_emerald_plus_mid.json")
+    names = [c["name"] for c in stats]
+    ddragon = read_cache("ddragon_champions.json")
+    synergy = SynergyTable.from_ddragon(ddragon)
+
+    # Session sans allié : la table n'est pas chargée ; indisponible au premier allié -> réessayée au suivant
+    tables = [None, synergy]
+    session = DraftSession(stats, [], synergy_loader=lambda: tables.pop(0))
+    session.apply([{"op": "enemy_pick", "champion": names[0]}])
+    assert len(tables) == 2
+    session.apply([{"op": "ally_pick", "champion": names[1]}, {"op": "ally_pick", "champion": names[2]}])
+    assert tables == [] and session.synergy is synergy
+    assert session.recommendations() == recommend_champions(stats, [], [names[0]], {}, ally_picks=names[1:3],
+                                                            synergy=synergy)
+
+    # Data Dragon injoignable : un seul appel réseau par SYNERGY_RETRY_AFTER s
+    calls = []
+
+    def fetch_ddragon():
+        calls.append(1)
+        raise ConnectionError("hors ligne")
+
+    monkeypatch.setattr(draftforme, "fetch_ddragon_champions", fetch_ddragon)
+    monkeypatch.setitem(draftforme._cache, "synergy", None)
+    monkeypatch.setitem(draftforme._cache, "synergy_failed_at", 0.0)
+    assert draftforme._get_synergy_table() is None and draftforme._get_synergy_table() is None
+    assert len(calls) == 1
+    draftforme._cache["synergy_failed_at"] -= draftforme.SYNERGY_RETRY_AFTER
+    monkeypatch.setattr(draftforme, "fetch_ddragon_champions", lambda: ddragon)
+    assert draftforme._get_synergy_table() is not None
+
+
+def test_draft_session_prefetches_matchups_on_first_enemy_and_takes_new_matrix(monkeypatch):
+    import app as draftforme
+
+    stats = read_cache("tierlist_euw_emerald_plus_mid.json")
+    names = [c["name"] for c in stats]
+    matchup_data = _synthetic_matchups(names)
+    cached = [({}, MatchupMatrix.from_matchup_data({}))]  # cache matchups froid
+    prefetches = []
+    monkeypatch.setattr(draftforme, "_get_stats_entry", lambda region, tier, role: (stats, ChampionStatsSnapshot(stats)))
+    monkeypatch.setattr(draftforme, "_get_role_matchups", lambda region, tier, role, stats: cached[-1])
+    monkeypatch.setattr(draftforme, "_start_matchup_prefetch",
+                        lambda region, tier, role, force=True: prefetches.append((region, tier, role)))
+    client = draftforme.app.test_client()
+
+    # Session créée au premier changement, sans ennemi (static/js/app.js), puis mises à jour en PUT
+    state = {"role": "mid", "player_pool": [], "enemy_picks": [], "banned": [], "ally_picks": []}
+    session_id = client.post("/api/draft/session", json=state).get_json()["session_id"]
+    assert prefetches == []
+    state["enemy_picks"] = names[:2]
+    client.put(f"/api/draft/session/{session_id}", json=state)
+    assert prefetches == [("euw", "emerald_plus", "mid")]
+
+    # Préchargement terminé : la session passe sur la nouvelle matrice
+    cached.append((matchup_data, MatchupMatrix.from_matchup_data(matchup_data)))
+    body = client.put(f"/api/draft/session/{session_id}", json=state).get_json()
+    assert len(prefetches) == 1
+    assert body["recommendations"] == recommend_champions(stats, [], names[:2], matchup_data)
+
+
+def test_recommend_batch_shares_loaded_data_and_keeps_order():
+    tierlists = {
+        role: read_cache(f"tierlist_euw_emerald_plus_{role}.json")
+        for role in ("mid", "adc")
+    }
+    matchups = {role: _synthetic_matchups([c["name"] for c in stats]) for role, stats in tierlists.items()}
+    loads = []
+
+    def load(region, tier, role):
+        loads.append(role)
+        return ChampionStatsSnapshot(tierlists[role]), matchups[role], MatchupMatrix.from_matchup_data(matchups[role])
+
+    rng = random.Random(6)
+    drafts = []
+    for _ in range(60):
+        role = rng.choice(["mid", "adc"])
+        names = [c["name"] for c in tierlists[role]]
+        drafts.append({"role": role, "enemy_picks": rng.sample(names, 2), "banned": rng.sample(names, 3),
+                       "priority": rng.choice([0, 50, 100]), "top_n": 5})
+    drafts.insert(10, "pas une draft")
+
+    results = list(recommend_batch(iter(drafts), load, workers=3))
+    assert sorted(loads) == ["adc", "mid"]
+    assert [r["index"] for r in results] == list(range(len(drafts)))
+    assert "error" in results[10]
+    for draft, result in zip(drafts[:10], results):
+        expected = recommend_champions(tierlists[draft["role"]], [], draft["enemy_picks"], matchups[draft["role"]],
+                                       banned_champions=draft["banned"], priority=draft["priority"], top_n=5)
+        assert result["recommendations"] == expected